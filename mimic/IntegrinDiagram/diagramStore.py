@@ -0,0 +1,140 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+
+from collections import OrderedDict
+
+
+class DiagramStore(object):
+    """ A content addressed store for diagram svg strings.
+
+    Args:
+        namespace (str): Prefix for all keys, e.g. the version of the svg
+            template and the builders, so diagrams of an old version are
+            never returned.
+        size (int): The maximum number of diagrams to keep in memory.
+            Default = 128
+        directory (str, optional): A directory to spill the diagrams to. The
+            diagrams are written to this directory when they are built, and
+            read from it when they are no longer (or not yet) in memory, so
+            they survive restarts and are shared between processes.
+
+    The diagrams are identified by a key, any json serializable value which
+    describes everything the diagram depends on (e.g. the domain coverage).
+    The store keeps the most recently used diagrams in memory.
+
+    Example use:
+
+    >>> store = DiagramStore(diagram_version(), directory='/tmp/diagrams')
+    >>> svg = store.get(['dimer', signature], lambda: build(signature))
+
+    """
+
+    def __init__(self, namespace, size=128, directory=None):
+
+        self._namespace = namespace
+        self._size = size
+        self._directory = directory
+
+        self._diagrams = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _digest(self, key):
+        """ Return the hex digest identifying 'key' in this namespace.
+        """
+
+        return hashlib.sha1(
+            "{0}:{1}".format(
+                self._namespace, json.dumps(key, sort_keys=True)
+            ).encode('utf-8')
+        ).hexdigest()
+
+    def _path(self, digest):
+        """ Return the path of the spilled diagram with 'digest'.
+        """
+
+        return os.path.join(self._directory, "{0}.svg".format(digest))
+
+    def _read(self, digest):
+        """ Return the spilled diagram with 'digest', or None.
+        """
+
+        if self._directory is None:
+            return None
+
+        try:
+            with open(self._path(digest), 'r') as o:
+                return o.read()
+        except (IOError, OSError):
+            return None
+
+    def _write(self, digest, svg):
+        """ Spill a diagram to the directory. The file is written to a
+        temporary file first, so other processes never read partial files.
+        """
+
+        if self._directory is None:
+            return
+
+        os.makedirs(self._directory, exist_ok=True)
+
+        fd, tmp = tempfile.mkstemp(dir=self._directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as o:
+            o.write(svg)
+        os.replace(tmp, self._path(digest))
+
+    def _remember(self, digest, svg):
+        """ Keep a diagram in memory, evicting the least recently used
+        diagram if the store is full.
+        """
+
+        with self._lock:
+            self._diagrams[digest] = svg
+            self._diagrams.move_to_end(digest)
+
+            while len(self._diagrams) > self._size:
+                self._diagrams.popitem(last=False)
+
+    def get(self, key, build):
+        """ Return the diagram for 'key', building it if it is neither in
+        memory nor in the spill directory.
+
+        Args:
+            key: A json serializable description of the diagram
+            build (callable): Function without arguments which builds and
+                returns the svg string for 'key'
+
+        Returns:
+            svg (str): The diagram
+        """
+
+        digest = self._digest(key)
+
+        with self._lock:
+            svg = self._diagrams.get(digest)
+
+            if svg is not None:
+                self._diagrams.move_to_end(digest)
+                return svg
+
+        svg = self._read(digest)
+
+        if svg is None:
+            svg = build()
+            self._write(digest, svg)
+
+        self._remember(digest, svg)
+
+        return svg
+
+    def clear(self):
+        """ Remove all diagrams from memory. Spilled diagrams are kept.
+        """
+
+        with self._lock:
+            self._diagrams.clear()
+
+    def __len__(self):
+        return len(self._diagrams)
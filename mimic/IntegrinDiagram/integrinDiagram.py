@@ -1,13 +1,66 @@
+import copy
+import hashlib
 import os
+import re
+import xml.etree.ElementTree as ET
 
-from io import StringIO
+from io import BytesIO
+from xml.sax.saxutils import escape
+from django.conf import settings
 from django.urls import reverse
-from xml.dom.minidom import parseString
 from cairosvg import svg2png
+from PIL import Image
+
+from IntegrinDiagram.diagramStore import DiagramStore
 
 # Only these elments will be recognized for alteration.
 ELEMENTS = ['rect', 'ellipse', 'path']
 
+# The popover content of the Dimer diagrams in the DiagramStore is replaced
+# by this placeholder (formatted with the element ID), see
+# `build_dimer_diagram`.
+POPOVER_PLACEHOLDER = "__popover__{0}__"
+POPOVER_PATTERN = re.compile(r"__popover__([\w-]+?)__")
+
+# The ID of the <symbol> in the integrin sprite (see `build_sprite`), and the
+# static file the sprite is saved to.
+SPRITE_ID = "integrin"
+SPRITE_STATIC_PATH = "mimic/integrin_sprite.svg"
+
+# The CSS custom property which hides the alpha-I domain in the sprite.
+ALPHA_I_DISPLAY = "--alpha-I-display"
+
+# The sizes (widths in pixels) and formats of the raster images of the
+# diagrams, see `rasterize`.
+RASTER_SIZES = {
+    'thumbnail': 100,
+    'card': 200,
+    'retina': 400,
+}
+RASTER_FORMATS = ['png', 'webp']
+
+# Pixels per unit of the svg lengths, as used by cairosvg (96 dpi).
+UNITS = {
+    'px': 1,
+    'mm': 96 / 25.4,
+    'cm': 96 / 2.54,
+    'in': 96,
+    'pt': 96 / 72,
+}
+
+# The version of the diagram builders, part of the version of the diagrams
+# (see `diagram_version`). Increment it whenever the builders change the
+# diagrams they build, so no diagram of the previous builders is used.
+BUILDER_VERSION = 1
+
+# The DiagramStore shared by all diagram builders, see `get_diagram_store`.
+_DIAGRAM_STORE = None
+
+# Parsed svg files, by absolute filename. These are shared by all
+# IntegrinDiagram objects in the process, and must never be modified; see
+# `_get_template`.
+_TEMPLATES = {}
+
 # Map SVG element names to the Alpha monomer Structures it includes.
 ALPHA_DOMAIN_MAPPING = {
     "TMa_body": ["TMa"],
@@ -84,6 +137,40 @@ ELEMENT_NAMES = {
 }
 
 
+def _template_path(filename):
+    """ Return the absolute path of an svg file in this module's directory.
+    """
+
+    path = os.path.dirname(os.path.abspath(__file__))
+
+    return os.path.join(path, filename)
+
+
+def _get_template(filename):
+    """ Return the root element of the parsed svg file, parsing it on first
+    use only.
+
+    The namespace prefixes of the file are registered with ElementTree, so
+    that the diagrams are written with the same prefixes (and the svg
+    namespace as default namespace) as the original file.
+
+    Args:
+        filename (str): The absolute path of the svg file
+
+    Returns:
+        root (obj:`xml.etree.ElementTree.Element`): The parsed svg file. This
+            is shared, so it must be copied before it is altered.
+    """
+
+    if filename not in _TEMPLATES:
+        for _, (prefix, uri) in ET.iterparse(filename, events=('start-ns',)):
+            ET.register_namespace(prefix, uri)
+
+        _TEMPLATES[filename] = ET.parse(filename).getroot()
+
+    return _TEMPLATES[filename]
+
+
 class IntegrinDiagram(object):
     """ A class to manage manipulating the Integrin diagram.
 
@@ -112,21 +199,62 @@ class IntegrinDiagram(object):
 
     def __init__(self, filename='./integrin.svg'):
 
-        path = os.path.dirname(os.path.abspath(__file__))
-
-        # Set filename, and parse it.
-        self._filename = os.path.join(path, filename)
+        # Set filename, and copy its parsed template.
+        self._filename = _template_path(filename)
         self._parse_file()
 
     def _parse_file(self):
-        """ Parse self._filename is an XML object, and store the
-        minidom.Document object in self._dom.
+        """ Store a copy of the parsed self._filename (see `_get_template`) in
+        self._root.
+
+        The file itself is only parsed once per process, copying the parsed
+        tree is a lot cheaper than parsing it again.
         """
 
-        o = open(self._filename, 'r')
-        xml = o.read()
-        o.close()
-        self._dom = parseString(xml)
+        self._root = copy.deepcopy(_get_template(self._filename))
+        self._index_elements()
+
+    def _index_elements(self):
+        """ Index the elements of self._root by their ID.
+
+        Stores a dictionary mapping each ID to the list of elements (see
+        ELEMENTS) with that ID in self._elements, so that the elements do not
+        have to be searched for every change, and the parent of every element
+        in self._parents (ElementTree elements do not know their parent). The
+        parsed style dictionaries of changed elements are kept in
+        self._styles, and only written back to the elements by
+        `_write_styles`.
+        """
+
+        self._elements = {}
+        self._parents = {}
+        self._styles = {}
+
+        for parent in self._root.iter():
+            for element in parent:
+                if element.tag.rpartition('}')[2] in ELEMENTS:
+                    self._elements.setdefault(
+                        element.get('id'), []
+                    ).append(element)
+                    self._parents[element] = parent
+
+    def _svg_tag(self, name):
+        """ Return the ElementTree tag for an svg element 'name', in the
+        namespace of self._root.
+        """
+
+        namespace = self._root.tag.rpartition('}')[0]
+
+        return "{0}}}{1}".format(namespace, name)
+
+    def _write_styles(self):
+        """ Write the changed style dictionaries in self._styles back to the
+        style attributes of their elements.
+        """
+
+        for elem_id, sdicts in self._styles.items():
+            for element, sdict in zip(self._elements[elem_id], sdicts):
+                element.set('style', self._dict_to_style(sdict))
 
     def _style_to_dict(self, style):
         """ Convert the string of an svg style attributes to a dictionary, and
@@ -175,17 +303,8 @@ class IntegrinDiagram(object):
             value (str): The value to assign
         """
 
-        elements = []
-
-        for ELM in ELEMENTS:
-            elements.extend(
-                self._dom.getElementsByTagName(ELM)
-            )
-
-        for element in elements:
-            if element.getAttribute('id') == elem_id:
-                print("set: {0} to {1}".format(elem_id, value))
-                element.setAttribute(attr, value)
+        for element in self._elements.get(elem_id, []):
+            element.set(attr, value)
 
     def remove_element(self, elem_id):
         """ Remove a node from the tree.
@@ -193,24 +312,22 @@ class IntegrinDiagram(object):
             elem_id (str): The ID of the element to remove
         """
 
-        elements = []
+        for element in self._elements.pop(elem_id, []):
+            parent = self._parents.pop(element)
+            parent.remove(element)
 
-        for ELM in ELEMENTS:
-            elements.extend(
-                self._dom.getElementsByTagName(ELM)
-            )
-
-        for element in elements:
-            if element.getAttribute('id') == elem_id:
-                parent = element.parentNode
-                parent.removeChild(element)
+        self._styles.pop(elem_id, None)
 
     def change_element_style(self, elem_id, attr, value):
-        """ Change the a style attribute of an element in self._dom.
+        """ Change the a style attribute of an element in self._root.
 
         NOTE: at the moment, it only searches for elements defined in the
         ELEMENTS variable (rect, path and ellipse)
 
+        The style attribute of each element is only parsed the first time it
+        is changed, and written back to the element when the diagram is saved
+        (see `_write_styles`).
+
         Args:
             elem_id (str): The ID of the element to change
             attr(str): The style attribute to change
@@ -218,33 +335,34 @@ class IntegrinDiagram(object):
 
         """
 
-        elements = []
+        elements = self._elements.get(elem_id)
 
-        for ELM in ELEMENTS:
-            elements.extend(
-                self._dom.getElementsByTagName(ELM)
+        if not elements:
+            raise Exception(
+                "Could not find an element '{0}' in file!".format(elem_id)
             )
 
-        changed = 0
-
-        for element in elements:
-            if element.getAttribute('id') == elem_id:
-
-                style = element.getAttribute('style')
-
-                sdict = self._style_to_dict(style)
-                sdict[attr] = value
+        sdicts = self._styles.get(elem_id)
 
-                style = self._dict_to_style(sdict)
+        if sdicts is None:
+            sdicts = [
+                self._style_to_dict(element.get('style'))
+                for element in elements
+            ]
+            self._styles[elem_id] = sdicts
 
-                element.setAttribute('style', style)
+        for sdict in sdicts:
+            sdict[attr] = value
 
-                changed += 1
+    def add_title(self, elem_id, title):
+        """ Add a <title> (shown as tooltip by browsers) to an element.
+        Args:
+            elem_id (str): The ID of the element to change
+            title (str): The title
+        """
 
-        if changed == 0:
-            raise Exception(
-                "Could not find an element '{0}' in file!".format(elem_id)
-            )
+        for element in self._elements.get(elem_id, []):
+            ET.SubElement(element, self._svg_tag('title')).text = title
 
     def save_svg(self, filename):
         """ Save the IntegrinDiagram object to an svg file.
@@ -254,47 +372,253 @@ class IntegrinDiagram(object):
         """
 
         o = open(filename, 'w')
-        self._dom.writexml(o)
+        o.write(self.get_xml_str())
         o.close()
 
-    def save_png(self, filename):
-        """ Save the IntegrinDiagram object to a png file.
+    def get_xml_str(self):
+        """ Return the xml string
+        """
 
-        Args:
-            filename: Filename/path to save the png to.
+        self._write_styles()
 
-	This function uses the Cairo library (cairosvg) to convert the diagram
-        to a png (via scg2png).
-	"""
+        return ET.tostring(self._root, encoding='unicode')
 
-        stringio = StringIO(self.get_xml_str())
+    def get_sprite_str(self, symbol_id):
+        """ Return the xml string of an svg sprite, with the diagram as a
+        <symbol> with ID 'symbol_id'. The symbol can be shown with
+        <use href="<sprite url>#<symbol_id>"/>.
+        """
 
-        svg2png(file_obj=stringio, write_to=filename)
+        self._write_styles()
 
-    def get_xml_str(self):
-        """ Return the xml string
-        """
+        root = ET.Element(self._root.tag, {'version': '1.1'})
+        symbol = ET.SubElement(
+            root,
+            self._svg_tag('symbol'),
+            {'id': symbol_id, 'viewBox': self._root.get('viewBox')},
+        )
+        symbol.extend(list(self._root))
+
+        return ET.tostring(root, encoding='unicode')
+
+
+def _length_to_px(length):
+    """ Convert an svg length (e.g. '83.4mm') to pixels, see UNITS.
+    """
+
+    match = re.match(r"([\d.]+)\s*([a-z]*)$", length.strip())
+    number, unit = match.groups()
+
+    return float(number) * UNITS[unit or 'px']
+
+
+def rasterize(svg, sizes=RASTER_SIZES, formats=RASTER_FORMATS):
+    """ Convert an svg string (a diagram of integrin.svg) to raster images of
+    several sizes and formats.
+
+    The svg is rasterized only once by cairosvg, at the largest width, and
+    scaled down (with Pillow) to the other sizes.
 
-        return self._dom.toxml()
+    Args:
+        svg (str): The svg, e.g. from `IntegrinDiagram.get_xml_str`
+        sizes (dict): Widths in pixels, by size name. Default = RASTER_SIZES
+        formats (list): Pillow image formats. Default = RASTER_FORMATS
+
+    Returns:
+        images (dict): The image data (bytes), by size name and format.
+    """
+
+    width = max(sizes.values())
+    native_width = _length_to_px(sprite_dimensions()['width'])
+
+    png = svg2png(
+        bytestring=svg.encode('utf-8'), scale=width / native_width
+    )
+    rasterized = Image.open(BytesIO(png)).convert('RGBA')
+
+    images = {}
+
+    for name, size in sizes.items():
+        image = rasterized
 
+        if size != rasterized.width:
+            height = round(rasterized.height * size / rasterized.width)
+            image = rasterized.resize((size, height), Image.LANCZOS)
 
-def build_dimer_thumbnail(dimer, filepath):
-    """ Helper function that builds a Dimer object thumbnail, and saves it
+        images[name] = {}
+
+        for image_format in formats:
+            data = BytesIO()
+            image.save(data, image_format.upper())
+            images[name][image_format] = data.getvalue()
+
+    return images
+
+
+def template_hash(filename='./integrin.svg'):
+    """ Return the (sha1) hash of the contents of an svg template file.
 
     Args:
-        dimer (obj:`Dimer`): The Dimer object to create a thumbnail for
-        filepath (str): The location to save the file to.
+        filename: The name of the svg file, relative to this module. Default =
+            'integrin.svg'
+    """
+
+    with open(_template_path(filename), 'rb') as o:
+        return hashlib.sha1(o.read()).hexdigest()
+
+
+def diagram_version():
+    """ Return the version of the diagrams: the hash of the svg template and
+    the BUILDER_VERSION.
+    """
+
+    return "{0}-{1}".format(template_hash(), BUILDER_VERSION)
+
+
+def domain_coverage(pdbs, domain_field):
+    """ Return which Structures are covered by a set of Pdbs, using a single
+    query.
+
+    Args:
+        pdbs (obj:`QuerySet`): The Pdbs, e.g. `monomer.pdb_alpha.all()`
+        domain_field (str): The Pdb field with the covered Structures, one of
+            'alpha_domain' or 'beta_domain'
+
+    Returns:
+        coverage (dict): Mapping each covered Structure.short to the set of
+            PDB IDs that cover it.
+    """
+
+    coverage = {}
+
+    rows = pdbs.values_list(domain_field + '__short', 'pdb').order_by()
+
+    for short, pdb in rows:
+        if short is not None:
+            coverage.setdefault(short, set()).add(pdb)
+
+    return coverage
+
+
+def dimer_domain_coverage(dimer):
+    """ Return the domain coverage (see `domain_coverage`) of the Alpha and
+    the Beta subunit of a Dimer, using one query per subunit.
+
+    Args:
+        dimer (obj:`Dimer`): The Dimer to resolve the coverage for
+
+    Returns:
+        coverage (tuple): The Alpha and the Beta coverage dictionaries.
+    """
+
+    return (
+        domain_coverage(dimer.alpha.pdb_alpha.all(), 'alpha_domain'),
+        domain_coverage(dimer.beta.pdb_beta.all(), 'beta_domain'),
+    )
+
+
+def pdb_domain_coverage(pdb):
+    """ Return the domain coverage (see `domain_coverage`) of a single Pdb,
+    using one query per subunit.
+
+    Args:
+        pdb (obj:`Pdb`): The Pdb to resolve the coverage for
+
+    Returns:
+        coverage (tuple): The Alpha and the Beta coverage dictionaries.
+    """
+
+    return (
+        {
+            short: {pdb.pdb}
+            for short in pdb.alpha_domain.values_list('short', flat=True)
+        },
+        {
+            short: {pdb.pdb}
+            for short in pdb.beta_domain.values_list('short', flat=True)
+        },
+    )
+
+
+def covering_pdbs(coverage, domains):
+    """ Return the sorted PDB IDs that cover any of the Structures in
+    'domains', according to 'coverage' (see `domain_coverage`).
+    """
+
+    pdbs = set()
+
+    for domain in domains:
+        pdbs.update(coverage.get(domain, ()))
+
+    return sorted(pdbs)
+
+
+def covered_elements(mapping, coverage):
+    """ Return the sorted names of the elements in 'mapping' (e.g.
+    ALPHA_DOMAIN_MAPPING) which include any Structure in 'coverage' (see
+    `domain_coverage`).
+    """
+
+    return sorted(
+        element for element, domains in mapping.items()
+        if any(domain in coverage for domain in domains)
+    )
+
+
+def coverage_signature(alpha_coverage, beta_coverage, alpha_i=True):
+    """ Return the canonical signature of a diagram: the covered Alpha and
+    Beta elements, and whether the alpha-I domain is shown.
+
+    Diagrams with the same signature only differ in their popover content.
+
+    Returns:
+        signature (list): A json serializable signature.
+    """
+
+    return [
+        covered_elements(ALPHA_DOMAIN_MAPPING, alpha_coverage),
+        covered_elements(BETA_DOMAIN_MAPPING, beta_coverage),
+        alpha_i,
+    ]
+
+
+def get_diagram_store():
+    """ Return the DiagramStore for the diagrams of the Dimer and Pdb pages,
+    creating it on first use.
+
+    The diagrams are stored by `diagram_version`. The size and spill
+    directory are configured with the DIAGRAM_STORE_SIZE and
+    DIAGRAM_STORE_DIR settings.
+    """
+
+    global _DIAGRAM_STORE
+
+    if _DIAGRAM_STORE is None:
+        _DIAGRAM_STORE = DiagramStore(
+            diagram_version(),
+            size=getattr(settings, 'DIAGRAM_STORE_SIZE', 128),
+            directory=getattr(settings, 'DIAGRAM_STORE_DIR', None),
+        )
+
+    return _DIAGRAM_STORE
+
+
+def build_thumbnail_diagram(alpha_coverage, beta_coverage, alpha_i):
+    """ Helper function that builds and returns the IntegrinDiagram object for
+    a Dimer thumbnail, without any database access.
+
+    Args:
+        alpha_coverage (dict): The domain coverage of the Alpha subunit (see
+            `domain_coverage`). Only the keys are used.
+        beta_coverage (dict): The domain coverage of the Beta subunit.
+        alpha_i (bool): Whether the Alpha subunit has an alpha-I domain.
     """
 
     diagram = IntegrinDiagram()
 
     for element, domains in ALPHA_DOMAIN_MAPPING.items():
 
-        alpha_pbds = dimer.alpha.pdb_alpha.filter(
-            alpha_domain__short__in=domains
-            ).distinct()
-
-        present = bool(alpha_pbds.count())
+        present = bool(covering_pdbs(alpha_coverage, domains))
 
         diagram.change_element_style(
             element, 'fill', ALPHA_COLORMAP[present][0]
@@ -305,11 +629,7 @@ def build_dimer_thumbnail(dimer, filepath):
 
     for element, domains in BETA_DOMAIN_MAPPING.items():
 
-        beta_pbds = dimer.beta.pdb_beta.filter(
-            beta_domain__short__in=domains
-            ).distinct()
-
-        present = bool(beta_pbds.count())
+        present = bool(covering_pdbs(beta_coverage, domains))
 
         diagram.change_element_style(
             element, 'fill', BETA_COLORMAP[present][0]
@@ -318,16 +638,43 @@ def build_dimer_thumbnail(dimer, filepath):
             element, 'stroke', BETA_COLORMAP[present][1]
         )
 
-    if not dimer.alpha.structure.filter(short="alpha-I"):
+    if not alpha_i:
         diagram.remove_element("alpha-I")
         diagram.remove_element(ALPHA_I_LINK)
 
-    diagram.save_png(filepath)
+    return diagram
+
+
+def _build_dimer_base(alpha_coverage, beta_coverage, alpha_i):
+    """ Build the Dimer page diagram for a coverage signature, with
+    POPOVER_PLACEHOLDER as popover content, and return the xml string.
+    """
+
+    diagram = build_thumbnail_diagram(alpha_coverage, beta_coverage, alpha_i)
+
+    elements = (
+        covered_elements(ALPHA_DOMAIN_MAPPING, alpha_coverage) +
+        covered_elements(BETA_DOMAIN_MAPPING, beta_coverage)
+    )
+
+    for element in elements:
+        diagram.add_attr(element, 'data-toggle', 'popover',)
+        diagram.add_attr(element, 'data-placement', 'right',)
+        diagram.add_attr(element, 'data-title', ELEMENT_NAMES[element])
+        diagram.add_attr(
+            element, 'data-content', POPOVER_PLACEHOLDER.format(element)
+        )
+
+    return diagram.get_xml_str()
 
 
 def build_dimer_diagram(dimer):
     """ Helper function that builds and returns the IntegrinDiagram object for
     the Dimer page.
+
+    The diagram for the coverage signature of the Dimer is taken from the
+    DiagramStore (see `get_diagram_store`), only the popovers with the Pdbs
+    of this Dimer are filled in.
     """
 
     def build_popover_content(pdbs):
@@ -337,7 +684,7 @@ def build_dimer_diagram(dimer):
             for pdb in pdbs:
                 content += (
                     "<li><a href='{0}'>{1}</a></li>".format(
-                        reverse("pdb", args=[pdb.pdb]), pdb.pdb
+                        reverse("pdb", args=[pdb]), pdb
                     )
                 )
             content += "</ul>"
@@ -346,113 +693,170 @@ def build_dimer_diagram(dimer):
             content += "<p><strong>Pdbs:</strong>(none)</p>"
         return content
 
-    diagram = IntegrinDiagram()
+    alpha_coverage, beta_coverage = dimer_domain_coverage(dimer)
+    alpha_i = dimer.alpha.structure.filter(short="alpha-I").exists()
 
-    for element, domains in ALPHA_DOMAIN_MAPPING.items():
+    svg = get_diagram_store().get(
+        ['dimer', coverage_signature(alpha_coverage, beta_coverage, alpha_i)],
+        lambda: _build_dimer_base(alpha_coverage, beta_coverage, alpha_i),
+    )
 
-        alpha_pbds = dimer.alpha.pdb_alpha.filter(
-            alpha_domain__short__in=domains
-            ).distinct()
+    popovers = {}
 
-        present = bool(alpha_pbds.count())
+    for mapping, coverage in [(ALPHA_DOMAIN_MAPPING, alpha_coverage),
+                              (BETA_DOMAIN_MAPPING, beta_coverage)]:
+        for element, domains in mapping.items():
+            pdbs = covering_pdbs(coverage, domains)
+            if pdbs:
+                popovers[element] = escape(
+                    build_popover_content(pdbs), {'"': "&quot;"}
+                )
 
-        diagram.change_element_style(
-            element, 'fill', ALPHA_COLORMAP[present][0]
-        )
-        diagram.change_element_style(
-            element, 'stroke', ALPHA_COLORMAP[present][1]
-        )
+    return POPOVER_PATTERN.sub(lambda m: popovers[m.group(1)], svg)
 
-        if present:
 
-            content = build_popover_content(alpha_pbds)
+def _sprite_property(element, attr):
+    """ Return the name of the CSS custom property which sets the style
+    attribute 'attr' of 'element' in the sprite.
+    """
 
-            diagram.add_attr(element, 'data-toggle', 'popover',)
-            diagram.add_attr(element, 'data-placement', 'right',)
-            diagram.add_attr(element, 'data-title', ELEMENT_NAMES[element])
-            diagram.add_attr(element, 'data-content', content)
+    return "--{0}-{1}".format(element, attr)
 
-    for element, domains in BETA_DOMAIN_MAPPING.items():
 
-        beta_pbds = dimer.beta.pdb_beta.filter(
-            beta_domain__short__in=domains
-            ).distinct()
+def build_sprite():
+    """ Build the integrin sprite, and return the xml string.
 
-        present = bool(beta_pbds.count())
+    The sprite is the integrin diagram as a single <symbol> (SPRITE_ID) that
+    pages can <use>. Instead of fixed colors, the fill and stroke of every
+    domain element are CSS custom properties (see `sprite_style`), which
+    default to the colors of an uncovered domain. Every domain element gets
+    the 'integrin-domain' class, and its name as title. The alpha-I domain is
+    hidden by setting ALPHA_I_DISPLAY to 'none'.
+    """
 
+    diagram = IntegrinDiagram()
+
+    for mapping, colormap in [(ALPHA_DOMAIN_MAPPING, ALPHA_COLORMAP),
+                              (BETA_DOMAIN_MAPPING, BETA_COLORMAP)]:
+        for element in mapping:
+            for attr, color in zip(('fill', 'stroke'), colormap[0]):
+                diagram.change_element_style(
+                    element,
+                    attr,
+                    "var({0}, {1})".format(
+                        _sprite_property(element, attr), color
+                    ),
+                )
+
+            diagram.add_attr(element, 'class', 'integrin-domain')
+            diagram.add_title(element, ELEMENT_NAMES[element])
+
+    for element in ["alpha-I", ALPHA_I_LINK]:
         diagram.change_element_style(
-            element, 'fill', BETA_COLORMAP[present][0]
-        )
-        diagram.change_element_style(
-            element, 'stroke', BETA_COLORMAP[present][1]
+            element, 'display', "var({0}, inline)".format(ALPHA_I_DISPLAY)
         )
 
-        content = build_popover_content(beta_pbds)
+    return diagram.get_sprite_str(SPRITE_ID)
 
-        if present:
 
-            diagram.add_attr(element, 'data-toggle', 'popover',)
-            diagram.add_attr(element, 'data-placement', 'right',)
-            diagram.add_attr(element, 'data-title', ELEMENT_NAMES[element])
-            diagram.add_attr(element, 'data-content', content)
+def sprite_dimensions():
+    """ Return the width, height and viewBox of the integrin diagram, for the
+    <svg> element that shows the sprite.
+    """
 
-    if not dimer.alpha.structure.filter(short="alpha-I"):
-        diagram.remove_element("alpha-I")
-        diagram.remove_element(ALPHA_I_LINK)
+    root = _get_template(_template_path('./integrin.svg'))
 
-    return diagram.get_xml_str()
+    return {
+        'width': root.get('width'),
+        'height': root.get('height'),
+        'viewBox': root.get('viewBox'),
+    }
 
 
-def build_pdb_diagram(pdb):
-    """ Helper function that builds and returns the IntegrinDiagram object for
-    the Dimer page.
+def sprite_style(alpha_coverage, beta_coverage, alpha_i=True):
+    """ Return the CSS (custom properties) which colors the covered domains of
+    the sprite, and hides the alpha-I domain if needed.
+
+    Args:
+        alpha_coverage (dict): The domain coverage of the Alpha subunit (see
+            `domain_coverage`). Only the keys are used.
+        beta_coverage (dict): The domain coverage of the Beta subunit.
+        alpha_i (bool): Whether the alpha-I domain is shown. Default = True
+
+    Returns:
+        style (str): The style attribute for the <use> element of the sprite.
     """
 
-    diagram = IntegrinDiagram()
+    properties = []
 
-    for element, domains in ALPHA_DOMAIN_MAPPING.items():
+    for mapping, coverage, colormap in [
+            (ALPHA_DOMAIN_MAPPING, alpha_coverage, ALPHA_COLORMAP),
+            (BETA_DOMAIN_MAPPING, beta_coverage, BETA_COLORMAP)]:
+        for element in covered_elements(mapping, coverage):
+            for attr, color in zip(('fill', 'stroke'), colormap[1]):
+                properties.append(
+                    "{0}:{1}".format(_sprite_property(element, attr), color)
+                )
 
-        alpha_pbds = pdb.alpha_domain.filter(short__in=domains)
+    if not alpha_i:
+        properties.append("{0}:none".format(ALPHA_I_DISPLAY))
 
-        present = bool(alpha_pbds.count())
+    return ";".join(properties)
 
-        diagram.change_element_style(
-            element, 'fill', ALPHA_COLORMAP[present][0]
-        )
-        diagram.change_element_style(
-            element, 'stroke', ALPHA_COLORMAP[present][1]
-        )
 
-        if present:
+def build_dimer_sprite_style(dimer):
+    """ Helper function that returns the sprite style (see `sprite_style`)
+    for a Dimer.
+    """
 
-            diagram.add_attr(element, 'data-toggle', 'popover',)
-            diagram.add_attr(element, 'data-placement', 'right',)
-            diagram.add_attr(element, 'data-content', ELEMENT_NAMES[element])
+    alpha_coverage, beta_coverage = dimer_domain_coverage(dimer)
+    alpha_i = dimer.alpha.structure.filter(short="alpha-I").exists()
 
-    for element, domains in BETA_DOMAIN_MAPPING.items():
+    return sprite_style(alpha_coverage, beta_coverage, alpha_i)
 
-        beta_pbds = pdb.beta_domain.filter(short__in=domains)
 
-        present = bool(beta_pbds.count())
+def build_pdb_sprite_style(pdb):
+    """ Helper function that returns the sprite style (see `sprite_style`)
+    for a Pdb.
+    """
+
+    alpha_coverage, beta_coverage = pdb_domain_coverage(pdb)
+
+    return sprite_style(alpha_coverage, beta_coverage)
 
-        diagram.change_element_style(
-            element, 'fill', BETA_COLORMAP[present][0]
-        )
-        diagram.change_element_style(
-            element, 'stroke', BETA_COLORMAP[present][1]
-        )
 
-        if present:
+def benchmark(number=100):
+    """ Micro-benchmark the diagram manipulations of `build_dimer_diagram`,
+    without the database queries, and return the average time (in seconds)
+    per diagram.
 
+    Args:
+        number (int): The number of diagrams to build. Default = 100
+    """
+
+    import timeit
+
+    def build():
+        diagram = IntegrinDiagram()
+
+        for element in ALL_DOMAIN_MAPPING:
+            diagram.change_element_style(element, 'fill', ALPHA_COLORMAP[1][0])
+            diagram.change_element_style(
+                element, 'stroke', ALPHA_COLORMAP[1][1]
+            )
             diagram.add_attr(element, 'data-toggle', 'popover',)
             diagram.add_attr(element, 'data-placement', 'right',)
-            diagram.add_attr(element, 'data-content', ELEMENT_NAMES[element])
+            diagram.add_attr(element, 'data-title', ELEMENT_NAMES[element])
+            diagram.add_attr(element, 'data-content', element)
+
+        diagram.remove_element("alpha-I")
+        diagram.remove_element(ALPHA_I_LINK)
+
+        return diagram.get_xml_str()
+
+    return timeit.timeit(build, number=number) / number
 
-    return diagram.get_xml_str()
 
 if __name__ == "__main__":
 
-    diag = IntegrinDiagram('integrin.svg')
-    diag.change_element_style('calf2', 'fill', '#0000ff')
-    diag.change_element_style('calf2', 'stroke', '#00ff00')
-    diag.save("integrin_calf2.svg")
+    print("{0:.2f} ms per diagram".format(benchmark() * 1000))
@@ -0,0 +1,93 @@
+from django.db.models import Aggregate
+from django.db.models import Case
+from django.db.models import IntegerField
+from django.db.models import Max
+from django.db.models import TextField
+from django.db.models import Value
+from django.db.models import When
+
+# Separator used to join aggregated values. The "|" character is used as a
+# list separator throughout the curation sheets, so it never shows up inside a
+# single value.
+CONCAT_SEPARATOR = "|"
+
+
+class ConcatDistinct(Aggregate):
+    """ Aggregate the distinct values of a column into a single string.
+
+    On PostgreSQL this is STRING_AGG(DISTINCT <expression>, '|'). SQLite's
+    GROUP_CONCAT does not accept a custom separator together with DISTINCT, so
+    there the values are concatenated as is, and duplicates are left to
+    `split_concat` to remove.
+
+    Example use:
+
+    >>> ProteinInteractor.objects.values('protein').annotate(
+    ...     methods=ConcatDistinct('experimental_method'),
+    ... )
+
+    """
+
+    function = 'STRING_AGG'
+    template = "%(function)s(DISTINCT %(expressions)s, '{0}')".format(
+        CONCAT_SEPARATOR
+    )
+
+    def __init__(self, expression, **extra):
+        super(ConcatDistinct, self).__init__(
+            expression,
+            output_field=TextField(),
+            **extra
+        )
+
+    def as_sqlite(self, compiler, connection, **extra_context):
+        return super(ConcatDistinct, self).as_sql(
+            compiler,
+            connection,
+            function='GROUP_CONCAT',
+            template="%(function)s(%(expressions)s, '{0}')".format(
+                CONCAT_SEPARATOR
+            ),
+            **extra_context
+        )
+
+
+def any_match(**lookup):
+    """ Return an aggregate which is 1 if any row in the group matches
+    'lookup', and 0 otherwise.
+
+    Args:
+        lookup: A single field lookup, e.g. `xref__icontains="PDB"`
+
+    Example use:
+
+    >>> ProteinInteractor.objects.values('protein').annotate(
+    ...     bound_structure=any_match(xref__icontains="PDB"),
+    ... )
+
+    """
+
+    return Max(
+        Case(
+            When(then=Value(1), **lookup),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+
+
+def split_concat(value):
+    """ Split a string aggregated by `ConcatDistinct` and return the sorted,
+    distinct values as a list.
+
+    Args:
+        value (str): The aggregated string, may be None for empty groups.
+
+    Returns:
+        values (list): Sorted list of distinct values.
+    """
+
+    if not value:
+        return []
+
+    return sorted(set(value.split(CONCAT_SEPARATOR)))
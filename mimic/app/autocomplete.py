@@ -0,0 +1,322 @@
+import os
+import re
+
+from app.dataset_cache import DatasetCache
+from app.models import AlternativeName
+from app.models import Dimer
+from app.models import DimerToDrug
+from app.models import Drug
+from app.models import Monomer
+from app.models import ProteinInformation
+from app.models import ProteinInteractor
+from django.db.models import Count
+from django.urls import reverse
+
+# The maximum number of completions returned for a prefix.
+MAX_COMPLETIONS = 10
+
+# Separates the gene names of a ProteinInformation.
+GENE_SEPARATOR = re.compile(r"[\s;,]+")
+
+
+class _Node(object):
+    """ A node of the PrefixTrie.
+
+    Attributes:
+        children (dict): For the first character of each outgoing edge, a
+            tuple of the edge label and the child node
+        entries (list): The entries with the key ending at this node
+        top (list): The best entries in the subtree of this node
+    """
+
+    __slots__ = ('children', 'entries', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.entries = []
+        self.top = []
+
+
+class PrefixTrie(object):
+    """ A compressed prefix trie (radix tree) for completing keys, in which
+    every node stores the best entries of its subtree, so completing a prefix
+    only takes walking the prefix.
+
+    Args:
+        limit (int): The number of entries to keep per node. Default =
+            MAX_COMPLETIONS
+
+    Entries are dictionaries with at least a 'score' (higher is better), a
+    'label' and a 'url', which identifies the entry: an entry inserted with
+    several keys is returned only once.
+
+    Example use:
+
+    >>> trie = PrefixTrie()
+    >>> trie.insert('fibronectin', {'score': 5, 'label': ..., 'url': ...})
+    >>> trie.finalize()
+    >>> trie.complete('fibro')
+
+    """
+
+    def __init__(self, limit=MAX_COMPLETIONS):
+        self._limit = limit
+        self._root = _Node()
+
+    def insert(self, key, entry):
+        """ Add an entry with 'key'. Keys are matched case insensitively.
+        """
+
+        node = self._root
+        key = key.lower()
+
+        while key:
+            edge = node.children.get(key[0])
+
+            if edge is None:
+                child = _Node()
+                node.children[key[0]] = (key, child)
+                node = child
+                break
+
+            label, child = edge
+            common = len(os.path.commonprefix([label, key]))
+
+            if common < len(label):
+                # Split the edge at the end of the common prefix.
+                middle = _Node()
+                middle.children[label[common]] = (label[common:], child)
+                node.children[key[0]] = (label[:common], middle)
+                child = middle
+
+            node = child
+            key = key[common:]
+
+        node.entries.append(entry)
+
+    def _best(self, entries):
+        """ Return the best 'limit' entries, each url only once.
+        """
+
+        best = []
+        urls = set()
+
+        for entry in sorted(entries, key=lambda e: (-e['score'], e['label'])):
+            if entry['url'] not in urls:
+                urls.add(entry['url'])
+                best.append(entry)
+
+                if len(best) == self._limit:
+                    break
+
+        return best
+
+    def finalize(self):
+        """ Compute the best entries of every node. This must be called after
+        the last insert, and before completing.
+        """
+
+        # Visit the nodes depth first, and handle the children before their
+        # parent.
+        stack = [(self._root, False)]
+
+        while stack:
+            node, visited = stack.pop()
+
+            if visited:
+                entries = list(node.entries)
+                for _, child in node.children.values():
+                    entries.extend(child.top)
+                node.top = self._best(entries)
+            else:
+                stack.append((node, True))
+                stack.extend(
+                    (child, False) for _, child in node.children.values()
+                )
+
+    def complete(self, prefix, count=MAX_COMPLETIONS):
+        """ Return the best 'count' entries with a key starting with
+        'prefix'.
+        """
+
+        node = self._root
+        prefix = prefix.lower()
+
+        while prefix:
+            edge = node.children.get(prefix[0])
+
+            if edge is None:
+                return []
+
+            label, node = edge
+
+            if label.startswith(prefix):
+                break
+            if not prefix.startswith(label):
+                return []
+
+            prefix = prefix[len(label):]
+
+        return node.top[:count]
+
+
+def _entry(entry_type, label, url, score):
+    return {'type': entry_type, 'label': label, 'url': url, 'score': score}
+
+
+def _protein_entries():
+    """ Yield the (key, entry) pairs of the interacting proteins and
+    peptides, scored by their number of interactions.
+    """
+
+    interactors = ProteinInteractor.objects.values(
+        'protein_id', 'protein__uniprot', 'protein__peptide',
+    ).annotate(count=Count('id')).order_by()
+
+    information = {}
+    for protein_id, name, gene_name in ProteinInformation.objects.values_list(
+        'protein_id', 'name', 'gene_name',
+    ).order_by('-pk'):
+        information[protein_id] = (name, gene_name)
+
+    for row in interactors:
+        uniprot = row['protein__uniprot']
+
+        if uniprot == "-":
+            peptide = row['protein__peptide']
+            url = reverse('interactions', args=(row['protein_id'],))
+            yield peptide, _entry('peptide', peptide, url, row['count'])
+            continue
+
+        url = reverse('interactions', args=(uniprot,))
+        name, gene_name = information.get(row['protein_id'], (uniprot, "-"))
+        label = uniprot
+
+        if name != uniprot:
+            label = "{0} ({1})".format(name, uniprot)
+
+        entry = _entry('protein', label, url, row['count'])
+
+        yield uniprot, entry
+        yield name, entry
+
+        for gene in GENE_SEPARATOR.split(gene_name):
+            if gene not in ("", "-", "NA"):
+                yield gene, entry
+
+
+def _integrin_entries():
+    """ Yield the (key, entry) pairs of the Dimers and Monomers (with their
+    alternative names), scored by their number of interactions.
+    """
+
+    counts = {}
+    for target, count in ProteinInteractor.objects.values_list(
+        'target_integrin',
+    ).annotate(count=Count('id')).order_by():
+        key = target.lower().replace("/", "_")
+        counts[key] = counts.get(key, 0) + count
+
+    monomer_counts = {}
+
+    for dimer in Dimer.objects.select_related('alpha', 'beta'):
+        count = counts.get(dimer.lookup_name.lower(), 0)
+        entry = _entry(
+            'integrin',
+            dimer.display_name(),
+            reverse('dimer', args=(dimer.lookup_name,)),
+            count,
+        )
+        yield dimer.lookup_name, entry
+        yield dimer.display_name(), entry
+
+        for monomer in (dimer.alpha, dimer.beta):
+            monomer_counts[monomer.pk] = (
+                monomer_counts.get(monomer.pk, 0) + count
+            )
+
+    alternative_names = {}
+    for protein_id, name in AlternativeName.objects.values_list(
+        'protein_id', 'name',
+    ):
+        alternative_names.setdefault(protein_id, []).append(name)
+
+    for monomer in Monomer.objects.all():
+        entry = _entry(
+            'integrin',
+            monomer.display_name(),
+            reverse(monomer.subunit, args=(monomer.name,)),
+            monomer_counts.get(monomer.pk, 0),
+        )
+        yield monomer.name, entry
+        yield monomer.display_name(), entry
+        yield monomer.gene_name, entry
+
+        for name in alternative_names.get(monomer.protein_id, []):
+            yield name, entry
+
+
+def _drug_entries():
+    """ Yield the (key, entry) pairs of the Drugs, scored by their number of
+    target Dimers.
+    """
+
+    counts = dict(
+        DimerToDrug.objects.values_list('drug_id').annotate(
+            count=Count('id')
+        ).order_by()
+    )
+
+    for drug in Drug.objects.all():
+        entry = _entry(
+            'drug',
+            drug.name,
+            reverse('drug', args=(drug.name,)),
+            counts.get(drug.pk, 0),
+        )
+        yield drug.name, entry
+
+        if drug.marketing_name:
+            yield drug.marketing_name, entry
+
+
+def build_autocomplete_trie():
+    """ Build the PrefixTrie of all proteins, peptides, integrins and drugs.
+    """
+
+    trie = PrefixTrie()
+
+    for entries in (_protein_entries(), _integrin_entries(), _drug_entries()):
+        for key, entry in entries:
+            if key:
+                trie.insert(key, entry)
+
+    trie.finalize()
+
+    return trie
+
+
+# The trie of the current dataset version, kept in memory only.
+_TRIE_CACHE = DatasetCache(size=1, shared=False)
+
+
+def get_autocomplete_trie():
+    """ Return the PrefixTrie of the current dataset version, building it
+    first if needed.
+    """
+
+    return _TRIE_CACHE.get('app.autocomplete.trie', build_autocomplete_trie)
+
+
+def autocomplete(prefix, count=MAX_COMPLETIONS):
+    """ Return the best 'count' completions of 'prefix', as dictionaries with
+    the 'type', 'label', 'url' and 'score' of each.
+    """
+
+    prefix = prefix.strip()
+
+    if not prefix:
+        return []
+
+    return get_autocomplete_trie().complete(prefix, count)
+
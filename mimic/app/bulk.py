@@ -0,0 +1,206 @@
+from app.validation import VALUES_BATCH_SIZE
+from app.validation import validate_batch
+from django.conf import settings
+from django.db import connections
+from django.db import models
+from django.db import router
+
+
+def bulk_create(model, instances, batch_size=None, rows=None):
+    """ Validate and create the (unsaved) 'instances' of 'model', with
+    bulk_create.
+
+    Args:
+        model (class): The Model class of the instances
+        instances (list): The instances to create
+        batch_size (int, optional): The maximum number of instances created
+            per query, if the database allows it. Default =
+            settings.INGEST_BATCH_SIZE
+        rows (list, optional): The number of the sheet row each instance
+            was read from, reported with its errors (see
+            app.validation.validate_batch)
+
+    Raises:
+        ValidationError: If any instance is invalid, listing all errors
+
+    bulk_create neither calls save nor sends the pre_save signal, which
+    validates every saved instance (see app.models.pre_save_handler). The
+    instances are validated as a batch instead (see
+    app.validation.validate_batch), except for foreign keys, which are
+    resolved from a LookupTable, so they exist.
+    """
+
+    relations = [
+        field.name for field in model._meta.fields if field.is_relation
+    ]
+
+    validate_batch(model, instances, exclude=relations, rows=rows)
+
+    # Django does not limit the batch size to what the database allows, e.g.
+    # the maximum number of query parameters of SQLite.
+    ops = connections[router.db_for_write(model)].ops
+    max_batch_size = max(
+        ops.bulk_batch_size(model._meta.concrete_fields, instances), 1
+    )
+
+    model.objects.bulk_create(
+        instances,
+        batch_size=min(
+            batch_size or settings.INGEST_BATCH_SIZE, max_batch_size
+        ),
+    )
+
+
+class LookupTable(object):
+    """ An in-memory table of the instances of a model by the values of some
+    of their fields, to resolve foreign keys during an upload without a query
+    per row.
+
+    Args:
+        queryset (obj:`QuerySet`): The instances to look up
+        fields (tuple): The names of the fields identifying an instance
+        batch_size (int, optional): See `bulk_create`
+        values (iterable, optional): Only load the instances with one of
+            these values of the first field, e.g. those of a chunk of rows,
+            so the table does not grow with the whole model. Default = load
+            all instances
+
+    Instances are looked up by keyword, like with `QuerySet.get`. Missing
+    instances can be added with `get_or_add`. They are all created by `save`,
+    after which they can be used as foreign keys.
+
+    Example use:
+
+    >>> proteins = LookupTable(
+    ...     Protein.objects.all(), ('uniprot',), values=['P02751'],
+    ... )
+    >>> protein, added = proteins.get_or_add(uniprot='P02751')
+    >>> proteins.save()
+    >>> ProteinInformation(protein=proteins.get(uniprot='P02751'), ...)
+
+    """
+
+    def __init__(self, queryset, fields, batch_size=None, values=None):
+        self._queryset = queryset
+        self._model = queryset.model
+        self._fields = [self._model._meta.get_field(field) for field in fields]
+        self._batch_size = batch_size
+        self._values = None if values is None else list(dict.fromkeys(values))
+
+        self._instances = {}
+        self._added = []
+        self._rows = []
+
+        self.load()
+
+    def __len__(self):
+        return len(self._instances)
+
+    def _key(self, values):
+        """ Return the key of the instance with the field 'values' (by field
+        name), as they are stored. Related instances are looked up by their
+        primary key.
+        """
+
+        key = []
+
+        for field in self._fields:
+            value = values[field.name]
+
+            if isinstance(value, models.Model):
+                value = value.pk
+
+            key.append(field.to_python(value))
+
+        return tuple(key)
+
+    def _querysets(self):
+        """ Return the querysets of the instances to load, in batches of
+        values of the first field.
+        """
+
+        if self._values is None:
+            return [self._queryset]
+
+        lookup = "{0}__in".format(self._fields[0].name)
+
+        return [
+            self._queryset.filter(**{
+                lookup: self._values[start:start + VALUES_BATCH_SIZE],
+            })
+            for start in range(0, len(self._values), VALUES_BATCH_SIZE)
+        ]
+
+    def load(self):
+        """ (Re)load all instances (with one of the values) from the
+        database. Of several instances with the same key, the first one (by
+        primary key) is used.
+        """
+
+        self._instances = {}
+
+        for queryset in self._querysets():
+            for instance in queryset.order_by('-pk'):
+                key = tuple(
+                    getattr(instance, field.attname) for field in self._fields
+                )
+                self._instances[key] = instance
+
+    def get(self, **values):
+        """ Return the instance with the field 'values'.
+
+        Raises:
+            DoesNotExist: If there is no such instance
+        """
+
+        try:
+            return self._instances[self._key(values)]
+        except KeyError:
+            raise self._model.DoesNotExist(
+                "{0} matching query does not exist: {1}".format(
+                    self._model.__name__,
+                    ", ".join(
+                        "{0}={1!r}".format(field, value)
+                        for field, value in sorted(values.items())
+                    ),
+                )
+            )
+
+    def get_or_add(self, defaults=None, row=None, **values):
+        """ Return the instance with the field 'values', adding a new
+        (unsaved) instance with those and the 'defaults' field values if
+        there is none. The number of the sheet 'row' it is added for is
+        reported with its errors on save.
+
+        Returns:
+            (instance, added): The instance, and whether it was added
+        """
+
+        key = self._key(values)
+
+        if key in self._instances:
+            return self._instances[key], False
+
+        fields = dict(values)
+        fields.update(defaults or {})
+
+        instance = self._model(**fields)
+        self._instances[key] = instance
+        self._added.append(instance)
+        self._rows.append(row)
+
+        return instance, True
+
+    def save(self):
+        """ Create all added instances, and reload the table so they have
+        their primary keys.
+        """
+
+        if not self._added:
+            return
+
+        bulk_create(self._model, self._added, self._batch_size, self._rows)
+
+        self._added = []
+        self._rows = []
+        self.load()
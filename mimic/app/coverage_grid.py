@@ -0,0 +1,104 @@
+from IntegrinDiagram.integrinDiagram import ALPHA_DOMAIN_MAPPING
+from IntegrinDiagram.integrinDiagram import BETA_DOMAIN_MAPPING
+from IntegrinDiagram.integrinDiagram import covered_elements
+from IntegrinDiagram.integrinDiagram import sprite_style
+
+from app.dataset_cache import dataset_cache
+from app.models import Dimer
+from app.models import MonomerToStructure
+from app.models import Pdb
+
+# The cache key under which the coverage grid is stored.
+COVERAGE_GRID_KEY = 'app.coverage_grid'
+
+
+def _monomer_coverage():
+    """ Return the Structures covered by the Pdbs of every Monomer, with a
+    single query over both Pdb.alpha_domain and Pdb.beta_domain.
+
+    Returns:
+        coverage (dict): The set of covered Structure.short values, by
+            Monomer id.
+    """
+
+    alpha = Pdb.alpha_domain.through.objects.values_list(
+        'pdb__alpha_id', 'structure__short'
+    )
+    beta = Pdb.beta_domain.through.objects.values_list(
+        'pdb__beta_id', 'structure__short'
+    )
+
+    coverage = {}
+
+    for monomer_id, short in alpha.union(beta):
+        if monomer_id is not None:
+            coverage.setdefault(monomer_id, set()).add(short)
+
+    return coverage
+
+
+def compute_coverage_grid():
+    """ Compute the domain coverage of all Dimers, as a grid of Alpha (rows)
+    and Beta (columns) subunits.
+
+    Returns:
+        grid (dict): with the keys 'betas' (the column headers) and 'rows',
+            a list of dictionaries with the 'alpha' header and the 'cells'.
+            Each cell is None if there is no such Dimer, or a dictionary with
+            the lookup_name, display_name, the number of 'covered' elements,
+            and the 'style' for the integrin sprite.
+    """
+
+    dimers = list(
+        Dimer.objects.select_related('alpha', 'beta').order_by(
+            'alpha_id', 'beta_id'
+        )
+    )
+    coverage = _monomer_coverage()
+    alpha_i = set(
+        MonomerToStructure.objects.filter(
+            structure__short="alpha-I"
+        ).values_list('monomer_id', flat=True)
+    )
+
+    alphas = sorted(set(d.alpha for d in dimers), key=lambda m: m.pk)
+    betas = sorted(set(d.beta for d in dimers), key=lambda m: m.pk)
+    cells = {}
+
+    for dimer in dimers:
+        alpha_coverage = coverage.get(dimer.alpha_id, set())
+        beta_coverage = coverage.get(dimer.beta_id, set())
+
+        cells[dimer.alpha_id, dimer.beta_id] = {
+            'lookup_name': dimer.lookup_name,
+            'display_name': dimer.display_name(),
+            'covered': (
+                len(covered_elements(ALPHA_DOMAIN_MAPPING, alpha_coverage)) +
+                len(covered_elements(BETA_DOMAIN_MAPPING, beta_coverage))
+            ),
+            'style': sprite_style(
+                alpha_coverage, beta_coverage, dimer.alpha_id in alpha_i
+            ),
+        }
+
+    return {
+        'betas': [beta.display_name() for beta in betas],
+        'rows': [
+            {
+                'alpha': alpha.display_name(),
+                'cells': [cells.get((alpha.pk, beta.pk)) for beta in betas],
+            }
+            for alpha in alphas
+        ],
+    }
+
+
+def get_coverage_grid():
+    """ Return the coverage grid (see `compute_coverage_grid`) from the
+    dataset cache, computing and storing it first if needed.
+
+    The grid is recomputed whenever the dataset version changes, see
+    `app.dataset_cache`.
+    """
+
+    return dataset_cache.get(COVERAGE_GRID_KEY, compute_coverage_grid)
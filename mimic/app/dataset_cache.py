@@ -0,0 +1,244 @@
+import functools
+import threading
+
+from collections import OrderedDict
+from collections import namedtuple
+
+from app.models import DatasetVersion
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import F
+from django.utils import timezone
+
+# The cache key under which the current DatasetStamp is stored.
+DATASET_VERSION_KEY = 'app.dataset_version'
+
+# The number of seconds a DatasetStamp read from the database is cached. A
+# process can read the version just before it is bumped, and cache it just
+# after: the stale version is then used for at most this long.
+DATASET_VERSION_TIMEOUT = 60
+
+# Returned by the shared cache for missing keys, so None can be cached.
+_MISSING = object()
+
+
+class DatasetStamp(namedtuple('DatasetStamp', ['version', 'updated'])):
+    """ The version of the data, and when it last changed.
+    """
+
+    __slots__ = ()
+
+    @property
+    def token(self):
+        """ A string identifying this version. It includes the time of the
+        change, so versions of a rebuilt database never collide with old
+        cache entries.
+        """
+
+        return "{0}-{1}".format(
+            self.version, int(self.updated.timestamp() * 1000000)
+        )
+
+
+def _shared_cache():
+    """ Return the Django cache shared by all processes, see
+    settings.DATASET_CACHE_BACKEND.
+    """
+
+    return caches[settings.DATASET_CACHE_BACKEND]
+
+
+def _load_dataset_version():
+    """ Return the current DatasetStamp, from the database.
+    """
+
+    dataset_version = DatasetVersion.load()
+
+    return DatasetStamp(dataset_version.version, dataset_version.updated)
+
+
+def get_dataset_version():
+    """ Return the current DatasetStamp. It is read from the shared cache, so
+    in steady state this rarely queries the database.
+    """
+
+    stamp = _shared_cache().get(DATASET_VERSION_KEY)
+
+    if stamp is None:
+        stamp = _load_dataset_version()
+        _shared_cache().set(
+            DATASET_VERSION_KEY, stamp, DATASET_VERSION_TIMEOUT
+        )
+
+    return stamp
+
+
+def bump_dataset_version():
+    """ Increment the dataset version, invalidating everything cached under
+    the previous version. This should be called whenever data has been
+    uploaded or deleted.
+
+    Returns:
+        stamp (DatasetStamp): The new version
+    """
+
+    DatasetVersion.load()
+    DatasetVersion.objects.filter(pk=1).update(
+        version=F('version') + 1, updated=timezone.now()
+    )
+
+    # The new stamp replaces the old one, rather than deleting it: another
+    # process could otherwise cache the old version it read before the bump.
+    stamp = _load_dataset_version()
+    _shared_cache().set(DATASET_VERSION_KEY, stamp, None)
+    dataset_cache.clear()
+
+    return stamp
+
+
+class DatasetCache(object):
+    """ A cache for values computed from the data, keyed by the dataset
+    version, so values are never returned after the data has changed.
+
+    Args:
+        size (int): The maximum number of values to keep in memory.
+            Default = 128
+        shared (bool): Whether to also store the values in the shared cache.
+            Default = True
+
+    Values are kept in a local memory LRU, in front of the shared Django
+    cache (settings.DATASET_CACHE_BACKEND), so they are computed once for
+    all processes of a multi-worker deployment. Caches for many small values
+    (e.g. template fragments) can be kept in memory only.
+
+    The number of hits (in memory or in the shared cache) and misses are
+    counted, see `stats`.
+
+    Example use:
+
+    >>> statistics = dataset_cache.get('statistics', compute_statistics)
+
+    """
+
+    def __init__(self, size=128, shared=True):
+
+        self._size = size
+        self._shared = shared
+
+        self._values = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _versioned_key(key, stamp):
+        """ Return the key under which 'key' is stored for the DatasetStamp
+        'stamp'.
+        """
+
+        return "app.dataset.{0}.{1}".format(stamp.token, key)
+
+    def _remember(self, key, value):
+        """ Keep a value in memory, evicting the least recently used value if
+        the cache is full.
+        """
+
+        with self._lock:
+            self._values[key] = value
+            self._values.move_to_end(key)
+
+            while len(self._values) > self._size:
+                self._values.popitem(last=False)
+
+    def get(self, key, compute):
+        """ Return the value for 'key' in the current dataset version,
+        computing it if it is neither in memory nor in the shared cache.
+
+        Args:
+            key (str): A name for the value, unique in the whole site
+            compute (callable): Function without arguments which computes and
+                returns the value for 'key'. The value must be picklable.
+
+        Returns:
+            value: The value for 'key'
+        """
+
+        key = self._versioned_key(key, get_dataset_version())
+
+        with self._lock:
+            if key in self._values:
+                self.hits += 1
+                self._values.move_to_end(key)
+                return self._values[key]
+
+        value = _MISSING
+
+        if self._shared:
+            value = _shared_cache().get(key, _MISSING)
+
+        if value is _MISSING:
+            self.misses += 1
+            value = compute()
+
+            if self._shared:
+                _shared_cache().set(key, value, None)
+        else:
+            self.hits += 1
+
+        self._remember(key, value)
+
+        return value
+
+    def clear(self):
+        """ Remove all values from memory. Values in the shared cache are
+        kept, but are not returned once the version has changed.
+        """
+
+        with self._lock:
+            self._values.clear()
+
+    def stats(self):
+        """ Return the number of 'hits', 'misses' and values in memory
+        ('size').
+        """
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'size': len(self),
+        }
+
+    def __len__(self):
+        return len(self._values)
+
+
+# The cache used by the whole site.
+dataset_cache = DatasetCache(settings.DATASET_CACHE_SIZE)
+
+# The cache for rendered template fragments, see the dataset_fragment tag.
+fragment_cache = DatasetCache(settings.FRAGMENT_CACHE_SIZE, shared=False)
+
+
+def dataset_cached(name):
+    """ Decorator which caches the results of a function in the
+    dataset_cache, by 'name' and the (string) arguments of the call.
+
+    Example use:
+
+    >>> @dataset_cached('app.structures.records')
+    ... def structure_records():
+    ...     return compute_records()
+
+    """
+
+    def decorator(function):
+
+        @functools.wraps(function)
+        def wrapper(*args):
+            key = ":".join([name] + [str(arg) for arg in args])
+            return dataset_cache.get(key, lambda: function(*args))
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,77 @@
+import re
+
+# Functions which render data fields as HTML. They are run once, when the data
+# is uploaded, and the results are stored in the "*_html" fields of the models
+# (see e.g. ProteinInteractor.save), so the templates output them as they are.
+
+# A number with more than 4 decimals.
+LONG_DECIMAL_PATTERN = re.compile(r"(\d+\.\d{5}).*")
+
+# A PubMed reference in a text, e.g. "PubMed:7989369"
+PUBMED_PATTERN = re.compile(r"PubMed\:(\d+)")
+PUBMED_LINK = (
+    '<a href = "https://pubmed.ncbi.nlm.nih.gov/\\1/"'
+    'target = "_blank" class ="btn btn-rounded btn-info">\\1</a>'
+)
+
+
+def integrin_name(text):
+    """ Replace "alpha-" and "beta-" by Greek letters, e.g. "alpha-5_beta-1"
+    becomes "&alpha;5_&beta;1".
+    """
+
+    text = text.replace("alpha-", "&alpha;")
+    text = text.replace("beta-", "&beta;")
+    return text
+
+
+def kd(name):
+    """ Format the dissociation constant "Kd" with a subscript.
+    """
+
+    new_name = name
+    if "Kd=" in name:
+        name = name.split("Kd")
+        new_name = name[0] + "K<sub>d</sub>" + name[1]
+    return new_name
+
+
+def ionindex(name):
+    """ Format ion charges as superscripts, arrows and the dissociation
+    constant "Kd".
+    """
+
+    if "2+" in name:
+        name = name.replace("2+", "<sup>2+</sup>")
+    if "3+" in name:
+        name = name.replace("3+", "<sup>3+</sup>")
+    if " ->" in name:
+        name = name.replace("->", " &#129058; ")
+    if "Kd=" in name:
+        name = name.replace("Kd=", "K<sub>d</sub>=")
+    return name
+
+
+def function_pubmed_link(text):
+    """ Replace all "PubMed:<id>" references in a text by links to PubMed.
+    """
+
+    return PUBMED_PATTERN.sub(PUBMED_LINK, text)
+
+
+def three_digit_round(string):
+    """ Round all numbers with more than 4 decimals in a ";" separated list
+    to 4 decimals.
+    """
+
+    if ";" in string:
+        temp = []
+        for val in string.split(";"):
+            val = val.strip()
+            if LONG_DECIMAL_PATTERN.search(val):
+                val = str(round(float(val), 4))
+            temp.append(val)
+        string = "; ".join(temp)
+    elif LONG_DECIMAL_PATTERN.search(string):
+        string = round(float(string), 4)
+    return string
@@ -0,0 +1,275 @@
+import math
+import re
+
+from app.dataset_cache import DatasetCache
+from app.models import ProteinInformation
+from app.models import ProteinInteractor
+from app.models import ProteinSummary
+from django.db import connection
+
+# The minimum similarity of a fuzzy match, pg_trgm's default
+# word_similarity_threshold.
+SIMILARITY_THRESHOLD = 0.6
+
+# The words of a text, everything else separates words (as in pg_trgm).
+WORD_PATTERN = re.compile(r"[^\W_]+")
+
+# The columns searched by a fuzzy search, as (table, column). Each row has a
+# protein_id.
+FUZZY_COLUMNS = (
+    ('app_proteininteractor', 'name'),
+    ('app_proteininformation', 'name'),
+    ('app_proteininformation', 'organism_scientific'),
+)
+
+# The number of ProteinSummary ids filtered by at once, to stay below the
+# SQLite limit of query parameters.
+_ID_BATCH_SIZE = 500
+
+
+def _index_name(table, column):
+    return "{0}_{1}_trgm".format(table, column)
+
+
+def create_fuzzy_index(schema_editor):
+    """ Create the pg_trgm GIN indexes of FUZZY_COLUMNS on Postgres. Other
+    databases use an in-memory TrigramIndex instead.
+    """
+
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for table, column in FUZZY_COLUMNS:
+        schema_editor.execute(
+            "CREATE INDEX {0} ON {1} USING gin({2} gin_trgm_ops)".format(
+                _index_name(table, column), table, column
+            )
+        )
+
+
+def drop_fuzzy_index(schema_editor):
+    """ Remove the indexes created by `create_fuzzy_index`.
+    """
+
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+
+    for table, column in FUZZY_COLUMNS:
+        schema_editor.execute(
+            "DROP INDEX IF EXISTS {0}".format(_index_name(table, column))
+        )
+
+
+def trigrams(text):
+    """ Return the set of trigrams of a text, as pg_trgm computes them: the
+    lower case words, padded with two spaces in front and one behind, are
+    split into all their 3 character substrings.
+
+    >>> sorted(trigrams("Cat"))
+    ['  c', ' ca', 'at ', 'cat']
+
+    """
+
+    result = set()
+
+    for word in WORD_PATTERN.findall(text.lower()):
+        padded = "  {0} ".format(word)
+        result.update(padded[i:i + 3] for i in range(len(padded) - 2))
+
+    return result
+
+
+class TrigramIndex(object):
+    """ An inverted index from trigrams to the names containing them, to
+    find the names similar to a (misspelled) query without comparing it to
+    every name.
+
+    Args:
+        names (iterable): The names to index
+
+    The similarity of a name is the fraction of the trigrams of the query
+    which it contains, an approximation of pg_trgm's word_similarity: a
+    query similar to any part of a long name matches it.
+
+    Example use:
+
+    >>> index = TrigramIndex(["Fibronectin", "Vitronectin"])
+    >>> index.search("fibronectn")
+    [('Fibronectin', 0.818...)]
+
+    """
+
+    def __init__(self, names):
+        self._names = []
+        self._trigrams = []
+        self._postings = {}
+
+        for name in sorted(set(names)):
+            name_trigrams = frozenset(trigrams(name))
+
+            for trigram in name_trigrams:
+                self._postings.setdefault(trigram, []).append(len(self._names))
+
+            self._names.append(name)
+            self._trigrams.append(name_trigrams)
+
+    def __len__(self):
+        return len(self._names)
+
+    def search(self, query, threshold=SIMILARITY_THRESHOLD):
+        """ Return the names with a similarity to 'query' of at least
+        'threshold', as (name, similarity) tuples, most similar first.
+        """
+
+        query = trigrams(query)
+
+        if not query:
+            return []
+
+        required = max(1, math.ceil(threshold * len(query)))
+
+        # A name containing 'required' of the query trigrams contains at
+        # least one of any len(query) - required + 1 of them, so only the
+        # names containing one of the rarest trigrams are compared.
+        rarest = sorted(query, key=lambda t: len(self._postings.get(t, ())))
+        candidates = set()
+
+        for trigram in rarest[:len(query) - required + 1]:
+            candidates.update(self._postings.get(trigram, ()))
+
+        matches = []
+
+        for candidate in candidates:
+            shared = len(query & self._trigrams[candidate])
+
+            if shared >= required:
+                matches.append((
+                    self._names[candidate], shared / len(query),
+                ))
+
+        return sorted(matches, key=lambda match: (-match[1], match[0]))
+
+
+class _NameIndex(object):
+    """ A TrigramIndex of the names in FUZZY_COLUMNS, and the Proteins of
+    each name.
+    """
+
+    def __init__(self):
+        self.proteins = {}
+
+        querysets = (
+            ProteinInteractor.objects.values_list('name', 'protein_id'),
+            ProteinInformation.objects.values_list('name', 'protein_id'),
+            ProteinInformation.objects.values_list(
+                'organism_scientific', 'protein_id'
+            ),
+        )
+
+        for queryset in querysets:
+            for name, protein_id in queryset.distinct().order_by():
+                self.proteins.setdefault(name, set()).add(protein_id)
+
+        self.index = TrigramIndex(self.proteins)
+
+
+# The _NameIndex of the current dataset version, kept in memory only.
+_INDEX_CACHE = DatasetCache(size=1, shared=False)
+
+
+def _memory_protein_scores(query):
+    """ Return the best similarity of any name of each Protein matching
+    'query', using the in-memory TrigramIndex.
+    """
+
+    names = _INDEX_CACHE.get('app.fuzzy_search.index', _NameIndex)
+    scores = {}
+
+    for name, score in names.index.search(query):
+        for protein_id in names.proteins[name]:
+            scores[protein_id] = max(score, scores.get(protein_id, 0))
+
+    return scores
+
+
+def _postgres_protein_scores(query):
+    """ Return the best similarity of any name of each Protein matching
+    'query', using the pg_trgm GIN indexes.
+    """
+
+    matches = " UNION ALL ".join(
+        "SELECT protein_id, word_similarity(%s, {0}) AS score FROM {1} "
+        "WHERE %s <%% {0}".format(column, table)
+        for table, column in FUZZY_COLUMNS
+    )
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SET pg_trgm.word_similarity_threshold = %s",
+            [SIMILARITY_THRESHOLD]
+        )
+        cursor.execute(
+            "SELECT protein_id, MAX(score) FROM ({0}) matches "
+            "GROUP BY protein_id".format(matches),
+            [query, query] * len(FUZZY_COLUMNS)
+        )
+
+        return dict(cursor.fetchall())
+
+
+class SearchResults(object):
+    """ The ranked ProteinSummary instances matching a query. The ids of all
+    matches are read when searching, but the instances are only fetched for
+    the slices (e.g. pages) that are used.
+
+    Args:
+        ids (list): The ids of the matching ProteinSummary instances, best
+            matches first
+    """
+
+    def __init__(self, ids):
+        self._ids = ids
+
+    def __len__(self):
+        return len(self._ids)
+
+    def count(self):
+        return len(self._ids)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+
+        ids = self._ids[index]
+        summaries = ProteinSummary.objects.in_bulk(ids)
+
+        return [summaries[pk] for pk in ids if pk in summaries]
+
+
+def fuzzy_search_protein_summaries(query):
+    """ Search the ProteinSummary instances with an interactor name, protein
+    name or organism similar to 'query', so misspelled names are found too.
+
+    Returns:
+        results (SearchResults): The matching ProteinSummary instances, the
+            most similar first
+    """
+
+    if connection.vendor == 'postgresql':
+        scores = _postgres_protein_scores(query)
+    else:
+        scores = _memory_protein_scores(query)
+
+    protein_ids = list(scores)
+    summaries = []
+
+    for start in range(0, len(protein_ids), _ID_BATCH_SIZE):
+        summaries.extend(ProteinSummary.objects.filter(
+            protein_id__in=protein_ids[start:start + _ID_BATCH_SIZE]
+        ).values_list('id', 'protein_id', 'position'))
+
+    summaries.sort(key=lambda summary: (-scores[summary[1]], summary[2]))
+
+    return SearchResults([summary[0] for summary in summaries])
@@ -0,0 +1,149 @@
+import contextlib
+import hashlib
+import signal
+import threading
+
+from app.models import IngestCheckpoint
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+
+def file_hash(filename):
+    """ Return the SHA-256 hash of the contents of the file 'filename', as a
+    hexadecimal string.
+    """
+
+    sha256 = hashlib.sha256()
+
+    with open(filename, 'rb') as handle:
+        for block in iter(lambda: handle.read(1 << 16), b''):
+            sha256.update(block)
+
+    return sha256.hexdigest()
+
+
+def clear_checkpoints():
+    """ Forget the progress of all uploads. Once data is deleted, an upload
+    can not be resumed where it stopped.
+    """
+
+    IngestCheckpoint.objects.all().delete()
+
+
+def _raise_interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+@contextlib.contextmanager
+def _interrupt_on_sigterm():
+    """ Raise KeyboardInterrupt on SIGTERM (e.g. from `kill` or a process
+    manager stopping the upload) as on Ctrl-C, while in the context.
+
+    Signal handlers can only be set in the main thread: elsewhere, SIGTERM
+    is left as it is, and only Ctrl-C interrupts an upload.
+    """
+
+    if threading.current_thread() is not threading.main_thread():
+        yield
+        return
+
+    previous = signal.signal(signal.SIGTERM, _raise_interrupt)
+
+    try:
+        yield
+    finally:
+        signal.signal(signal.SIGTERM, previous)
+
+
+def upload_file(parser, filename, chunks, upload_chunk, resume=False):
+    """ Upload the 'chunks' of rows of the file 'filename' in a transaction,
+    with a savepoint and a checkpoint per chunk.
+
+    Args:
+        parser (str): The name of the parser uploading the file
+        filename (str): The name of the file the rows are from
+        chunks (iterable): The chunks of rows of the file, in order, as
+            DataFrames indexed by the number of the row in the sheet
+        upload_chunk (callable): Uploads a single chunk of rows
+        resume (bool): Whether to skip what an earlier upload of the same
+            file (with the same parser) finished. Default = False
+
+    Returns:
+        bool: False if the upload was skipped, as the file was already
+            uploaded, and True otherwise
+
+    Raises:
+        ValidationError: If any chunk is invalid, with the messages of all
+            invalid chunks
+
+    If an error occurs, the upload of the file is rolled back as a whole.
+    After an invalid chunk, the following chunks are still uploaded (and
+    rolled back), so the errors of the whole file are reported at once.
+
+    An interrupt (Ctrl-C or SIGTERM), while a chunk is read or uploaded, rolls
+    back only that chunk: the previous chunks are committed with their
+    checkpoint, so the upload can be resumed after the last uploaded row, even
+    if the file is then read in chunks of another size. Once a chunk was
+    invalid, there is nothing to resume, and an interrupt rolls back the whole
+    file.
+    """
+
+    checkpoint, _ = IngestCheckpoint.objects.get_or_create(
+        parser=parser, file_hash=file_hash(filename),
+    )
+
+    if resume and checkpoint.finished:
+        return False
+
+    start = checkpoint.row if resume else 0
+    interrupt = None
+    errors = []
+
+    with _interrupt_on_sigterm(), transaction.atomic():
+        if not resume:
+            checkpoint.row = 0
+            checkpoint.finished = False
+            checkpoint.save()
+
+        chunks = iter(chunks)
+
+        while True:
+            try:
+                # Reading the next chunk can be interrupted too, it often
+                # takes longer than uploading it.
+                chunk = next(chunks, None)
+
+                if chunk is None:
+                    break
+
+                # Skip the rows uploaded before, by their number, as the
+                # chunks may not be the same as then.
+                chunk = chunk[chunk.index > start]
+
+                if not chunk.empty:
+                    with transaction.atomic():
+                        upload_chunk(chunk)
+
+                        checkpoint.row = int(chunk.index[-1])
+                        checkpoint.save()
+            except ValidationError as error:
+                # The following chunks are still checked, for a single report
+                errors.extend(error.messages)
+            except KeyboardInterrupt as error:
+                if errors:
+                    raise
+
+                interrupt = error
+                break
+
+        if errors:
+            raise ValidationError(errors)
+
+        if interrupt is None:
+            checkpoint.finished = True
+            checkpoint.save()
+
+    if interrupt is not None:
+        raise interrupt
+
+    return True
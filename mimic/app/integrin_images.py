@@ -0,0 +1,83 @@
+import json
+import os
+
+from django.conf import settings
+from django.templatetags.static import static
+
+# The directory with the pre-built diagram images, and its static url prefix.
+INTEGRINS_STATIC_PATH = 'mimic/integrins'
+INTEGRINS_PATH = os.path.join(
+    settings.BASE_DIR, 'mimic', 'static', *INTEGRINS_STATIC_PATH.split('/')
+)
+
+# The manifest written by the generate_integrin_diagrams command. It maps
+# every Dimer (by lookup_name) and Pdb (by PDB ID) to the key of its diagram,
+# and every diagram key to its image files, by size and format.
+MANIFEST_PATH = INTEGRINS_PATH + '.json'
+
+# For each size, the size to use for high resolution (2x) screens.
+HIGH_RESOLUTION = {
+    'thumbnail': 'card',
+    'card': 'retina',
+}
+
+# The last loaded manifest, and the modification time of its file.
+_MANIFEST = {'mtime': None, 'manifest': {}}
+
+
+def load_image_manifest():
+    """ Return the image manifest (see MANIFEST_PATH), or an empty dictionary
+    if there is none. The file is only read again when it has changed.
+    """
+
+    try:
+        mtime = os.path.getmtime(MANIFEST_PATH)
+    except OSError:
+        return {}
+
+    if _MANIFEST['mtime'] != mtime:
+        with open(MANIFEST_PATH, 'r') as o:
+            _MANIFEST['manifest'] = json.load(o)
+        _MANIFEST['mtime'] = mtime
+
+    return _MANIFEST['manifest']
+
+
+def get_integrin_images(kind, name, size='card'):
+    """ Return the urls of the pre-built diagram images of a Dimer or Pdb.
+
+    Args:
+        kind (str): One of 'dimers' or 'pdbs'
+        name (str): The Dimer lookup_name, or the PDB ID
+        size (str): The image size, one of 'thumbnail' or 'card'. Default =
+            'card'
+
+    Returns:
+        images (dict): For each format (e.g. 'png', 'webp'), a dictionary
+            with the 'src' url, and the 'srcset' with the 1x and 2x urls. None
+            if there are no images for the Dimer or Pdb.
+    """
+
+    manifest = load_image_manifest()
+
+    key = manifest.get(kind, {}).get(name)
+    files = manifest.get('images', {}).get(key)
+
+    if not files:
+        return None
+
+    images = {}
+
+    for image_format, filename in files[size].items():
+        src = static("{0}/{1}".format(INTEGRINS_STATIC_PATH, filename))
+        high_resolution = static("{0}/{1}".format(
+            INTEGRINS_STATIC_PATH,
+            files[HIGH_RESOLUTION[size]][image_format],
+        ))
+
+        images[image_format] = {
+            'src': src,
+            'srcset': "{0} 1x, {1} 2x".format(src, high_resolution),
+        }
+
+    return images
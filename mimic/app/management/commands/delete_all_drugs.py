@@ -1,6 +1,9 @@
 from django.core.management.base import BaseCommand
 
 from app.models import Drug
+from app.dataset_cache import bump_dataset_version
+from app.ingest import clear_checkpoints
+from app.search_index import rebuild_search_index
 
 class Command(BaseCommand):
     help = ('Delete all contents Drugs.')
@@ -9,4 +12,10 @@ class Command(BaseCommand):
 
         Drug.objects.all().delete()
 
+        # Uploads of the deleted data can not be resumed.
+        clear_checkpoints()
+
+        rebuild_search_index()
+        bump_dataset_version()
+
         self.stdout.write("Deleted all Drug data.")
@@ -3,6 +3,9 @@ from django.core.management.base import BaseCommand
 from app.models import Monomer
 from app.models import Dimer
 from app.models import Structure
+from app.dataset_cache import bump_dataset_version
+from app.ingest import clear_checkpoints
+from app.search_index import rebuild_search_index
 
 
 class Command(BaseCommand):
@@ -14,4 +17,10 @@ class Command(BaseCommand):
         Dimer.objects.all().delete()
         Structure.objects.all().delete()
 
+        # Uploads of the deleted data can not be resumed.
+        clear_checkpoints()
+
+        rebuild_search_index()
+        bump_dataset_version()
+
         self.stdout.write("Deleted all Integrin data.")
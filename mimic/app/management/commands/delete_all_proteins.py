@@ -1,6 +1,8 @@
 from django.core.management.base import BaseCommand
 
 from app.models import Protein
+from app.ingest import clear_checkpoints
+from app.summaries import rebuild_protein_summaries
 
 
 class Command(BaseCommand):
@@ -10,4 +12,11 @@ class Command(BaseCommand):
 
         Protein.objects.all().delete()
 
+        # Uploads of the deleted data can not be resumed.
+        clear_checkpoints()
+
+        # The summaries (and with them the search index and dataset version)
+        # must no longer list the deleted data.
+        rebuild_protein_summaries()
+
         self.stdout.write("Deleted all Protein.")
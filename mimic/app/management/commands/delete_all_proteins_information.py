@@ -1,4 +1,6 @@
+from app.ingest import clear_checkpoints
 from app.models import ProteinInformation
+from app.summaries import rebuild_protein_summaries
 from django.core.management.base import BaseCommand
 
 
@@ -8,4 +10,11 @@ class Command(BaseCommand):
     def handle(self, *args, **options):
         ProteinInformation.objects.all().delete()
 
+        # Uploads of the deleted data can not be resumed.
+        clear_checkpoints()
+
+        # The summaries (and with them the search index and dataset version)
+        # must no longer list the deleted data.
+        rebuild_protein_summaries()
+
         self.stdout.write("Deleted all ProteinInformation.")
@@ -1,33 +1,292 @@
+import hashlib
+import json
 import os
+import re
+import time
+
+from concurrent.futures import ProcessPoolExecutor
 
 from django.core.management.base import BaseCommand
-from django.conf import settings
+from django.db import connections
+
+from IntegrinDiagram.integrinDiagram import RASTER_SIZES
+from IntegrinDiagram.integrinDiagram import build_thumbnail_diagram
+from IntegrinDiagram.integrinDiagram import coverage_signature
+from IntegrinDiagram.integrinDiagram import diagram_version
+from IntegrinDiagram.integrinDiagram import dimer_domain_coverage
+from IntegrinDiagram.integrinDiagram import rasterize
 
+from app.integrin_images import INTEGRINS_PATH
+from app.integrin_images import MANIFEST_PATH
 from app.models import Dimer
+from app.models import Pdb
+
+# The image files written by this command: <size>-<content hash>.<format>
+IMAGE_FILENAME = "{0}-{1}.{2}"
+IMAGE_PATTERN = re.compile(r"^[a-z]+-[0-9a-f]{12}\.[a-z]+$")
+
+
+def _render_images(svg):
+    """ Rasterize a diagram (see `IntegrinDiagram.rasterize`), and save the
+    images to INTEGRINS_PATH, named by their contents. This is run in the
+    worker processes of the --jobs mode.
 
+    Returns:
+        files (dict): The image filenames, by size and format
+        duration (float): The time it took, in seconds
+    """
+
+    start = time.time()
+    files = {}
+
+    for size, images in rasterize(svg).items():
+        files[size] = {}
+
+        for image_format, data in images.items():
+            filename = IMAGE_FILENAME.format(
+                size, hashlib.sha1(data).hexdigest()[:12], image_format
+            )
+            filepath = os.path.join(INTEGRINS_PATH, filename)
 
-INTEGRINS_PATH = os.path.join(
-    settings.BASE_DIR, 'mimic', 'static', 'mimic', 'integrins'
-)
+            if not os.path.isfile(filepath):
+                with open(filepath, 'wb') as o:
+                    o.write(data)
+
+            files[size][image_format] = filename
+
+    return files, time.time() - start
 
 
 class Command(BaseCommand):
     help = (
-        """Generates *png images of all Dimer objects, and saves them to',
-        'static/integrins'."""
+        """Generates *png and *webp images (in several sizes) of all Dimer and
+        Pdb objects, and saves them to 'static/mimic/integrins', with a
+        manifest in 'static/mimic/integrins.json'."""
     )
 
-    def _generate_integrins(self):
-        """ Parse and upload Dimer instancse.
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--jobs',
+            type=int,
+            default=1,
+            help="Number of processes to render the images with"
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help=(
+                "Only render the images of diagrams that changed since the "
+                "last run"
+            )
+        )
+
+    @staticmethod
+    def _read_manifest():
+        """ Return the manifest of the last run, or an empty manifest if
+        there is none.
         """
 
-        for dimer in Dimer.objects.all():
-            filename = "{0}.png".format(dimer.lookup_name)
-            filepath = os.path.join(INTEGRINS_PATH, filename)
-            dimer.generate_dimer_thumbnail(filepath)
+        if not os.path.isfile(MANIFEST_PATH):
+            return {'version': None, 'images': {}}
+
+        with open(MANIFEST_PATH, 'r') as o:
+            return json.load(o)
+
+    @staticmethod
+    def _write_manifest(manifest):
+        """ Write the manifest of this run, see `app.integrin_images`.
+        """
+
+        with open(MANIFEST_PATH, 'w') as o:
+            json.dump(manifest, o, indent=2, sort_keys=True)
+
+    @staticmethod
+    def _diagram_key(signature):
+        """ Return the key of a diagram: a hash of its coverage signature
+        (see `coverage_signature`).
+        """
+
+        return hashlib.sha1(
+            json.dumps(signature).encode('utf-8')
+        ).hexdigest()
+
+    @staticmethod
+    def _pdb_coverages():
+        """ Return the domain coverage of all Pdbs, with one query per
+        subunit (and one for the Pdbs).
+
+        Returns:
+            coverages (dict): The Alpha and Beta coverage dictionaries (see
+                `domain_coverage`), by PDB ID.
+        """
+
+        coverages = {
+            pdb: ({}, {}) for pdb in Pdb.objects.values_list('pdb', flat=True)
+        }
+
+        for index, field in enumerate([Pdb.alpha_domain, Pdb.beta_domain]):
+            rows = field.through.objects.values_list(
+                'pdb__pdb', 'structure__short'
+            )
+            for pdb, short in rows:
+                coverages[pdb][index].setdefault(short, set()).add(pdb)
+
+        return coverages
+
+    def _collect_diagrams(self):
+        """ Resolve the coverage of all Dimers and Pdbs, and group them by
+        diagram.
+
+        Returns:
+            diagrams (dict): The coverage (alpha_coverage, beta_coverage,
+                alpha_i) of every distinct diagram, by key
+            dimers (dict): The diagram key of every Dimer, by lookup_name
+            pdbs (dict): The diagram key of every Pdb, by PDB ID
+        """
+
+        diagrams = {}
+        dimers = {}
+        pdbs = {}
+
+        for dimer in Dimer.objects.select_related('alpha', 'beta'):
+            alpha_coverage, beta_coverage = dimer_domain_coverage(dimer)
+            alpha_i = dimer.alpha.structure.filter(short="alpha-I").exists()
+
+            key = self._diagram_key(
+                coverage_signature(alpha_coverage, beta_coverage, alpha_i)
+            )
+            diagrams[key] = (alpha_coverage, beta_coverage, alpha_i)
+            dimers[dimer.lookup_name] = key
+
+        for pdb, coverage in self._pdb_coverages().items():
+            alpha_coverage, beta_coverage = coverage
+
+            key = self._diagram_key(
+                coverage_signature(alpha_coverage, beta_coverage)
+            )
+            diagrams[key] = (alpha_coverage, beta_coverage, True)
+            pdbs[pdb] = key
+
+        return diagrams, dimers, pdbs
+
+    @staticmethod
+    def _images_exist(files):
+        """ Return whether all image files of a diagram exist.
+        """
+
+        return all(
+            os.path.isfile(os.path.join(INTEGRINS_PATH, filename))
+            for formats in files.values()
+            for filename in formats.values()
+        )
+
+    @staticmethod
+    def _diagram_label(key, dimers, pdbs):
+        """ Return a description of the Dimers and Pdbs with diagram 'key'.
+        """
+
+        names = sorted(n for n, k in dimers.items() if k == key)
+        count = sum(1 for k in pdbs.values() if k == key)
+
+        return "{0} (and {1} pdbs)".format(", ".join(names) or "-", count)
+
+    def _render_diagrams(self, diagrams, dimers, pdbs, jobs):
+        """ Render the images of the diagrams (see `_collect_diagrams`), using
+        'jobs' processes.
+
+        Returns:
+            images (dict): The image files (see `_render_images`), by key.
+        """
+
+        keys = sorted(diagrams)
+        svgs = [
+            build_thumbnail_diagram(*diagrams[key]).get_xml_str()
+            for key in keys
+        ]
+
+        if jobs > 1:
+            # The worker processes must not share the database connections.
+            connections.close_all()
+
+            with ProcessPoolExecutor(max_workers=jobs) as executor:
+                results = list(executor.map(_render_images, svgs))
+        else:
+            results = [_render_images(svg) for svg in svgs]
+
+        images = {}
+
+        for key, (files, duration) in zip(keys, results):
+            images[key] = files
+            self.stdout.write("Created images: {0} ({1:.3f}s)\n".format(
+                self._diagram_label(key, dimers, pdbs), duration
+            ))
+
+        return images
+
+    @staticmethod
+    def _remove_unused_images(images):
+        """ Remove the image files in INTEGRINS_PATH which are not in
+        'images' anymore.
+        """
+
+        used = set(
+            filename
+            for files in images.values()
+            for formats in files.values()
+            for filename in formats.values()
+        )
+
+        for filename in os.listdir(INTEGRINS_PATH):
+            if IMAGE_PATTERN.match(filename) and filename not in used:
+                os.remove(os.path.join(INTEGRINS_PATH, filename))
+
+    def _generate_integrins(self, jobs, incremental):
+        """ Generate the images of all Dimer and Pdb instances.
+        """
+
+        start = time.time()
+
+        manifest = self._read_manifest()
+        version = diagram_version()
+
+        # The images of other diagram versions are all generated again
+        if manifest.get('version') != version:
+            manifest = {'version': version, 'images': {}}
+
+        diagrams, dimers, pdbs = self._collect_diagrams()
+
+        images = {}
+
+        if incremental:
+            for key in list(diagrams):
+                files = manifest.get('images', {}).get(key)
+
+                if files and self._images_exist(files):
+                    images[key] = files
+                    del diagrams[key]
+
+        images.update(self._render_diagrams(diagrams, dimers, pdbs, jobs))
+
+        self._write_manifest({
+            'version': version,
+            'sizes': RASTER_SIZES,
+            'images': images,
+            'dimers': dimers,
+            'pdbs': pdbs,
+        })
+        self._remove_unused_images(images)
 
-            self.stdout.write("Created thumbnail: {0}\n".format(filepath))
+        self.stdout.write(
+            "Created images of {0} and skipped {1} diagrams ({2} dimers, {3} "
+            "pdbs) in {4:.2f}s\n".format(
+                len(diagrams),
+                len(images) - len(diagrams),
+                len(dimers),
+                len(pdbs),
+                time.time() - start,
+            )
+        )
 
     def handle(self, *args, **options):
 
-        self._generate_integrins()
+        self._generate_integrins(options['jobs'], options['incremental'])
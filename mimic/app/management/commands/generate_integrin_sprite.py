@@ -0,0 +1,26 @@
+import os
+
+from django.core.management.base import BaseCommand
+from django.conf import settings
+
+from IntegrinDiagram.integrinDiagram import SPRITE_STATIC_PATH
+from IntegrinDiagram.integrinDiagram import build_sprite
+
+
+SPRITE_PATH = os.path.join(
+    settings.BASE_DIR, 'mimic', 'static', *SPRITE_STATIC_PATH.split('/')
+)
+
+
+class Command(BaseCommand):
+    help = (
+        'Generates the integrin sprite from integrin.svg, and saves it to '
+        'static/mimic. Run this whenever integrin.svg changes.'
+    )
+
+    def handle(self, *args, **options):
+
+        with open(SPRITE_PATH, 'w') as o:
+            o.write(build_sprite())
+
+        self.stdout.write("Created sprite: {0}".format(SPRITE_PATH))
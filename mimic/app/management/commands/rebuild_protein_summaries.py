@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from app.summaries import rebuild_protein_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the ProteinSummary table from the ProteinInteractor and '
+        'ProteinInformation tables.'
+    )
+
+    def handle(self, *args, **options):
+
+        count = rebuild_protein_summaries()
+
+        self.stdout.write("Rebuilt {0} ProteinSummaries.".format(count))
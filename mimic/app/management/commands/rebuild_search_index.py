@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from app.dataset_cache import bump_dataset_version
+from app.search_index import rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild the SearchDocument table, and its full text index, from the '
+        'ProteinSummary, Dimer, Monomer, Drug and Pdb tables.'
+    )
+
+    def handle(self, *args, **options):
+
+        count = rebuild_search_index()
+
+        bump_dataset_version()
+
+        self.stdout.write("Rebuilt {0} SearchDocuments.".format(count))
@@ -1,6 +1,8 @@
 import os
 
 from app.parsers import ProteinInformationParser
+from app.summaries import rebuild_protein_summaries
+from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand, CommandError
 
 
@@ -15,6 +17,23 @@ class Command(BaseCommand):
             type=str,
             help="Name and path of file to upload"
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help="Upload all rows at once, creating the instances in bulk"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help="The maximum number of instances created per query with "
+                 "--bulk (default: settings.INGEST_BATCH_SIZE)"
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help="Skip the rows already uploaded from the same file, e.g. "
+                 "by an interrupted upload"
+        )
 
     @staticmethod
     def _check_file(filename):
@@ -25,17 +44,39 @@ class Command(BaseCommand):
         if not os.path.exists(filename):
             raise CommandError("Could not find file: {0}".format(filename))
 
-    def _parse_protein_information(self, filename):
+    def _parse_protein_information(
+            self, filename, bulk=False, batch_size=None, resume=False):
         """ Parse and upload ProteinInformation objects.
         """
 
-        protein_information_parser = ProteinInformationParser(filename)
+        protein_information_parser = ProteinInformationParser(
+            filename, bulk=bulk, batch_size=batch_size, resume=resume,
+        )
         protein_information_parser.parse_and_upload()
 
         self.stdout.write("\n".join(protein_information_parser.messages))
 
+    def _rebuild_protein_summaries(self):
+        """ Rebuild the ProteinSummary table, so it includes the uploaded data.
+        """
+
+        count = rebuild_protein_summaries()
+
+        self.stdout.write("Rebuilt {0} ProteinSummaries.".format(count))
+
     def handle(self, *args, **options):
         filename = options['filename']
 
         self._check_file(filename)
-        self._parse_protein_information(filename)
+        try:
+            self._parse_protein_information(
+                filename, options['bulk'], options['batch_size'],
+                options['resume'],
+            )
+        except ValidationError as error:
+            raise CommandError(
+                "Invalid data in {0}:\n{1}".format(
+                    filename, "\n".join(error.messages),
+                )
+            )
+        self._rebuild_protein_summaries()
@@ -1,8 +1,10 @@
 import os
 
+from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand, CommandError
 
 from app.parsers import ProteinInteractorParser
+from app.summaries import rebuild_protein_summaries
 
 
 class Command(BaseCommand):
@@ -18,6 +20,23 @@ class Command(BaseCommand):
             type=str,
             help="Name and path of file to upload"
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help="Upload all rows at once, creating the instances in bulk"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help="The maximum number of instances created per query with "
+                 "--bulk (default: settings.INGEST_BATCH_SIZE)"
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help="Skip the rows already uploaded from the same file, e.g. "
+                 "by an interrupted upload"
+        )
 
     @staticmethod
     def _check_file(filename):
@@ -28,18 +47,40 @@ class Command(BaseCommand):
         if not os.path.exists(filename):
             raise CommandError("Could not find file: {0}".format(filename))
 
-    def _parse_protein_interactors(self, filename):
+    def _parse_protein_interactors(
+            self, filename, bulk=False, batch_size=None, resume=False):
         """ Parse and upload ProteinInteractor objects.
         """
 
-        protein_interactor_parser = ProteinInteractorParser(filename)
+        protein_interactor_parser = ProteinInteractorParser(
+            filename, bulk=bulk, batch_size=batch_size, resume=resume,
+        )
         protein_interactor_parser.parse_and_upload()
 
         self.stdout.write("\n".join(protein_interactor_parser.messages))
 
+    def _rebuild_protein_summaries(self):
+        """ Rebuild the ProteinSummary table, so it includes the uploaded data.
+        """
+
+        count = rebuild_protein_summaries()
+
+        self.stdout.write("Rebuilt {0} ProteinSummaries.".format(count))
+
     def handle(self, *args, **options):
 
         filename = options['filename']
 
         self._check_file(filename)
-        self._parse_protein_interactors(filename)
+        try:
+            self._parse_protein_interactors(
+                filename, options['bulk'], options['batch_size'],
+                options['resume'],
+            )
+        except ValidationError as error:
+            raise CommandError(
+                "Invalid data in {0}:\n{1}".format(
+                    filename, "\n".join(error.messages),
+                )
+            )
+        self._rebuild_protein_summaries()
@@ -1,5 +1,6 @@
 import os
 
+from django.core.exceptions import ValidationError
 from django.core.management.base import BaseCommand, CommandError
 
 from app.parsers import StructureParser  #pylint: disable
@@ -18,6 +19,23 @@ class Command(BaseCommand):
             type=str,
             help="Name and path of file to upload"
         )
+        parser.add_argument(
+            '--bulk',
+            action='store_true',
+            help="Upload all rows at once, creating the instances in bulk"
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            help="The maximum number of instances created per query with "
+                 "--bulk (default: settings.INGEST_BATCH_SIZE)"
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help="Skip the rows already uploaded from the same file, e.g. "
+                 "by an interrupted upload"
+        )
 
     @staticmethod
     def _check_file(filename):
@@ -28,11 +46,14 @@ class Command(BaseCommand):
         if not os.path.exists(filename):
             raise CommandError("Could not find file: {0}".format(filename))
 
-    def _parse_monomers(self, filename):
+    def _parse_monomers(
+            self, filename, bulk=False, batch_size=None, resume=False):
         """ Parse and upload Monomer instancse.
         """
 
-        monomer_parser = StructureParser(filename)
+        monomer_parser = StructureParser(
+            filename, bulk=bulk, batch_size=batch_size, resume=resume,
+        )
         monomer_parser.parse_and_upload()
 
         self.stdout.write("\n".join(monomer_parser.messages))
@@ -42,4 +63,14 @@ class Command(BaseCommand):
         filename = options['filename']
 
         self._check_file(filename)
-        self._parse_monomers(filename)
+        try:
+            self._parse_monomers(
+                filename, options['bulk'], options['batch_size'],
+                options['resume'],
+            )
+        except ValidationError as error:
+            raise CommandError(
+                "Invalid data in {0}:\n{1}".format(
+                    filename, "\n".join(error.messages),
+                )
+            )
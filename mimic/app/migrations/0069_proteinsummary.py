@@ -0,0 +1,38 @@
+# Generated by Django 2.0.6 on 2026-10-18 07:17
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0068_auto_20240715_1712'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProteinSummary',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('uniprot', models.CharField(db_index=True, max_length=100)),
+                ('peptide', models.CharField(max_length=512)),
+                ('position', models.IntegerField(db_index=True)),
+                ('name', models.CharField(default='-', max_length=512)),
+                ('organism', models.CharField(default='-', max_length=512)),
+                ('type_of_interaction', models.CharField(default='NA', max_length=128)),
+                ('experimental_method', models.TextField(default='')),
+                ('integrins', models.TextField(default='')),
+                ('pubmed', models.TextField(default='')),
+                ('interaction_strength', models.BooleanField(default=False)),
+                ('bound_structure', models.BooleanField(default=False)),
+                ('cell_based_assay', models.BooleanField(default=False)),
+                ('purified_assay', models.BooleanField(default=False)),
+                ('document', models.TextField(default='')),
+                ('protein', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='app.Protein')),
+            ],
+            options={
+                'ordering': ('position',),
+            },
+        ),
+    ]
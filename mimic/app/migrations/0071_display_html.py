@@ -0,0 +1,71 @@
+# Generated by Django 2.0.6 on 2026-10-18 07:38
+
+from django.db import migrations, models
+
+from app import display
+
+
+def render_display_fields(apps, schema_editor):
+    """ Fill the new display fields of the existing rows.
+    """
+
+    ProteinInteractor = apps.get_model('app', 'ProteinInteractor')
+    ProteinInformation = apps.get_model('app', 'ProteinInformation')
+    ProteinSummary = apps.get_model('app', 'ProteinSummary')
+
+    for interactor in ProteinInteractor.objects.all():
+        ProteinInteractor.objects.filter(pk=interactor.pk).update(
+            target_integrin_html=display.integrin_name(
+                interactor.target_integrin
+            ),
+            interaction_strength_html=display.kd(
+                interactor.interaction_strength
+            ),
+            notes_html=display.ionindex(interactor.notes),
+        )
+
+    for information in ProteinInformation.objects.all():
+        ProteinInformation.objects.filter(pk=information.pk).update(
+            function_html=display.function_pubmed_link(information.function),
+        )
+
+    for summary in ProteinSummary.objects.all():
+        ProteinSummary.objects.filter(pk=summary.pk).update(
+            integrins_html=display.integrin_name(summary.integrins),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0070_datasetversion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='proteininformation',
+            name='function_html',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='proteininteractor',
+            name='interaction_strength_html',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='proteininteractor',
+            name='notes_html',
+            field=models.TextField(blank=True),
+        ),
+        migrations.AddField(
+            model_name='proteininteractor',
+            name='target_integrin_html',
+            field=models.CharField(blank=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='proteinsummary',
+            name='integrins_html',
+            field=models.TextField(default=''),
+        ),
+        migrations.RunPython(render_display_fields, migrations.RunPython.noop),
+    ]
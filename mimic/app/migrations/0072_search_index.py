@@ -0,0 +1,93 @@
+from django.db import OperationalError
+from django.db import migrations
+
+# The Postgres column (and its GIN index) indexing the documents. The index
+# is created here rather than with app.search_index, so this migration does
+# not change with the app code.
+VECTOR_COLUMN = 'search_vector'
+
+
+def create_search_index(schema_editor, table):
+    """ Create the full text index of the 'document' column of a table: a
+    tsvector column with a GIN index on Postgres, or an FTS5 table on SQLite
+    (if SQLite was built with FTS5).
+    """
+
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE {0} ADD COLUMN {1} tsvector".format(
+                table, VECTOR_COLUMN
+            )
+        )
+        schema_editor.execute(
+            "CREATE INDEX {0}_{1} ON {0} USING gin({1})".format(
+                table, VECTOR_COLUMN
+            )
+        )
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE {0}_fts USING fts5(document, "
+                "content='{0}', content_rowid='id')".format(table)
+            )
+        except OperationalError:
+            pass
+
+
+def drop_search_index(schema_editor, table):
+    """ Remove the full text index created by `create_search_index`.
+    """
+
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE {0} DROP COLUMN {1}".format(table, VECTOR_COLUMN)
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS {0}_fts".format(table))
+
+
+def index_search_documents(schema_editor, table):
+    """ Index the documents of all rows of a table with a full text index.
+    """
+
+    connection = schema_editor.connection
+
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "UPDATE {0} SET {1} = to_tsvector('simple', document)".format(
+                table, VECTOR_COLUMN
+            )
+        )
+    elif connection.vendor == 'sqlite' and (
+            "{0}_fts".format(table) in connection.introspection.table_names()):
+        schema_editor.execute(
+            "INSERT INTO {0}_fts({0}_fts) VALUES('rebuild')".format(table)
+        )
+
+
+def create_index(apps, schema_editor):
+    create_search_index(schema_editor, 'app_proteinsummary')
+
+
+def drop_index(apps, schema_editor):
+    drop_search_index(schema_editor, 'app_proteinsummary')
+
+
+def index_documents(apps, schema_editor):
+    index_search_documents(schema_editor, 'app_proteinsummary')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0071_display_html'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+        migrations.RunPython(index_documents, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from app.fuzzy_search import create_fuzzy_index
+from app.fuzzy_search import drop_fuzzy_index
+
+
+def create_index(apps, schema_editor):
+    create_fuzzy_index(schema_editor)
+
+
+def drop_index(apps, schema_editor):
+    drop_fuzzy_index(schema_editor)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('app', '0072_search_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -1,15 +1,19 @@
 from IntegrinDiagram.integrinDiagram import build_dimer_diagram
-from IntegrinDiagram.integrinDiagram import build_dimer_thumbnail
-from IntegrinDiagram.integrinDiagram import build_pdb_diagram
+from IntegrinDiagram.integrinDiagram import build_dimer_sprite_style
+from IntegrinDiagram.integrinDiagram import build_pdb_sprite_style
+from app import display
 from django.db import models
 from django.db.models.signals import pre_save
 from django.dispatch import receiver
 from django.urls import reverse
+from django.utils import timezone
 
 
 # This handler forces all Model and Model fields to be validated before saving.
 # See for more info:
 # https://docs.djangoproject.com/en/2.0/ref/models/instances/#validating-objects
+# Bulk uploads do not save instances one by one, and validate them in batches
+# instead (see app.validation).
 @receiver(pre_save)
 def pre_save_handler(sender, instance, *args, **kwargs):
     instance.full_clean()
@@ -147,10 +151,16 @@ class Dimer(models.Model):
             self.beta.name.replace('beta', 'β').replace('-', ''),
         )
 
+    def populate_fields(self):
+        """ Populate the "lookup_name" field. This is done by save, and must
+        be called before creating Dimers in bulk.
+        """
+        self.lookup_name = "{0}_{1}".format(self.alpha.name, self.beta.name)
+
     def save(self, *args, **kwargs):
         """ Custom save to populate the "name" field.
         """
-        self.lookup_name = "{0}_{1}".format(self.alpha.name, self.beta.name)
+        self.populate_fields()
         super(Dimer, self).save(*args, **kwargs)
 
     def __str__(self):
@@ -164,11 +174,11 @@ class Dimer(models.Model):
         """
         return build_dimer_diagram(self)
 
-    def generate_dimer_thumbnail(self, filepath):
-        """ Generates a png thumbnail from the IntegrinDiagram Module
+    def generate_dimer_sprite_style(self):
+        """ Generates the style for the integrin sprite from the
+        IntegrinDiagram Module
         """
-
-        build_dimer_thumbnail(self, filepath)
+        return build_dimer_sprite_style(self)
 
     def get_absolute_url(self):
         return reverse("dimer", args=[self.lookup_name])
@@ -292,8 +302,10 @@ class Pdb(models.Model):
     def __str__(self):
         return "PDB: {0}".format(self.pdb)
 
-    def save(self, *args, **kwargs):
-        """ Save the model instance.
+    def check_subunits(self):
+        """ Check that the Pdb has a subunit. This is done by save, and must
+        be called before creating Pdbs in bulk.
+
         Raises:
             ValueError if both 'alpha' and 'beta' are not specified.
         """
@@ -302,13 +314,22 @@ class Pdb(models.Model):
             raise ValueError(
                 "Pdb needs an Alpha or Beta subunit defined (or both)"
             )
+
+    def save(self, *args, **kwargs):
+        """ Save the model instance.
+        Raises:
+            ValueError if both 'alpha' and 'beta' are not specified.
+        """
+
+        self.check_subunits()
         super(Pdb, self).save(*args, **kwargs)
 
-    def generate_pdb_diagram(self):
-        """ Generates a diagram from the IntegrinDiagram Module
+    def generate_pdb_sprite_style(self):
+        """ Generates the style for the integrin sprite from the
+        IntegrinDiagram Module
         """
 
-        return build_pdb_diagram(self)
+        return build_pdb_sprite_style(self)
 
 
 class Protein(models.Model):
@@ -501,6 +522,11 @@ class ProteinInteractor(models.Model):
     xref = models.CharField(max_length=512, default="NA")
     notes = models.TextField(default="NA")
 
+    # Display HTML of the fields above, set on save (see app.display).
+    target_integrin_html = models.CharField(max_length=64, blank=True)
+    interaction_strength_html = models.TextField(blank=True)
+    notes_html = models.TextField(blank=True)
+
     # function = models.TextField()
     # taxonomic_group = models.CharField(max_length=128)
     # start = models.IntegerField()
@@ -514,8 +540,9 @@ class ProteinInteractor(models.Model):
     def __str__(self):
         return "{0}".format(self.protein)
 
-    def save(self, *args, **kwargs):
-        """ Custom save to populate the "name" field.
+    def populate_fields(self):
+        """ Populate the "name" and "*_html" fields. This is done by save, and
+        must be called before creating ProteinInteractors in bulk.
 
         Raises:
             ValueError if self.name is None
@@ -525,6 +552,18 @@ class ProteinInteractor(models.Model):
                 "'name' cannot be None/empty"
             )
         self.lookup_name = self.name.replace(" ", "_")
+
+        self.target_integrin_html = display.integrin_name(self.target_integrin)
+        self.interaction_strength_html = display.kd(self.interaction_strength)
+        self.notes_html = display.ionindex(self.notes)
+
+    def save(self, *args, **kwargs):
+        """ Custom save to populate the "name" field.
+
+        Raises:
+            ValueError if self.name is None
+        """
+        self.populate_fields()
         super(ProteinInteractor, self).save(*args, **kwargs)
 
     # def pdbs_for_links(self):
@@ -619,11 +658,16 @@ class ProteinInformation(models.Model):
     organism_scientific = models.CharField(max_length=512, default="NA")
     function = models.TextField(default="NA")
 
+    # Display HTML of the function, with PubMed links, set on save.
+    function_html = models.TextField(blank=True)
+
     def __str__(self):
         return "{0}".format(self.protein)
 
-    def save(self, *args, **kwargs):
-        """ Custom save to populate the "name" field.
+    def populate_fields(self):
+        """ Populate the "name" and "function_html" fields. This is done by
+        save, and must be called before creating ProteinInformation in bulk.
+
         Raises:
             ValueError if self.name is None
         """
@@ -632,6 +676,14 @@ class ProteinInformation(models.Model):
                 "'name' cannot be None/empty"
             )
         self.lookup_name = self.name.replace(" ", "_")
+        self.function_html = display.function_pubmed_link(self.function)
+
+    def save(self, *args, **kwargs):
+        """ Custom save to populate the "name" field.
+        Raises:
+            ValueError if self.name is None
+        """
+        self.populate_fields()
         super(ProteinInformation, self).save(*args, **kwargs)
 
 
@@ -676,3 +728,171 @@ class DimerToProteinInteractor(models.Model):
             return []
 
         return self.pmids.split("|")
+
+
+class ProteinSummary(models.Model):
+    """ A denormalized summary of all ProteinInteractor records of a single
+    Protein (by UniProt accession) or peptide.
+
+    Attributes:
+        protein (obj:`Protein`): ForeignKey to the Protein model
+        uniprot (str): The Uniprot ID, "-" for peptides
+        peptide (str): The peptide name, "-" for proteins
+        position (int): The id of the first ProteinInteractor of this Protein,
+            used to keep the order in which the interactors were curated
+        name (str): Protein name, from ProteinInformation ("-" if unknown)
+        organism (str): Scientific name of the source organism, from
+            ProteinInformation ("-" if unknown)
+        type_of_interaction (str): Type of interaction
+        experimental_method (str): A ", " separated list of all experimental
+            methods
+        integrins (str): A ", " separated list of all target integrins
+        integrins_html (str): The integrins, with Greek letters
+        pubmed (str): A ", " separated list of all PubMed IDs
+        interaction_strength (bool): Whether any interaction has an
+            interaction strength
+        bound_structure (bool): Whether any interaction has a bound structure
+        cell_based_assay (bool): Whether any experimental method is a cell
+            based assay
+        purified_assay (bool): Whether any experimental method is a purified
+            protein assay
+        document (str): Lower case text used for searching, see
+            `SearchDocument`
+
+    The table is rebuilt from scratch by `app.summaries.rebuild_protein_summaries`,
+    which runs at the end of the upload commands and from the
+    "rebuild_protein_summaries" management command. It should never be edited
+    by hand.
+    """
+
+    protein = models.ForeignKey("Protein", on_delete=models.CASCADE)
+    uniprot = models.CharField(max_length=100, db_index=True)
+    peptide = models.CharField(max_length=512)
+    position = models.IntegerField(db_index=True)
+    name = models.CharField(max_length=512, default="-")
+    organism = models.CharField(max_length=512, default="-")
+    type_of_interaction = models.CharField(max_length=128, default="NA")
+    experimental_method = models.TextField(default="")
+    integrins = models.TextField(default="")
+    integrins_html = models.TextField(default="")
+    pubmed = models.TextField(default="")
+    interaction_strength = models.BooleanField(default=False)
+    bound_structure = models.BooleanField(default=False)
+    cell_based_assay = models.BooleanField(default=False)
+    purified_assay = models.BooleanField(default=False)
+    document = models.TextField(default="")
+
+    def __str__(self):
+        return "Summary: {0}".format(self.protein)
+
+    class Meta:
+        ordering = ("position",)
+
+
+class SearchDocument(models.Model):
+    """ The searchable text of a single Dimer, Monomer, Drug, Pdb or
+    ProteinSummary, with what is needed to list it in the search results.
+
+    Attributes:
+        entity_type (str): The type of the instance, one of ENTITY_TYPES
+        object_id (int): The primary key of the instance
+        position (int): The position of the instance among the results of
+            its type, which are listed in this order
+        label (str): The name of the instance
+        detail (str): A short description shown next to the label
+        url (str): The url of the page of the instance
+        document (str): Lower case text used for searching, with a full
+            text index (see app.search_index)
+
+    The table is rebuilt from scratch by `app.search_index.rebuild_search_index`,
+    which runs whenever data is uploaded or deleted and from the
+    "rebuild_search_index" management command. It should never be edited by
+    hand.
+    """
+
+    INTERACTOR = 'interactor'
+    INTEGRIN = 'integrin'
+    SUBUNIT = 'subunit'
+    DRUG = 'drug'
+    STRUCTURE = 'structure'
+
+    ENTITY_TYPES = (
+        (INTERACTOR, 'Interactors'),
+        (INTEGRIN, 'Integrins'),
+        (SUBUNIT, 'Integrin subunits'),
+        (DRUG, 'Drugs'),
+        (STRUCTURE, 'Structures'),
+    )
+
+    entity_type = models.CharField(max_length=16, choices=ENTITY_TYPES)
+    object_id = models.IntegerField()
+    position = models.IntegerField()
+    label = models.CharField(max_length=512)
+    detail = models.CharField(max_length=512, default="")
+    url = models.CharField(max_length=256)
+    document = models.TextField(default="")
+
+    def __str__(self):
+        return "Search document: {0} {1}".format(self.entity_type, self.label)
+
+    class Meta:
+        ordering = ("entity_type", "position")
+        indexes = [models.Index(fields=["entity_type", "position"])]
+
+
+class DatasetVersion(models.Model):
+    """ A single row recording when the data last changed.
+
+    Attributes:
+        version (int): Incremented whenever data is uploaded or deleted
+        updated (datetime): When the version was last incremented
+
+    Use `app.dataset_cache.bump_dataset_version` to change the version, and
+    `app.dataset_cache.get_dataset_version` to read it. Everything computed
+    from the data can be cached under the version, see `app.dataset_cache`.
+    """
+
+    version = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return "Dataset version: {0}".format(self.version)
+
+    @classmethod
+    def load(cls):
+        """ Return the DatasetVersion, creating it if needed.
+        """
+
+        dataset_version, _ = cls.objects.get_or_create(pk=1)
+        return dataset_version
+
+
+class IngestCheckpoint(models.Model):
+    """ The progress of the upload of a file, so an interrupted upload can be
+    resumed.
+
+    Attributes:
+        parser (str): The name of the parser uploading the file
+        file_hash (str): The SHA-256 hash of the contents of the file
+        row (int): The number of the last uploaded row of the sheet, 0 if
+            none was uploaded yet
+        finished (bool): Whether all rows have been uploaded
+        updated (datetime): When a chunk was last uploaded
+
+    The checkpoints are written by `app.ingest.upload_file`, in the same
+    transaction as the uploaded rows, and cleared whenever data is deleted.
+    """
+
+    parser = models.CharField(max_length=64)
+    file_hash = models.CharField(max_length=64)
+    row = models.PositiveIntegerField(default=0)
+    finished = models.BooleanField(default=False)
+    updated = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return "Ingest checkpoint: {0} {1}".format(
+            self.parser, self.file_hash[:12],
+        )
+
+    class Meta:
+        unique_together = (("parser", "file_hash"),)
@@ -0,0 +1,91 @@
+import functools
+import hashlib
+
+from app.dataset_cache import dataset_cache
+from app.dataset_cache import get_dataset_version
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils import timezone
+from django.views.decorators.http import condition
+
+# When this process started, so when the code serving the pages was last
+# deployed at the latest.
+_STARTED = timezone.now()
+
+
+class _Uncacheable(Exception):
+    """ Raised to return a 'response' which is not cached.
+    """
+
+    def __init__(self, response):
+        super(_Uncacheable, self).__init__()
+        self.response = response
+
+
+def page_etag(request, *args, **kwargs):
+    """ Return the ETag of a page: a hash of the dataset version, the deploy
+    version (settings.DEPLOY_VERSION) and the full path (with query string)
+    of the request.
+    """
+
+    return hashlib.sha1("{0}:{1}:{2}".format(
+        get_dataset_version().token,
+        settings.DEPLOY_VERSION,
+        request.get_full_path(),
+    ).encode('utf-8')).hexdigest()
+
+
+def page_last_modified(request, *args, **kwargs):
+    """ Return the Last-Modified time of a page: when the data last changed,
+    or when this process started if later, as a deploy can change the page.
+    """
+
+    return max(get_dataset_version().updated, _STARTED)
+
+
+def dataset_cache_page(view):
+    """ Decorator which caches the pages of a read-only view in the
+    dataset_cache, by full path and dataset version.
+
+    The responses get ETag and Last-Modified headers, and conditional
+    requests which match them are answered with 304 Not Modified before the
+    view is called. Neither reads the database, see
+    `app.dataset_cache.get_dataset_version`.
+
+    Only successful (200) responses to GET and HEAD are cached, others (e.g.
+    redirects) are returned as they are. The views must return the same page
+    for every user.
+
+    Example use:
+
+    >>> path('browser', dataset_cache_page(BrowserView.as_view()))
+
+    """
+
+    @condition(etag_func=page_etag, last_modified_func=page_last_modified)
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+
+        def render():
+            response = view(request, *args, **kwargs)
+
+            if response.status_code != 200 or response.streaming:
+                raise _Uncacheable(response)
+
+            if hasattr(response, 'render'):
+                response.render()
+
+            return response.content, response['Content-Type']
+
+        key = "app.page:{0}".format(page_etag(request))
+
+        try:
+            content, content_type = dataset_cache.get(key, render)
+        except _Uncacheable as uncacheable:
+            return uncacheable.response
+
+        return HttpResponse(content, content_type=content_type)
+
+    return wrapper
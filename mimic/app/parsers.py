@@ -2,8 +2,12 @@ import re
 from io import StringIO
 from random import randint
 
-import pandas as pd
+import numpy as np
 from Bio import SeqIO
+from app.bulk import LookupTable
+from app.bulk import bulk_create
+from app.dataset_cache import bump_dataset_version
+from app.ingest import upload_file
 from app.models import AlternativeName
 from app.models import Dimer
 from app.models import DimerToDrug
@@ -16,10 +20,123 @@ from app.models import Protein
 from app.models import ProteinInformation
 from app.models import ProteinInteractor
 from app.models import Structure
+from app.search_index import rebuild_search_index
+from app.sheet_cache import read_cached_sheet
+from app.sheets import NA_VALUES
 from django.core.exceptions import ObjectDoesNotExist
 
 
-class StructureParser(object):
+class SheetParser(object):
+    """ The base class of the parsers of excel sheets, which upload the rows
+    of the first sheet of a file chunk by chunk, all at once or row by row.
+
+    Attributes:
+        filename (str): The name of the file to parse
+        messages (list): A list of messages detailing what has been uploaded
+            and created when "parse_and_upload" has been run.
+        bulk (bool): Whether to upload all rows at once (see `_bulk_upload`)
+            instead of row by row. Default = False
+        batch_size (int, optional): The maximum number of instances created
+            per query in bulk. Default = settings.INGEST_BATCH_SIZE
+        resume (bool): Whether to skip the rows already uploaded from the
+            same file (see `app.ingest.upload_file`). Default = False
+
+    Subclasses implement `_upload_row` and `_bulk_upload`.
+    """
+
+    # The version of _parse_file, part of the key of the cached sheets (see
+    # app.sheet_cache). Increment it whenever the sheet is read differently.
+    PARSE_VERSION = 1
+
+    # The values read as missing, and what they are replaced with (see
+    # app.sheets.read_sheet).
+    SHEET_NA_VALUES = NA_VALUES
+    SHEET_NA = np.nan
+
+    def __init__(self, filename, bulk=False, batch_size=None, resume=False):
+        """ Parse and Upload the rows of 'filename'.
+        """
+
+        self._filename = filename
+        self._bulk = bulk
+        self._batch_size = batch_size
+        self._resume = resume
+
+        self._data = []
+        self.messages = []
+
+    def _upload_row(self, series):
+        """ Upload a single row.
+        """
+
+        raise NotImplementedError
+
+    def _bulk_upload(self, rows, row_numbers):
+        """ Upload all 'rows' (as dictionaries) at once. Errors are reported
+        by the 'row_numbers' of the rows in the sheet.
+        """
+
+        raise NotImplementedError
+
+    def _upload_chunk(self, data):
+        """ Upload the rows of 'data', a chunk of self._data, all at once or
+        one by one.
+        """
+
+        if self._bulk:
+            self._bulk_upload(data.to_dict('records'), list(data.index))
+        else:
+            # Upload contents from each row one by one
+            for index_series in data.iterrows():
+                # extract Series from tuple
+                series = index_series[1]
+
+                self._upload_row(series)
+
+    def _parse_file(self):
+        """ Read the excel file, and store its rows in self._data as pandas
+        DataFrames, chunk by chunk (see app.sheet_cache.read_cached_sheet).
+        The SHEET_NA_VALUES are read as SHEET_NA.
+        """
+
+        self._data = read_cached_sheet(
+            self._filename, type(self).__name__, self.PARSE_VERSION,
+            na_values=self.SHEET_NA_VALUES, na=self.SHEET_NA,
+        )
+
+    def _post_upload(self):
+        """ Called once the file was uploaded (or skipped), before the cached
+        data is outdated, e.g. to rebuild what is derived from the uploaded
+        data.
+        """
+
+        pass
+
+    def parse_and_upload(self):
+        """ Parse self._filename and upload all contents.
+        """
+
+        # First parse the file and set self._data
+        self._parse_file()
+
+        # Upload the rows in a single transaction, chunk by chunk
+        uploaded = upload_file(
+            type(self).__name__, self._filename, self._data,
+            self._upload_chunk, resume=self._resume,
+        )
+
+        if not uploaded:
+            self.messages.append(
+                "Skipped {0}: it was already uploaded".format(self._filename)
+            )
+
+        self._post_upload()
+
+        # Everything cached from the previous data is now outdated.
+        bump_dataset_version()
+
+
+class StructureParser(SheetParser):
     """ A parser for Structure objects.
 
     Attributes:
@@ -36,15 +153,6 @@ class StructureParser(object):
     describing the Structure composition of Monomers in the MonomerParser.
     """
 
-    def __init__(self, filename):
-        """ Parse and Upload Structures.
-        """
-
-        self._filename = filename
-
-        self._data = []
-        self.messages = []
-
     def _upload_row(self, series):
         """ Upload a single row.
         """
@@ -60,29 +168,27 @@ class StructureParser(object):
             )
         )
 
-    def _parse_file(self):
-        """ Parse the excel file, and store the data in self._data as a pandas
-        DataFrame.
+    def _bulk_upload(self, rows, row_numbers):
+        """ Upload all rows, creating the Structures in bulk. Errors are
+        reported by the 'row_numbers' of the rows in the sheet.
         """
 
-        self._data = pd.read_excel(self._filename)
+        structures = [
+            Structure(short=row['Domain_shorthand'], name=row['Domain_name'])
+            for row in rows
+        ]
 
-    def parse_and_upload(self):
-        """ Parse self._filename and upload all contents.
-        """
+        bulk_create(Structure, structures, self._batch_size, row_numbers)
 
-        # First parse the file and set self._data
-        self._parse_file()
-
-        # Upload contents from each row one by one
-        for index_series in self._data.iterrows():
-            # extract Series from tuple
-            series = index_series[1]
-
-            self._upload_row(series)
+        for structure in structures:
+            self.messages.append(
+                "Added structure: {0}: {1}".format(
+                    structure.short, structure.name,
+                )
+            )
 
 
-class MonomerParser(object):
+class MonomerParser(SheetParser):
     """ A parser for Monomer objects.
 
     Attributes:
@@ -114,14 +220,18 @@ class MonomerParser(object):
     existing `Structure` instances.
     """
 
-    def __init__(self, filename):
+    # Remove default "N/A" converters, we handle these ourselves: only empty
+    # cells and "-" are read as "".
+    SHEET_NA_VALUES = {"-"}
+    SHEET_NA = ""
+
+    def __init__(self, filename, bulk=False, batch_size=None, resume=False):
         """
         """
 
-        self._filename = filename
-
-        self._data = []
-        self.messages = []
+        super(MonomerParser, self).__init__(
+            filename, bulk, batch_size, resume,
+        )
 
         # By convention, the '&' may be used to denote a newline character in
         # the uploaded fasta.
@@ -247,10 +357,25 @@ class MonomerParser(object):
         """
 
         monomer = Monomer.objects.create(
-            name=series['Integrin_name'],
             protein=self._get_or_create_human_protein(
                 series['UniProt_accession']
             ),
+            **self._monomer_fields(series)
+        )
+
+        self.messages.append(
+            "Added new Monomer: {0}".format(monomer)
+        )
+
+        return monomer
+
+    def _monomer_fields(self, series):
+        """ Return the fields of the Monomer in the row 'series', except for
+        its protein.
+        """
+
+        return dict(
+            name=series['Integrin_name'],
             ensg=series['Ensembl_accession'],
             gene_name=series['Gene_name'],
             subunit=self._parse_subunit(series['Integrin_name']),
@@ -263,11 +388,54 @@ class MonomerParser(object):
             notes=series['Notes'],
         )
 
-        self.messages.append(
-            "Added new Monomer: {0}".format(monomer)
+    @staticmethod
+    def _parse_alternative_names(series):
+        """ Return the list of alternative names in the row 'series'.
+        """
+
+        alternative_names = series['Alternative_names'].split("|")
+
+        # If series['Alternative_names'] is blank, "''", then .split("|")
+        # returns a single empty string: ['']. See
+        # https://stackoverflow.com/questions/16645083/
+        #   when-splitting-an-empty-string-in-python-why-does-split-return-an-empty-list
+        # for an example.
+        # Clean these up here:
+        return [a for a in alternative_names if a]
+
+    @staticmethod
+    def _parse_structures(series):
+        """ Return the Structures in the row 'series', as a list of (short,
+        start, stop) tuples.
+
+        Raises:
+            Exception:  if there are issues parsing any structures.
+        """
+
+        structures = series['Domains_and_regions'].split("|")
+
+        # Format of each entry is "short@start-stop"
+        structure_re = re.compile(
+            r"(?P<short>\S+)@(?P<start>\d+)-(?P<stop>\d+)"
         )
 
-        return monomer
+        parsed = []
+
+        for structure_str in structures:
+
+            match = structure_re.match(structure_str)
+
+            if not match:
+                raise Exception(
+                    "Could not parse structure: '{0}'".format(structure_str)
+                )
+
+            parsed.append(
+                (match.group('short'), match.group('start'),
+                 match.group('stop'))
+            )
+
+        return parsed
 
     def _upload_alternative_names(self, protein, series):
         """ Upload the AlternativeNames for 'protein'.
@@ -281,34 +449,31 @@ class MonomerParser(object):
         `series`.
         """
 
-        alternative_names = series['Alternative_names'].split("|")
-
-        # If series['Alternative_names'] is blank, "''", then .split("|")
-        # returns a single empty string: ['']. See
-        # https://stackoverflow.com/questions/16645083/
-        #   when-splitting-an-empty-string-in-python-why-does-split-return-an-empty-list
-        # for an example.
-        # Clean these up here:
-        alternative_names = [a for a in alternative_names if a]
-
-        for name in alternative_names:
+        for name in self._parse_alternative_names(series):
 
             _, created = AlternativeName.objects.get_or_create(
                 protein=protein,
                 name=name,
             )
-            if created:
-                self.messages.append(
-                    "Created new AlternativeName '{0}' for {1}".format(
-                        name, protein,
-                    )
+            self._alternative_name_message(protein, name, created)
+
+    def _alternative_name_message(self, protein, name, created):
+        """ Add the message for the (created or existing) AlternativeName
+        'name' of 'protein'.
+        """
+
+        if created:
+            self.messages.append(
+                "Created new AlternativeName '{0}' for {1}".format(
+                    name, protein,
                 )
-            else:
-                self.messages.append(
-                    "AlternativeName '{0}' already exists for {1}".format(
-                        name, protein,
-                    )
+            )
+        else:
+            self.messages.append(
+                "AlternativeName '{0}' already exists for {1}".format(
+                    name, protein,
                 )
+            )
 
     def _upload_structures(self, monomer, series):
         """ Upload the Structures for 'monomer'.
@@ -325,29 +490,15 @@ class MonomerParser(object):
         `series`.
         """
 
-        structures = series['Domains_and_regions'].split("|")
-
-        # Format of each entry is "short@start-stop"
-        structure_re = re.compile(
-            r"(?P<short>\S+)@(?P<start>\d+)-(?P<stop>\d+)"
-        )
-
-        for structure_str in structures:
-
-            match = structure_re.match(structure_str)
-
-            if not match:
-                raise Exception(
-                    "Could not parse structure: '{0}'".format(structure_str)
-                )
+        for short, start, stop in self._parse_structures(series):
 
-            structure = Structure.objects.get(short=match.group('short'))
+            structure = Structure.objects.get(short=short)
 
             MonomerToStructure.objects.create(
                 monomer=monomer,
                 structure=structure,
-                start=match.group('start'),
-                stop=match.group('stop'),
+                start=start,
+                stop=stop,
             )
 
             # add() does not save, do it manually
@@ -367,41 +518,108 @@ class MonomerParser(object):
         self._upload_alternative_names(monomer.protein, series)
         self._upload_structures(monomer, series)
 
-    def _clean_empty_dash(self):
-        """ Replace all "-" values in self._data with ""
+    def _bulk_upload(self, rows, row_numbers):
+        """ Upload all rows, creating the Proteins, Monomers, AlternativeNames
+        and MonomerToStructures in bulk. Foreign keys are resolved from
+        LookupTables, instead of with a query per row.
         """
 
-        self._data.replace("-", "", inplace=True)
+        # NOTE: As in _get_or_create_human_protein, all proteins are human
+        proteins = LookupTable(
+            Protein.objects.all(), ('uniprot', 'species'), self._batch_size,
+            values=[row['UniProt_accession'] for row in rows],
+        )
+        for number, row in zip(row_numbers, rows):
+            proteins.get_or_add(
+                uniprot=row['UniProt_accession'], species="Homo sapiens",
+                row=number,
+            )
+        proteins.save()
+
+        new_monomers = []
+        for row in rows:
+            monomer = Monomer(
+                protein=proteins.get(
+                    uniprot=row['UniProt_accession'], species="Homo sapiens",
+                ),
+                **self._monomer_fields(row)
+            )
+            new_monomers.append(monomer)
 
-    def _parse_file(self):
-        """ Parse the excel file, and store the data in self._data
-        """
+            self.messages.append(
+                "Added new Monomer: {0}".format(monomer)
+            )
 
-        # Remove default "N/A" converters, we handle these ourselves.
-        self._data = pd.read_excel(
-            self._filename,
-            keep_default_na=False
+        bulk_create(Monomer, new_monomers, self._batch_size, row_numbers)
+
+        monomers = LookupTable(
+            Monomer.objects.all(), ('name',),
+            values=[row['Integrin_name'] for row in rows],
+        )
+        structures = LookupTable(
+            Structure.objects.all(), ('short',),
+            values=[
+                short
+                for row in rows
+                for short, _, _ in self._parse_structures(row)
+            ],
+        )
+        alternative_names = LookupTable(
+            AlternativeName.objects.all(), ('protein', 'name'),
+            self._batch_size,
+            values=[
+                proteins.get(
+                    uniprot=row['UniProt_accession'], species="Homo sapiens",
+                )
+                for row in rows
+            ],
         )
+        monomer_structures = []
+        monomer_structure_rows = []
 
-    def parse_and_upload(self):
-        """ Parse self._filename and upload all contents.
-        """
+        for number, row in zip(row_numbers, rows):
+            monomer = monomers.get(name=row['Integrin_name'])
+            protein = proteins.get(
+                uniprot=row['UniProt_accession'], species="Homo sapiens",
+            )
 
-        # First parse the file and set self._data
-        self._parse_file()
+            for name in self._parse_alternative_names(row):
+                _, added = alternative_names.get_or_add(
+                    protein=protein, name=name, row=number,
+                )
+                self._alternative_name_message(protein, name, added)
+
+            for short, start, stop in self._parse_structures(row):
+                structure = structures.get(short=short)
+
+                monomer_structures.append(MonomerToStructure(
+                    monomer=monomer,
+                    structure=structure,
+                    start=start,
+                    stop=stop,
+                ))
+                monomer_structure_rows.append(number)
+
+                self.messages.append(
+                    "Added new Structure '{0}' to Monomer '{1}'".format(
+                        structure, monomer,
+                    )
+                )
 
-        # Do some cleaning
-        self._clean_empty_dash()
+        alternative_names.save()
+        bulk_create(
+            MonomerToStructure, monomer_structures, self._batch_size,
+            monomer_structure_rows,
+        )
 
-        # Upload contents from each row one by one
-        for index_series in self._data.iterrows():
-            # extract Series from tuple
-            series = index_series[1]
+    def _post_upload(self):
+        """ Rebuild the search index with the uploaded rows.
+        """
 
-            self._upload_row(series)
+        rebuild_search_index()
 
 
-class DimerParser(object):
+class DimerParser(SheetParser):
     """ A parser for Dimer objects.
 
     Attributes:
@@ -418,28 +636,28 @@ class DimerParser(object):
     The "Dimer_name" values should be the same as those used for `Monomer.name`
     """
 
-    def __init__(self, filename):
-        """ Parse and Upload Dimers.
+    @staticmethod
+    def _parse_dimer_name(dimer_name):
+        """ Return the names of the alpha and beta Monomers of 'dimer_name'.
         """
 
-        self._filename = filename
+        # Format of each entry is "<alpha-name>/<beta-name>"
+        dimer_re = re.compile(
+            r"(?P<alpha>\S+)/(?P<beta>\S+)"
+        )
 
-        self._data = []
-        self.messages = []
+        match = dimer_re.match(dimer_name)
+
+        return match.group('alpha'), match.group('beta')
 
     def _upload_row(self, series):
         """ Upload a single row.
         """
 
-        # Format of each entry is "<alpha-name>/<beta-name>"
-        dimer_re = re.compile(
-            r"(?P<alpha>\S+)/(?P<beta>\S+)"
-        )
+        alpha_name, beta_name = self._parse_dimer_name(series['Dimer_name'])
 
-        match = dimer_re.match(series['Dimer_name'])
-
-        alpha = Monomer.objects.get(name=match.group('alpha'))
-        beta = Monomer.objects.get(name=match.group('beta'))
+        alpha = Monomer.objects.get(name=alpha_name)
+        beta = Monomer.objects.get(name=beta_name)
 
         Dimer.objects.create(
             alpha=alpha,
@@ -453,29 +671,43 @@ class DimerParser(object):
             "Added Dimer: {0}".format(series['Dimer_name'])
         )
 
-    def _parse_file(self):
-        """ Parse the excel file, and store the data in self._data as a pandas
-        DataFrame.
+    def _bulk_upload(self, rows, row_numbers):
+        """ Upload all rows, creating the Dimers in bulk. The Monomers are
+        looked up from a LookupTable, instead of with a query per row.
         """
 
-        self._data = pd.read_excel(self._filename)
+        names = [self._parse_dimer_name(row['Dimer_name']) for row in rows]
+        monomers = LookupTable(
+            Monomer.objects.all(), ('name',),
+            values=[name for pair in names for name in pair],
+        )
+        dimers = []
+
+        for row, (alpha_name, beta_name) in zip(rows, names):
+            dimer = Dimer(
+                alpha=monomers.get(name=alpha_name),
+                beta=monomers.get(name=beta_name),
 
-    def parse_and_upload(self):
-        """ Parse self._filename and upload all contents.
-        """
+                expression=row['Expression'],
+                function=row['Function']
+            )
+            dimer.populate_fields()
+            dimers.append(dimer)
 
-        # First parse the file and set self._data
-        self._parse_file()
+            self.messages.append(
+                "Added Dimer: {0}".format(row['Dimer_name'])
+            )
 
-        # Upload contents from each row one by one
-        for index_series in self._data.iterrows():
-            # extract Series from tuple
-            series = index_series[1]
+        bulk_create(Dimer, dimers, self._batch_size, row_numbers)
+
+    def _post_upload(self):
+        """ Rebuild the search index with the uploaded rows.
+        """
 
-            self._upload_row(series)
+        rebuild_search_index()
 
 
-class PdbParser(object):
+class PdbParser(SheetParser):
     """ A parser for Pdbobjects.
 
     Attributes:
@@ -545,35 +777,33 @@ class PdbParser(object):
       In case of no protein interactors, use "N/A", "-", or leave empty.
     """
 
-    def __init__(self, filename):
-        """ Parse and Upload Dimers.
-        """
-
-        self._filename = filename
-
-        self._data = []
-        self.messages = []
+    # All missing values, including "-", are converted to None
+    SHEET_NA_VALUES = NA_VALUES | {"-"}
+    SHEET_NA = None
 
-    def _upload_protein_interactors(self, pdb, series):
-        """ Uploads the protein interactors from the series.
+    @staticmethod
+    def _parse_protein_interactors(series):
+        """ Parse the protein interactors from the series.
 
         Args:
-            pdb (obj:`Pdb`): The Pdb instance to upload for
             series (obj:`pandas.DataSeries`): Containing a
               "Protein_interactors" column.
 
+        Returns:
+            protein_interactors (list): (uniprot, species, start, stop) tuples
+
         Raises:
             Exception:  if there are issues parsing any structures.
         """
 
         # If there are no Protein_interactors, return
         if series["Protein_interactors"] is None:
-            return None
+            return []
 
         protein_interactors = series["Protein_interactors"].split("|")
 
         # Clean up empty strings from list. (see also
-        # MonomerParser._upload_alternative_names)
+        # MonomerParser._parse_alternative_names)
         protein_interactors = [p for p in protein_interactors if p]
 
         # Format of native entries:
@@ -593,6 +823,8 @@ class PdbParser(object):
             "(?P<start>\d+)-(?P<stop>\d+)\((?P<species>.*)\)$"
         )
 
+        parsed = []
+
         for protein_interactor in protein_interactors:
 
             # Try both regular expressions
@@ -618,17 +850,41 @@ class PdbParser(object):
                     "Something wrong, how did we get here?"
                 )
 
+            parsed.append((
+                match.group('uniprot'),
+                species,
+                match.group('start'),
+                match.group('stop'),
+            ))
+
+        return parsed
+
+    def _upload_protein_interactors(self, pdb, series):
+        """ Uploads the protein interactors from the series.
+
+        Args:
+            pdb (obj:`Pdb`): The Pdb instance to upload for
+            series (obj:`pandas.DataSeries`): Containing a
+              "Protein_interactors" column.
+
+        Raises:
+            Exception:  if there are issues parsing any structures.
+        """
+
+        for uniprot, species, start, stop in self._parse_protein_interactors(
+                series):
+
             # Get or create the protein
             # protein, _ = Protein.objects.get_or_create(
-            #     uniprot=match.group('uniprot'),
+            #     uniprot=uniprot,
             #     species=species,
             # )
             try:
-                protein, created = Protein.objects.get_or_create(uniprot=match.group('uniprot'))
+                protein, created = Protein.objects.get_or_create(uniprot=uniprot)
 
             except ObjectDoesNotExist:
                 protein = Protein.objects.get_or_create(
-                    uniprot=match.group('uniprot'),
+                    uniprot=uniprot,
                     species=species,
                 )
 
@@ -637,19 +893,23 @@ class PdbParser(object):
                 pdb=pdb,
                 protein=protein,
                 # chains=match.group('chains'),
-                start=match.group('start'),
-                stop=match.group('stop'),
+                start=start,
+                stop=stop,
             )
 
             pdb_to_protein.save()
 
-    def _upload_other_interactors(self, pdb, series):
-        """ Uploads the other interactors from the series.
+    @staticmethod
+    def _parse_other_interactors(series):
+        """ Parse the other interactors from the series.
 
         Args:
-            pdb (obj:`Pdb`): The Pdb instance to upload for
             series (obj:`pandas.DataSeries`): Containing a
               "Other_interactors" column.
+
+        Returns:
+            other_interactors (str): The "," separated other interactors
+            None: None if the value is None
         """
 
         # If there are no Other_interactors, return
@@ -659,22 +919,45 @@ class PdbParser(object):
         other_interactors = series["Other_interactors"].split("|")
 
         # Clean up empty strings from list. (see also
-        # MonomerParser._upload_alternative_names)
+        # MonomerParser._parse_alternative_names)
         other_interactors = [p for p in other_interactors if p]
 
         # For now, don't use the list, just save as one long string
-        pdb.other_interactors = ",".join(other_interactors)
-        pdb.save()
+        return ",".join(other_interactors)
 
-    def _upload_domains(self, pdb, series):
-        """ Uploads domains from the series.
+    def _upload_other_interactors(self, pdb, series):
+        """ Uploads the other interactors from the series.
 
         Args:
             pdb (obj:`Pdb`): The Pdb instance to upload for
+            series (obj:`pandas.DataSeries`): Containing a
+              "Other_interactors" column.
+        """
+
+        other_interactors = self._parse_other_interactors(series)
+
+        # If there are no Other_interactors, return
+        if other_interactors is None:
+            return None
+
+        pdb.other_interactors = other_interactors
+        pdb.save()
+
+    @staticmethod
+    def _parse_domains(series):
+        """ Parse the domains from the series.
+
+        Args:
             series (obj:`pandas.DataSeries`): Containing a
               "Alpha_domains" and/or a "Beta_domains" column(s)
+
+        Returns:
+            domains (list): (column, short) tuples, where column is
+                "Alpha_domains" or "Beta_domains"
         """
 
+        parsed = []
+
         for monomer in ['Alpha_domains', 'Beta_domains']:
 
             # skip if None
@@ -684,23 +967,36 @@ class PdbParser(object):
             domains = series[monomer].split("|")
 
             # Clean up empty strings from list. (see also
-            # MonomerParser._upload_alternative_names)
+            # MonomerParser._parse_alternative_names)
             domains = [d for d in domains if d]
 
-            for domain in domains:
+            parsed.extend((monomer, domain) for domain in domains)
 
-                # get the Structure/Domain instance
-                structure = Structure.objects.get(short=domain)
+        return parsed
 
-                if monomer == 'Alpha_domains':
-                    pdb.alpha_domain.add(structure)
-                elif monomer == 'Beta_domains':
-                    pdb.beta_domain.add(structure)
-                else:
-                    raise Exception(
-                        "Something has gone wrong, how did we get here?"
-                    )
-                pdb.save()
+    def _upload_domains(self, pdb, series):
+        """ Uploads domains from the series.
+
+        Args:
+            pdb (obj:`Pdb`): The Pdb instance to upload for
+            series (obj:`pandas.DataSeries`): Containing a
+              "Alpha_domains" and/or a "Beta_domains" column(s)
+        """
+
+        for monomer, domain in self._parse_domains(series):
+
+            # get the Structure/Domain instance
+            structure = Structure.objects.get(short=domain)
+
+            if monomer == 'Alpha_domains':
+                pdb.alpha_domain.add(structure)
+            elif monomer == 'Beta_domains':
+                pdb.beta_domain.add(structure)
+            else:
+                raise Exception(
+                    "Something has gone wrong, how did we get here?"
+                )
+            pdb.save()
 
     def _pdb_parser(self, series):
         """
@@ -749,6 +1045,20 @@ class PdbParser(object):
                 chain (str): The text after ":" stored in the same column.
             (None, None): None if the value is None
         """
+        name, chain = self._monomer_name_chain_parser(series, monomer)
+
+        if name is None:
+            return (None, None)
+
+        monomer = Monomer.objects.get(name=name)
+
+        return (monomer, chain)
+
+    @staticmethod
+    def _monomer_name_chain_parser(series, monomer):
+        """ Like `_monomer_chain_parser`, but returns the name of the Monomer
+        instead of the instance.
+        """
         # print("--->", monomer)
         col = "{0}_subunit".format(monomer)
         # print(col)
@@ -765,9 +1075,7 @@ class PdbParser(object):
         name = series[col]
         chain = ""
 
-        monomer = Monomer.objects.get(name=name)
-
-        return (monomer, chain)
+        return (name, chain)
 
     def _upload_row(self, series):
         """ Upload a single row.
@@ -800,30 +1108,121 @@ class PdbParser(object):
             "Added Pdb: {0}".format(pdb.pdb)
         )
 
-    def _parse_file(self):
-        """ Parse the excel file, and store the data in self._data as a pandas
-        DataFrame. All 'nan' values are converted to None
+    def _bulk_upload(self, rows, row_numbers):
+        """ Upload all rows, creating the Pdbs, their domains, Proteins and
+        PdbToProteins in bulk. Foreign keys are resolved from LookupTables,
+        instead of with a query per row.
         """
 
-        df = pd.read_excel(self._filename, na_values='-')
-        self._data = df.where(df.notna(), None)
+        monomers = LookupTable(
+            Monomer.objects.all(), ('name',),
+            values=[
+                self._monomer_name_chain_parser(row, monomer)[0]
+                for row in rows
+                for monomer in ('alpha', 'beta')
+            ],
+        )
+        new_pdbs = []
+
+        for row in rows:
+            pdb = Pdb(
+                pdb=self._pdb_parser(row),
+                exp_tech=self._exp_tech_parser(row),
+                resolution=self._resolution_parser(row),
+                other_interactors=self._parse_other_interactors(row),
+            )
 
-    def parse_and_upload(self):
-        """ Parse self._filename and upload all contents.
-        """
+            for monomer in ('alpha', 'beta'):
+                name, chain = self._monomer_name_chain_parser(row, monomer)
 
-        # First parse the file and set self._data
-        self._parse_file()
+                if name is not None:
+                    setattr(pdb, monomer, monomers.get(name=name))
+                setattr(pdb, '{0}_chain'.format(monomer), chain)
+
+            pdb.check_subunits()
+            new_pdbs.append(pdb)
+
+        bulk_create(Pdb, new_pdbs, self._batch_size, row_numbers)
+
+        pdbs = LookupTable(
+            Pdb.objects.all(), ('pdb',), values=[pdb.pdb for pdb in new_pdbs],
+        )
+        structures = LookupTable(
+            Structure.objects.all(), ('short',),
+            values=[
+                domain
+                for row in rows
+                for _, domain in self._parse_domains(row)
+            ],
+        )
+
+        # NOTE: As in _upload_protein_interactors, proteins are looked up by
+        # their uniprot only
+        proteins = LookupTable(
+            Protein.objects.all(), ('uniprot',), self._batch_size,
+            values=[
+                uniprot
+                for row in rows
+                for uniprot, _, _, _ in self._parse_protein_interactors(row)
+            ],
+        )
+        for number, row in zip(row_numbers, rows):
+            for uniprot, _, _, _ in self._parse_protein_interactors(row):
+                proteins.get_or_add(uniprot=uniprot, row=number)
+        proteins.save()
+
+        # Adding a domain twice adds it once, as with add()
+        domains = {'Alpha_domains': set(), 'Beta_domains': set()}
+        pdb_to_proteins = []
+        pdb_to_protein_rows = []
+
+        for number, row in zip(row_numbers, rows):
+            pdb = pdbs.get(pdb=self._pdb_parser(row))
+
+            for monomer, domain in self._parse_domains(row):
+                structure = structures.get(short=domain)
+                domains[monomer].add((pdb.pk, structure.pk))
+
+            for uniprot, _, start, stop in self._parse_protein_interactors(
+                    row):
+                pdb_to_proteins.append(PdbToProtein(
+                    pdb=pdb,
+                    protein=proteins.get(uniprot=uniprot),
+                    start=start,
+                    stop=stop,
+                ))
+                pdb_to_protein_rows.append(number)
+
+            self.messages.append(
+                "Added Pdb: {0}".format(pdb.pdb)
+            )
+
+        for monomer, through in (
+                ('Alpha_domains', Pdb.alpha_domain.through),
+                ('Beta_domains', Pdb.beta_domain.through),
+        ):
+            bulk_create(
+                through,
+                [
+                    through(pdb_id=pdb_id, structure_id=structure_id)
+                    for pdb_id, structure_id in sorted(domains[monomer])
+                ],
+                self._batch_size,
+            )
+
+        bulk_create(
+            PdbToProtein, pdb_to_proteins, self._batch_size,
+            pdb_to_protein_rows,
+        )
 
-        # Upload contents from each row one by one
-        for index_series in self._data.iterrows():
-            # extract Series from tuple
-            series = index_series[1]
+    def _post_upload(self):
+        """ Rebuild the search index with the uploaded rows.
+        """
 
-            self._upload_row(series)
+        rebuild_search_index()
 
 
-class DrugParser(object):
+class DrugParser(SheetParser):
     """ A parser for Drugobjects.
 
     Attributes:
@@ -855,31 +1254,16 @@ class DrugParser(object):
     The "Dimer_name" values should be the same as those used for `Monomer.name`
     """
 
-    def __init__(self, filename):
-        """ Parse and Upload Dimers.
-        """
-
-        self._filename = filename
-
-        self._data = []
-        self.messages = []
+    # All missing values, including "-", are converted to None
+    SHEET_NA_VALUES = NA_VALUES | {"-"}
+    SHEET_NA = None
 
-    def _upload_row(self, series):
-        """ Upload a single row.
-
-        raises:
-            ValueError: if series['Target_integrin'] is empty
+    @staticmethod
+    def _drug_fields(series):
+        """ Return the fields of the Drug in the row 'series'.
         """
 
-        # If "Target_integrin" is empty, splitting by "|" result in an empty
-        # string ("") (see also MonomerParser._upload_alternative_names), which
-        # will probably result in misleading "DoesNotExist" errors. To avoid
-        # this, check here, and raise a clearer Exception.
-        if not series["Target_integrin"]:
-            raise ValueError("'Target_integrin' cannot be empty")
-
-        # Create the drug object
-        drug = Drug.objects.create(
+        return dict(
             name=series['Name'],
             marketing_name=series['Marketing_name'],
             status=series['Status'],
@@ -892,11 +1276,40 @@ class DrugParser(object):
             notes=series['Notes'],
         )
 
+    @staticmethod
+    def _parse_target_integrins(series):
+        """ Return the lookup_names of the Dimers in the "Target_integrin"
+        column of the row 'series'.
+
+        raises:
+            ValueError: if series['Target_integrin'] is empty
+        """
+
+        # If "Target_integrin" is empty, splitting by "|" result in an empty
+        # string ("") (see also MonomerParser._parse_alternative_names), which
+        # will probably result in misleading "DoesNotExist" errors. To avoid
+        # this, check here, and raise a clearer Exception.
+        if not series["Target_integrin"]:
+            raise ValueError("'Target_integrin' cannot be empty")
+
         dimernames = series['Target_integrin'].split("|")
 
-        for dimername in dimernames:
-            # Use the lookup_name to retrieve the Dimer object
-            lookup_name = dimername.replace("/", "_")
+        # Use the lookup_name to retrieve the Dimer object
+        return [dimername.replace("/", "_") for dimername in dimernames]
+
+    def _upload_row(self, series):
+        """ Upload a single row.
+
+        raises:
+            ValueError: if series['Target_integrin'] is empty
+        """
+
+        lookup_names = self._parse_target_integrins(series)
+
+        # Create the drug object
+        drug = Drug.objects.create(**self._drug_fields(series))
+
+        for lookup_name in lookup_names:
             dimer = Dimer.objects.get(lookup_name=lookup_name)
 
             # Add the Dimer/Drug interaction
@@ -912,30 +1325,67 @@ class DrugParser(object):
                 )
             )
 
-    def _parse_file(self):
-        """ Parse the excel file, and store the data in self._data as a pandas
-        DataFrame.
+    def _bulk_upload(self, rows, row_numbers):
+        """ Upload all rows, creating the Drugs and DimerToDrugs in bulk. The
+        Dimers are looked up from a LookupTable, instead of with a query per
+        row.
+
+        raises:
+            ValueError: if any row's 'Target_integrin' is empty
         """
 
-        df = pd.read_excel(self._filename, na_values="-")
-        self._data = df.where(df.notna(), None)
+        # Check all rows before creating anything
+        lookup_names = [self._parse_target_integrins(row) for row in rows]
 
-    def parse_and_upload(self):
-        """ Parse self._filename and upload all contents.
-        """
+        bulk_create(
+            Drug, [Drug(**self._drug_fields(row)) for row in rows],
+            self._batch_size, row_numbers,
+        )
 
-        # First parse the file and set self._data
-        self._parse_file()
+        drugs = LookupTable(
+            Drug.objects.all(), ('name',),
+            values=[row['Name'] for row in rows],
+        )
+        dimers = LookupTable(
+            Dimer.objects.select_related('alpha', 'beta'), ('lookup_name',),
+            values=[
+                lookup_name
+                for row_lookup_names in lookup_names
+                for lookup_name in row_lookup_names
+            ],
+        )
+        dimer_to_drugs = []
+        dimer_to_drug_rows = []
+
+        for number, row, row_lookup_names in zip(
+                row_numbers, rows, lookup_names):
+            drug = drugs.get(name=row['Name'])
+
+            for lookup_name in row_lookup_names:
+                dimer = dimers.get(lookup_name=lookup_name)
+
+                dimer_to_drugs.append(DimerToDrug(drug=drug, dimer=dimer))
+                dimer_to_drug_rows.append(number)
+
+                self.messages.append(
+                    "Added Integrin Drug: {0} - {1}".format(
+                        drug.name,
+                        dimer.display_name(),
+                    )
+                )
 
-        # Upload contents from each row one by one
-        for index_series in self._data.iterrows():
-            # extract Series from tuple
-            series = index_series[1]
+        bulk_create(
+            DimerToDrug, dimer_to_drugs, self._batch_size, dimer_to_drug_rows,
+        )
+
+    def _post_upload(self):
+        """ Rebuild the search index with the uploaded rows.
+        """
 
-            self._upload_row(series)
+        rebuild_search_index()
 
 
-class ProteinInteractorParser(object):
+class ProteinInteractorParser(SheetParser):
     """ A parser for Interactions.
 
     Attributes:
@@ -983,14 +1433,29 @@ class ProteinInteractorParser(object):
 
     """
 
-    def __init__(self, filename):
-        """ Parse and Upload Interactions.
-        """
-
-        self._filename = filename
-
-        self._data = []
-        self.messages = []
+    # All missing values are converted to "-"
+    SHEET_NA_VALUES = NA_VALUES | {"-"}
+    SHEET_NA = "-"
+
+    # The ProteinInteractor fields, and the columns they are read from.
+    INTERACTOR_COLUMNS = (
+        ('type_of_interaction', 'Type of interaction'),
+        ('type_of_evidence', 'Type of evidence (positive / negative)'),
+        ('construct_boundaries', 'Construct boundaries'),
+        ('interacting_region_boundaries', 'Interacting region boundaries'),
+        ('oligomerization_state', 'Oligomerization state'),
+        ('motif', 'ELM link (if motif mediated)'),
+        ('target_integrin', 'Target integrin'),
+        ('pubmed', 'PubMed ID'),
+        ('experimental_method', 'Experimental method'),
+        ('eco', 'ECO accession'),
+        ('competitor', 'Competitor (if applicable)'),
+        ('interaction_strength', 'Interaction strength (Kd, IC50, etc)'),
+        ('interaction_strength_numeral',
+         'Interaction strength in nM, single value'),
+        ('xref', 'Xref for bound structure (if applicable)'),
+        ('notes', 'Notes'),
+    )
 
     def _upload_protein(self, series):
         """ Upload the AlternativeNames for 'protein'.
@@ -1015,6 +1480,13 @@ class ProteinInteractorParser(object):
                 uniprot=series['UniProt accession'].strip(),
                 peptide=series['Peptide name'].strip(),
             )
+        self._protein_message(protein, created)
+        return protein
+
+    def _protein_message(self, protein, created):
+        """ Add the message for the (created or existing) Protein 'protein'.
+        """
+
         if created:
             self.messages.append(
                 "Created new Protein '{0}'".format(protein)
@@ -1023,7 +1495,6 @@ class ProteinInteractorParser(object):
             self.messages.append(
                 "Protein '{0}' already exists in the Protein table".format(protein)
             )
-        return protein
 
     def _upload_protein_interactor(self, protein, series):
         """ Upload the ToProteinInteractor objects.
@@ -1044,23 +1515,18 @@ class ProteinInteractorParser(object):
         # print("Protein---->", protein)
         protein_intractor, created = ProteinInteractor.objects.get_or_create(
             protein=protein,
-            type_of_interaction=series['Type of interaction'],
-            type_of_evidence=series['Type of evidence (positive / negative)'],
-            construct_boundaries=series['Construct boundaries'],
-            interacting_region_boundaries=series['Interacting region boundaries'],
-            oligomerization_state=series['Oligomerization state'],
-            motif=series['ELM link (if motif mediated)'],
-            target_integrin=series['Target integrin'],
-            pubmed=series['PubMed ID'],
-            experimental_method=series['Experimental method'],
-            eco=series['ECO accession'],
-            competitor=series['Competitor (if applicable)'],
-            interaction_strength=series['Interaction strength (Kd, IC50, etc)'],
-            interaction_strength_numeral=series['Interaction strength in nM, single value'],
-            xref=series['Xref for bound structure (if applicable)'],
-            notes=series['Notes']
+            **self._interactor_fields(series)
         )
         # ("created")
+        self._protein_interactor_message(protein_intractor, created)
+
+        return protein_intractor
+
+    def _protein_interactor_message(self, protein_intractor, created):
+        """ Add the message for the (created or existing) ProteinInteractor
+        'protein_intractor'.
+        """
+
         if created:
             self.messages.append(
                 "Added ProteinInteractor' {0}'".format(protein_intractor))
@@ -1071,8 +1537,6 @@ class ProteinInteractorParser(object):
                 )
             )
 
-        return protein_intractor
-
     def _upload_row(self, series):
         """ Upload a single row.
         """
@@ -1089,48 +1553,105 @@ class ProteinInteractorParser(object):
         # Add DimerToProteinInteractor instances
         # self._upload_dimer_to_protein_interactors(protein_intractor, series)
 
-    def _parse_file(self):
+    def _interactor_fields(self, series):
+        """ Return the fields of the ProteinInteractor in the row 'series',
+        except for its protein.
         """
 
+        return {
+            field: series[column] for field, column in self.INTERACTOR_COLUMNS
+        }
 
-         Parse the excel file, and store the data in self._data as a pandas
-        DataFrame.
+    def _bulk_upload(self, rows, row_numbers):
+        """ Upload all rows, creating the Proteins and ProteinInteractors in
+        bulk. Existing instances are looked up from LookupTables, instead of
+        with a query per row.
         """
 
-        df = pd.read_excel(self._filename, na_values="-")
-        self._data = df.where(df.notna(), "-")
-        # print ("_parse_file")
+        # Peptides have no uniprot, and are identified by their name instead
+        proteins = LookupTable(
+            Protein.objects.exclude(uniprot="-"), ('uniprot',),
+            self._batch_size,
+            values=[row['UniProt accession'].strip() for row in rows],
+        )
+        peptides = LookupTable(
+            Protein.objects.filter(uniprot="-"), ('peptide', 'uniprot'),
+            self._batch_size,
+            values=[row['Peptide name'].strip() for row in rows],
+        )
 
-    # print(self._data)
+        for number, row in zip(row_numbers, rows):
+            if row["UniProt accession"] != "-":
+                protein, added = proteins.get_or_add(
+                    uniprot=row['UniProt accession'].strip(), row=number,
+                )
+            else:
+                protein, added = peptides.get_or_add(
+                    uniprot=row['UniProt accession'].strip(),
+                    peptide=row['Peptide name'].strip(),
+                    row=number,
+                )
+            self._protein_message(protein, added)
 
-    def parse_and_upload(self):
-        """ Parse self._filename and upload all contents.
-        """
-        # First parse the file and set self._data
-        self._parse_file()
+        proteins.save()
+        peptides.save()
+
+        row_proteins = []
+
+        for row in rows:
+            if row["UniProt accession"] != "-":
+                row_proteins.append(proteins.get(
+                    uniprot=row['UniProt accession'].strip(),
+                ))
+            else:
+                row_proteins.append(peptides.get(
+                    uniprot=row['UniProt accession'].strip(),
+                    peptide=row['Peptide name'].strip(),
+                ))
+
+        interactors = LookupTable(
+            ProteinInteractor.objects.all(),
+            ('protein',) + tuple(
+                field for field, _ in self.INTERACTOR_COLUMNS
+            ),
+            self._batch_size,
+            values=row_proteins,
+        )
+
+        for number, row, protein in zip(row_numbers, rows, row_proteins):
+            protein_intractor, added = interactors.get_or_add(
+                protein=protein, row=number, **self._interactor_fields(row)
+            )
+            if added:
+                protein_intractor.populate_fields()
 
-        # Upload contents from each row one by one
-        for index_series in self._data.iterrows():
-            series = index_series[1]
-            # print(series)  # extract Series from tuple
+            # The message names the protein, which is not fetched again for
+            # existing ProteinInteractors.
+            self._protein_interactor_message(protein, added)
 
-            self._upload_row(series)
+        interactors.save()
 
 
-class ProteinInformationParser(object):
+class ProteinInformationParser(SheetParser):
     """ A parser for Interactions.
     #TODO rewrite description
 
     """
 
-    def __init__(self, filename):
-        """ Parse and Upload Interactions.
-        """
-
-        self._filename = filename
-
-        self._data = []
-        self.messages = []
+    # All missing values are converted to "-"
+    SHEET_NA_VALUES = NA_VALUES | {"-"}
+    SHEET_NA = "-"
+
+    # The ProteinInformation fields, and the columns they are read from.
+    INFORMATION_COLUMNS = (
+        ('length', 'Length'),
+        ('name', 'Protein_name'),
+        ('alternative_name', 'Protein_name_alternative'),
+        ('gene_name', 'Gene_name'),
+        ('organism_scientific', 'Organism_scientific'),
+        ('organism_common', 'Organism_common'),
+        ('function', 'Function'),
+    )
 
     def _upload_protein(self, series):
         """ Upload the AlternativeNames for 'protein'.
@@ -1192,15 +1713,18 @@ class ProteinInformationParser(object):
 
         protein_information, created = ProteinInformation.objects.get_or_create(
             protein=protein,
-            length=series['Length'],
-            name=series['Protein_name'],
-            alternative_name=series['Protein_name_alternative'],
-            gene_name=series['Gene_name'],
-            organism_scientific=series['Organism_scientific'],
-            organism_common=series['Organism_common'],
-            function=series['Function'],
+            **self._information_fields(series)
         )
 
+        self._protein_information_message(protein_information, created)
+
+        return protein_information
+
+    def _protein_information_message(self, protein_information, created):
+        """ Add the message for the (created or existing) ProteinInformation
+        'protein_information'.
+        """
+
         if created:
             self.messages.append(
                 "Added ProteinInformation' {0}'".format(protein_information))
@@ -1211,8 +1735,6 @@ class ProteinInformationParser(object):
                 )
             )
 
-        return protein_information
-
     def _upload_row(self, series):
         """ Upload a single row.
         """
@@ -1226,25 +1748,53 @@ class ProteinInformationParser(object):
         # Create and save the ProteinInformation object
         protein_information = self._upload_protein_information(protein, series)
 
-    def _parse_file(self):
-        """ Parse the excel file, and store the data in self._data as a pandas
-        DataFrame.
+    def _information_fields(self, series):
+        """ Return the fields of the ProteinInformation in the row 'series',
+        except for its protein.
         """
 
-        df = pd.read_excel(self._filename, na_values="-")
-        self._data = df.where(df.notna(), "-")
-        print ("_parse_file")
-
-    # print(self._data)
+        return {
+            field: series[column] for field, column in self.INFORMATION_COLUMNS
+        }
 
-    def parse_and_upload(self):
-        """ Parse self._filename and upload all contents.
+    def _bulk_upload(self, rows, row_numbers):
+        """ Upload all rows, creating the Proteins and ProteinInformation in
+        bulk. Existing instances are looked up from LookupTables, instead of
+        with a query per row.
         """
-        # First parse the file and set self._data
-        self._parse_file()
 
-        # Upload contents from each row one by one
-        for index_series in self._data.iterrows():
-            series = index_series[1]  # extract Series from tuple
-            # print(series)
-            self._upload_row(series)
+        proteins = LookupTable(
+            Protein.objects.all(), ('uniprot',), self._batch_size,
+            values=[row['Accession'] for row in rows],
+        )
+        for number, row in zip(row_numbers, rows):
+            proteins.get_or_add(
+                uniprot=row['Accession'],
+                defaults={'species': row['Organism_scientific']},
+                row=number,
+            )
+        proteins.save()
+
+        informations = LookupTable(
+            ProteinInformation.objects.all(),
+            ('protein',) + tuple(
+                field for field, _ in self.INFORMATION_COLUMNS
+            ),
+            self._batch_size,
+            values=[proteins.get(uniprot=row['Accession']) for row in rows],
+        )
+
+        for number, row in zip(row_numbers, rows):
+            protein = proteins.get(uniprot=row['Accession'])
+
+            protein_information, added = informations.get_or_add(
+                protein=protein, row=number, **self._information_fields(row)
+            )
+            if added:
+                protein_information.populate_fields()
+
+            # The message names the protein, which is not fetched again for
+            # existing ProteinInformation.
+            self._protein_information_message(protein, added)
+
+        informations.save()
@@ -0,0 +1,130 @@
+from app.models import Dimer
+from app.models import Drug
+from app.models import Monomer
+from app.models import Pdb
+from app.models import ProteinSummary
+from app.models import SearchDocument
+from django.urls import reverse
+
+
+def _document(*values):
+    """ Return the (lower case) searchable text of some field values.
+    """
+
+    return " ".join(str(value) for value in values if value).lower()
+
+
+def interactor_document(summary, position=0):
+    """ Return the (unsaved) SearchDocument of a ProteinSummary.
+    """
+
+    if summary.uniprot == "-":
+        label = summary.peptide
+        url = reverse('interactions', args=(summary.protein_id,))
+    else:
+        label = "{0} ({1})".format(summary.name, summary.uniprot)
+        url = reverse('interactions', args=(summary.uniprot,))
+
+    return SearchDocument(
+        entity_type=SearchDocument.INTERACTOR,
+        object_id=summary.pk,
+        position=position,
+        label=label,
+        detail=summary.organism,
+        url=url,
+        document=summary.document,
+    )
+
+
+def _interactor_documents():
+    summaries = ProteinSummary.objects.only(
+        'protein_id', 'uniprot', 'peptide', 'name', 'organism', 'document',
+    )
+
+    for position, summary in enumerate(summaries):
+        yield interactor_document(summary, position)
+
+
+def _integrin_documents():
+    dimers = Dimer.objects.select_related('alpha', 'beta').order_by(
+        'lookup_name'
+    )
+
+    for position, dimer in enumerate(dimers):
+        yield SearchDocument(
+            entity_type=SearchDocument.INTEGRIN,
+            object_id=dimer.pk,
+            position=position,
+            label=dimer.display_name(),
+            detail=dimer.lookup_name,
+            url=reverse('dimer', args=(dimer.lookup_name,)),
+            document=_document(dimer.lookup_name, dimer.display_name()),
+        )
+
+
+def _subunit_documents():
+    monomers = Monomer.objects.select_related('protein').order_by('name')
+
+    for position, monomer in enumerate(monomers):
+        yield SearchDocument(
+            entity_type=SearchDocument.SUBUNIT,
+            object_id=monomer.pk,
+            position=position,
+            label=monomer.display_name(),
+            detail=monomer.gene_name,
+            url=reverse(monomer.subunit, args=(monomer.name,)),
+            document=_document(
+                monomer.name,
+                monomer.display_name(),
+                monomer.gene_name,
+                monomer.ensg,
+                monomer.protein.uniprot,
+            ),
+        )
+
+
+def _drug_documents():
+    for position, drug in enumerate(Drug.objects.order_by('name')):
+        yield SearchDocument(
+            entity_type=SearchDocument.DRUG,
+            object_id=drug.pk,
+            position=position,
+            label=drug.name,
+            detail=drug.marketing_name or "",
+            url=reverse('drug', args=(drug.name,)),
+            document=_document(drug.name, drug.marketing_name, drug.atc),
+        )
+
+
+def _structure_documents():
+    pdbs = Pdb.objects.only('pdb', 'exp_tech').order_by('pdb')
+
+    for position, pdb in enumerate(pdbs):
+        yield SearchDocument(
+            entity_type=SearchDocument.STRUCTURE,
+            object_id=pdb.pk,
+            position=position,
+            label=pdb.pdb,
+            detail=pdb.exp_tech,
+            url=reverse('pdb', args=(pdb.pdb,)),
+            document=_document(pdb.pdb),
+        )
+
+
+def build_search_documents():
+    """ Return the (unsaved) SearchDocuments of all ProteinSummaries,
+    Dimers, Monomers, Drugs and Pdbs.
+    """
+
+    documents = []
+
+    for builder in (
+            _interactor_documents,
+            _integrin_documents,
+            _subunit_documents,
+            _drug_documents,
+            _structure_documents,
+    ):
+        documents.extend(builder())
+
+    return documents
@@ -0,0 +1,288 @@
+import functools
+import re
+
+from collections import namedtuple
+
+from app.models import SearchDocument
+from app.search_documents import build_search_documents
+from django.db import connection
+from django.db import OperationalError
+from django.db import transaction
+
+# The search terms of a query: words, everything else separates terms.
+TERM_PATTERN = re.compile(r"\w+")
+
+# The table of the SearchDocuments, whose documents are indexed.
+SEARCH_TABLE = 'app_searchdocument'
+
+# The Postgres column (and its GIN index) indexing the documents.
+VECTOR_COLUMN = 'search_vector'
+
+# The number of results listed per entity type.
+SEARCH_PAGE_SIZE = 20
+
+
+def _fts_table(table):
+    """ Return the SQLite FTS5 table indexing the documents of 'table'.
+    """
+
+    return "{0}_fts".format(table)
+
+
+def _vector_index(table):
+    """ Return the Postgres GIN index of the documents of 'table'.
+    """
+
+    return "{0}_{1}".format(table, VECTOR_COLUMN)
+
+
+def create_search_index(schema_editor, table=SEARCH_TABLE):
+    """ Create the full text index of the 'document' column of a table: a
+    tsvector column with a GIN index on Postgres, or an FTS5 table on SQLite.
+    Nothing is created for other databases, or if SQLite was built without
+    FTS5, and searches fall back to a sequential scan.
+    """
+
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE {0} ADD COLUMN {1} tsvector".format(
+                table, VECTOR_COLUMN
+            )
+        )
+        schema_editor.execute(
+            "CREATE INDEX {0} ON {1} USING gin({2})".format(
+                _vector_index(table), table, VECTOR_COLUMN
+            )
+        )
+    elif vendor == 'sqlite':
+        try:
+            schema_editor.execute(
+                "CREATE VIRTUAL TABLE {0} USING fts5(document, "
+                "content='{1}', content_rowid='id')".format(
+                    _fts_table(table), table
+                )
+            )
+        except OperationalError:
+            pass
+
+    _has_fts_table.cache_clear()
+
+
+def drop_search_index(schema_editor, table=SEARCH_TABLE):
+    """ Remove the full text index created by `create_search_index`.
+    """
+
+    vendor = schema_editor.connection.vendor
+
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            "ALTER TABLE {0} DROP COLUMN {1}".format(table, VECTOR_COLUMN)
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            "DROP TABLE IF EXISTS {0}".format(_fts_table(table))
+        )
+
+    _has_fts_table.cache_clear()
+
+
+@functools.lru_cache()
+def _has_fts_table(table=SEARCH_TABLE):
+    """ Return whether the SQLite FTS5 table of 'table' exists. This is only
+    checked once, until the index is created or dropped.
+    """
+
+    return _fts_table(table) in connection.introspection.table_names()
+
+
+def index_search_documents(table=SEARCH_TABLE):
+    """ Index the documents of all rows of a table with a full text index.
+    """
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                "UPDATE {0} SET {1} = to_tsvector('simple', document)".format(
+                    table, VECTOR_COLUMN
+                )
+            )
+        elif connection.vendor == 'sqlite' and _has_fts_table(table):
+            cursor.execute(
+                "INSERT INTO {0}({0}) VALUES('rebuild')".format(
+                    _fts_table(table)
+                )
+            )
+
+
+def rebuild_search_index():
+    """ Delete and rebuild all SearchDocuments, and index them. This must run
+    whenever data has been uploaded or deleted, and after the ProteinSummary
+    table has been rebuilt.
+
+    Returns:
+        count (int): The number of SearchDocuments created
+    """
+
+    documents = build_search_documents()
+
+    with transaction.atomic():
+        SearchDocument.objects.all().delete()
+        SearchDocument.objects.bulk_create(documents)
+        index_search_documents()
+
+    return len(documents)
+
+
+def search_terms(query):
+    """ Return the (lower case) search terms of a query.
+    """
+
+    return TERM_PATTERN.findall(query.lower())
+
+
+def _is_indexed():
+    """ Return whether the documents have a full text index.
+    """
+
+    return connection.vendor == 'postgresql' or (
+        connection.vendor == 'sqlite' and _has_fts_table()
+    )
+
+
+def _match(terms):
+    """ Select the SearchDocuments 'd' which contain all terms, as word
+    prefixes.
+
+    Returns:
+        tables (str): The FROM clause
+        match (str): The WHERE clause
+        params (list): The parameters of both clauses
+        score (str): The score of a document, lowest for the best matches
+    """
+
+    if connection.vendor == 'postgresql':
+        return (
+            "{0} d, to_tsquery('simple', %s) query".format(SEARCH_TABLE),
+            "d.{0} @@ query".format(VECTOR_COLUMN),
+            [" & ".join("{0}:*".format(term) for term in terms)],
+            "-ts_rank(d.{0}, query)".format(VECTOR_COLUMN),
+        )
+    elif _is_indexed():
+        fts_table = _fts_table(SEARCH_TABLE)
+        return (
+            "{0} JOIN {1} d ON d.id = {0}.rowid".format(
+                fts_table, SEARCH_TABLE
+            ),
+            "{0} MATCH %s".format(fts_table),
+            [" ".join('"{0}"*'.format(term) for term in terms)],
+            "{0}.rank".format(fts_table),
+        )
+
+    # Without a full text index, scan the documents sequentially. All
+    # matches score the same, and are listed in curation order.
+    return (
+        "{0} d".format(SEARCH_TABLE),
+        " AND ".join(["d.document LIKE %s"] * len(terms)),
+        ["%{0}%".format(term) for term in terms],
+        "0",
+    )
+
+
+# A page of the SearchDocuments of one entity type matching a query.
+SearchGroup = namedtuple('SearchGroup', [
+    'entity_type', 'name', 'count', 'documents', 'next_cursor',
+])
+
+
+def search_documents(query, cursors=None, page_size=SEARCH_PAGE_SIZE):
+    """ Search the SearchDocuments of all entity types for all terms of a
+    query, in a single query.
+
+    Args:
+        query (str): The search query
+        cursors (dict): For some entity types, the number of documents
+            listed on the previous pages, to list the following page of that
+            type instead of the first
+        page_size (int): The number of documents listed per entity type.
+            Default = SEARCH_PAGE_SIZE
+
+    Returns:
+        groups (list): A SearchGroup for each entity type with matches, in
+            the order of SearchDocument.ENTITY_TYPES. The documents of a
+            group are ranked, best matches first (and in curation order
+            among equal matches). The next_cursor of a group is None on its
+            last page.
+    """
+
+    terms = search_terms(query)
+
+    if not terms:
+        return []
+
+    tables, match, params, score = _match(terms)
+
+    # The cursor of the entity type of each row, 0 for the first page.
+    after = "0"
+    after_params = []
+
+    for entity_type, cursor in (cursors or {}).items():
+        after = "CASE WHEN d.entity_type = %s THEN %s ELSE {0} END".format(
+            after
+        )
+        after_params = [entity_type, cursor] + after_params
+
+    # Counting every match of a type gives its total, and numbering the
+    # matches of a type by rank gives the rows of each page.
+    sql = (
+        "SELECT entity_type, object_id, label, detail, url, position, total, "
+        "page_row FROM (SELECT *, "
+        "COUNT(*) OVER (PARTITION BY entity_type) AS total, "
+        "ROW_NUMBER() OVER (PARTITION BY entity_type "
+        "ORDER BY score, position) AS page_row "
+        "FROM (SELECT d.entity_type, d.object_id, d.label, d.detail, d.url, "
+        "d.position, {score} AS score, {after} AS after "
+        "FROM {tables} WHERE {match}) matches) ranked "
+        "WHERE page_row > after AND page_row <= after + %s "
+        "ORDER BY entity_type, page_row"
+    ).format(score=score, after=after, tables=tables, match=match)
+
+    with connection.cursor() as cursor:
+        cursor.execute(sql, after_params + params + [page_size + 1])
+        rows = cursor.fetchall()
+
+    pages = {}
+    for (entity_type, object_id, label, detail, url, position, total,
+         page_row) in rows:
+        _, documents = pages.setdefault(entity_type, (total, []))
+        documents.append((page_row, SearchDocument(
+            entity_type=entity_type,
+            object_id=object_id,
+            position=position,
+            label=label,
+            detail=detail,
+            url=url,
+        )))
+
+    groups = []
+    for entity_type, name in SearchDocument.ENTITY_TYPES:
+        if entity_type not in pages:
+            continue
+
+        count, documents = pages[entity_type]
+        next_cursor = None
+
+        if len(documents) > page_size:
+            documents = documents[:page_size]
+            next_cursor = documents[-1][0]
+
+        groups.append(SearchGroup(
+            entity_type,
+            name,
+            count,
+            [document for _, document in documents],
+            next_cursor,
+        ))
+
+    return groups
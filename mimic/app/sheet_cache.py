@@ -0,0 +1,172 @@
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+from app.ingest import file_hash
+from app.sheets import NA_VALUES
+from app.sheets import read_sheet
+from django.conf import settings
+from pyarrow import feather
+
+# Part of the key of every cached sheet. Increment it whenever the way the
+# sheets are read (see app.sheets) or stored changes.
+CACHE_VERSION = 2
+
+
+def _digest(filename, parser, version, na_values, chunk_size):
+    """ Return the hex digest identifying the sheet of 'filename' read by
+    'version' of 'parser', with 'na_values' in chunks of 'chunk_size' rows.
+    """
+
+    return hashlib.sha1(
+        json.dumps([
+            CACHE_VERSION,
+            parser,
+            version,
+            sorted(na_values),
+            chunk_size,
+            file_hash(filename),
+        ]).encode('utf-8')
+    ).hexdigest()
+
+
+def _to_table(chunk):
+    """ Return the chunk as an arrow Table. The chunk has the object dtype,
+    with None for missing values.
+
+    A column can hold values of several types, which arrow does not allow,
+    so each column is stored as a column per type: "<position>:<type>", e.g.
+    "3:int" and "3:str". The names of the columns and the numbers of the
+    rows are stored in the metadata.
+    """
+
+    arrays = {}
+
+    for position, name in enumerate(chunk.columns):
+        values = list(chunk[name])
+        types = sorted(
+            {type(value) for value in values if value is not None},
+            key=lambda value_type: value_type.__name__,
+        )
+
+        if not types:
+            arrays["{0}:".format(position)] = pa.nulls(len(values))
+
+        for value_type in types:
+            arrays["{0}:{1}".format(position, value_type.__name__)] = (
+                pa.array([
+                    value if type(value) is value_type else None
+                    for value in values
+                ])
+            )
+
+    return pa.table(arrays).replace_schema_metadata({
+        'columns': json.dumps(list(chunk.columns)),
+        'index': json.dumps([int(number) for number in chunk.index]),
+    })
+
+
+def _from_table(table, na):
+    """ Return the chunk stored in the arrow 'table' (see `_to_table`), with
+    'na' for missing values.
+    """
+
+    columns = json.loads(table.schema.metadata[b'columns'])
+    index = json.loads(table.schema.metadata[b'index'])
+
+    values = [[na] * table.num_rows for _ in columns]
+
+    for name, array in zip(table.column_names, table.columns):
+        column = values[int(name.split(':')[0])]
+
+        for row, value in enumerate(array.to_pylist()):
+            if value is not None:
+                column[row] = value
+
+    return pd.DataFrame(
+        dict(zip(columns, values)),
+        columns=columns,
+        index=index,
+        dtype=object,
+    )
+
+
+def read_cached_sheet(filename, parser, version, na_values=NA_VALUES,
+                      na=np.nan, chunk_size=None):
+    """ Read the first sheet of the excel file 'filename' in chunks, like
+    `app.sheets.read_sheet`, from the cache if it was read before.
+
+    Args:
+        filename (str): The name of the excel file
+        parser (str): The name of the parser reading the file
+        version (int): The version of the parser's reading of the file
+        na_values, na, chunk_size: See `app.sheets.read_sheet`
+
+    Yields:
+        DataFrame: The next chunk of rows, as by `app.sheets.read_sheet`
+
+    The chunks are cached as Feather files in settings.SHEET_CACHE_DIR,
+    under a key of the contents of the file, the parser and its version, and
+    the arguments, so an unchanged file is not parsed again. Without a
+    SHEET_CACHE_DIR, the sheet is always parsed.
+
+    The chunks are written to a temporary directory while the sheet is read,
+    which replaces the entry once the whole sheet was read, so other
+    processes never read partial entries.
+    """
+
+    chunk_size = chunk_size or settings.INGEST_CHUNK_SIZE
+    directory = getattr(settings, 'SHEET_CACHE_DIR', None)
+
+    if directory is None:
+        yield from read_sheet(filename, na_values, na, chunk_size)
+        return
+
+    path = os.path.join(
+        directory, _digest(filename, parser, version, na_values, chunk_size)
+    )
+
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            yield _from_table(feather.read_table(os.path.join(path, name)), na)
+
+        return
+
+    os.makedirs(directory, exist_ok=True)
+    tmp = tempfile.mkdtemp(dir=directory, suffix='.tmp')
+    cached = True
+
+    try:
+        for number, chunk in enumerate(
+            read_sheet(filename, na_values, None, chunk_size)
+        ):
+            if cached:
+                try:
+                    table = _to_table(chunk)
+                except pa.ArrowException:
+                    # E.g. a whole number beyond 64 bits, the sheet is then
+                    # not cached.
+                    cached = False
+
+            if cached:
+                feather.write_feather(
+                    table, os.path.join(tmp, "{0:06d}.feather".format(number))
+                )
+
+                yield _from_table(table, na)
+            else:
+                yield chunk.where(chunk.notna(), na)
+
+        if cached:
+            try:
+                os.replace(tmp, path)
+            except OSError:
+                # Another process cached the same sheet in the meantime.
+                pass
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
@@ -0,0 +1,153 @@
+import numpy as np
+import openpyxl
+import pandas as pd
+from django.conf import settings
+
+# The strings read as missing values by default, as by pandas.read_excel.
+NA_VALUES = frozenset([
+    "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan",
+    "1.#IND", "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "n/a", "nan",
+    "null",
+])
+
+
+def _excel_rows(filename):
+    """ Yield the rows of the first sheet of the excel file 'filename', as
+    tuples of cell values (None for empty cells).
+    """
+
+    if filename.endswith('.xls'):
+        # The old excel format can not be streamed, and is read at once.
+        data = pd.read_excel(filename, header=None, na_filter=False)
+        yield from data.itertuples(index=False, name=None)
+        return
+
+    workbook = openpyxl.load_workbook(filename, read_only=True, data_only=True)
+
+    try:
+        sheet = workbook.worksheets[0]
+
+        # The dimension stored in the file can span far more rows than are
+        # used, e.g. all 1048576 of a formatted sheet, which would all be
+        # returned as rows of empty cells.
+        sheet.reset_dimensions()
+
+        yield from sheet.iter_rows(values_only=True)
+    finally:
+        workbook.close()
+
+
+def _cell_value(value):
+    """ Return the value of a cell as pandas.read_excel reads it: "" for an
+    empty cell, and whole numbers as int.
+    """
+
+    if value is None:
+        return ""
+    elif isinstance(value, float) and value.is_integer():
+        return int(value)
+
+    return value
+
+
+def _columns(header):
+    """ Return the column names for the 'header' row values, as
+    pandas.read_excel names them: "Unnamed: <position>" for an empty header,
+    and "<name>.<number>" for a repeated one.
+    """
+
+    columns = []
+
+    for position, name in enumerate(header):
+        if name == "":
+            name = "Unnamed: {0}".format(position)
+
+        unique_name = name
+        number = 0
+
+        while unique_name in columns:
+            number += 1
+            unique_name = "{0}.{1}".format(name, number)
+
+        columns.append(unique_name)
+
+    return columns
+
+
+def _chunk_frame(rows, columns, numbers):
+    """ Return a DataFrame of the chunk of 'rows', indexed by their row
+    'numbers', without converting the values.
+    """
+
+    return pd.DataFrame(rows, columns=columns, index=numbers, dtype=object)
+
+
+def read_sheet(filename, na_values=NA_VALUES, na=np.nan, chunk_size=None):
+    """ Read the first sheet of the excel file 'filename' row by row, in
+    chunks.
+
+    Args:
+        filename (str): The name of the excel file (.xlsx or .xls)
+        na_values (set): The strings read as missing values, besides empty
+            cells. Default = NA_VALUES
+        na: The value missing values are replaced with. Default = NaN
+        chunk_size (int, optional): The maximum number of rows per chunk.
+            Default = settings.INGEST_CHUNK_SIZE
+
+    Yields:
+        DataFrame: The next chunk of rows, with a column per header in the
+            first row of the sheet, and indexed by the number of each row
+            in the sheet (from 1, as in excel), to report invalid rows by.
+
+    Unlike pandas.read_excel, the whole sheet is never in memory: .xlsx
+    files are streamed with openpyxl in read-only mode, so a chunk can be
+    uploaded before the next one is read.
+
+    Each value is typed as pandas.read_excel types it, but by cell rather
+    than by column, so the type of a value does not depend on the other
+    rows: a whole number is an int even in a column with missing values, as
+    those are not NaN floats. The chunks have the object dtype, so the
+    values are not converted. Blank rows, and cells beyond the last
+    header, are skipped.
+    """
+
+    chunk_size = chunk_size or settings.INGEST_CHUNK_SIZE
+
+    columns = None
+    width = None
+    chunk = []
+    numbers = []
+
+    for number, row in enumerate(_excel_rows(filename), 1):
+        values = [_cell_value(value) for value in row[:width]]
+
+        # Trailing empty cells are not part of the row.
+        while values and values[-1] == "":
+            values.pop()
+
+        if not values:
+            continue
+
+        if columns is None:
+            columns = _columns(values)
+            width = len(columns)
+            continue
+
+        values.extend([""] * (width - len(values)))
+
+        chunk.append([
+            na if value == "" or (
+                isinstance(value, str) and value in na_values
+            ) else value
+            for value in values
+        ])
+        numbers.append(number)
+
+        if len(chunk) == chunk_size:
+            yield _chunk_frame(chunk, columns, numbers)
+
+            chunk = []
+            numbers = []
+
+    if chunk:
+        yield _chunk_frame(chunk, columns, numbers)
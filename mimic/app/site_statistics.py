@@ -0,0 +1,86 @@
+from app.dataset_cache import dataset_cache
+from app.models import Dimer
+from app.models import Drug
+from app.models import Pdb
+from app.models import ProteinInteractor
+
+# List of 'random' example dimers to select from.
+RANDOM_EXAMPLE_DIMERS = [
+    'alpha-IIb_beta-3',
+    'alpha-1_beta-1',
+    'alpha-4_beta-1',
+    'alpha-4_beta-7',
+    'alpha-5_beta-1',
+    'alpha-V_beta-3',
+    'alpha-V_beta-6',
+]
+
+# The cache key under which the site statistics are stored. Change the version
+# whenever the structure of the statistics changes.
+SITE_STATISTICS_KEY = 'app.site_statistics.v3'
+
+
+def _example_dimer_statistics(dimer):
+    """ Compute the statistics and the diagram for a single example Dimer.
+
+    Args:
+        dimer (obj:`Dimer`): The Dimer to compute the statistics for
+
+    Returns:
+        example (dict): The lookup_name, display_name, counts (of drugs,
+            structures and interacting proteins) and diagram_style (the
+            style for the integrin sprite) for the Dimer.
+    """
+
+    return {
+        'lookup_name': dimer.lookup_name,
+        'display_name': dimer.display_name(),
+        'counts': {
+            'drugs': dimer.drug_set.count(),
+            'structures': sum([
+                dimer.alpha.pdb_alpha.count(),
+                dimer.beta.pdb_beta.count()
+            ]),
+            'interactors': ProteinInteractor.objects.filter(
+                target_integrin=dimer.lookup_name,
+            ).values('protein').distinct().count(),
+        },
+        'diagram_style': dimer.generate_dimer_sprite_style(),
+    }
+
+
+def compute_site_statistics():
+    """ Compute the global counts, and the statistics for each of the
+    RANDOM_EXAMPLE_DIMERS.
+
+    Returns:
+        statistics (dict): with the keys 'counts' (a dictionary with the
+            number of dimers, drugs, pdbs and protein_interactors) and
+            'examples' (a list of dictionaries, see
+            `_example_dimer_statistics`).
+    """
+
+    dimers = Dimer.objects.filter(
+        lookup_name__in=RANDOM_EXAMPLE_DIMERS,
+    ).select_related('alpha', 'beta').order_by('lookup_name')
+
+    return {
+        'counts': {
+            'dimers': Dimer.objects.count(),
+            'drugs': Drug.objects.count(),
+            'pdbs': Pdb.objects.count(),
+            'protein_interactors': ProteinInteractor.objects.count(),
+        },
+        'examples': [_example_dimer_statistics(d) for d in dimers],
+    }
+
+
+def get_site_statistics():
+    """ Return the site statistics (see `compute_site_statistics`) from the
+    dataset cache, computing and storing them first if needed.
+
+    The statistics are recomputed whenever the dataset version changes, see
+    `app.dataset_cache`.
+    """
+
+    return dataset_cache.get(SITE_STATISTICS_KEY, compute_site_statistics)
@@ -0,0 +1,162 @@
+from app import display
+from app.aggregates import ConcatDistinct
+from app.aggregates import any_match
+from app.aggregates import split_concat
+from app.dataset_cache import bump_dataset_version
+from app.models import ProteinInformation
+from app.models import ProteinInteractor
+from app.models import ProteinSummary
+from app.search_index import rebuild_search_index
+from django.db import transaction
+from django.db.models import Min
+
+CELL_BASED_ASSAY = (
+    "Adhesion assay evidence",
+    "Cell aggregation evidence",
+    "Cell-based assay evidence",
+    "Cell proliferation assay evidence",
+    "Chemotaxis assay evidence",
+    "Plaque assay evidence",
+)
+
+PURIFIED_ASSAY = (
+    "Affinity chromatography evidence",
+    "Bait-prey protein pull-down assay evidence",
+    "Bio-layer interferometry assay evidence",
+    "Co-immunoprecipitation evidence",
+    "Co-localization evidence",
+    "Cryogenic electron microscopy evidence",
+    "Enzyme-linked immunoabsorbent assay evidence",
+    "Flow cytometry evidence",
+    "Fluorescence anisotropy evidence",
+    "Fluorescence polarization evidence",
+    "Fluorescence resonance energy transfer evidence",
+    "Gel-filtration evidence",
+    "Immunofluorescence confocal microscopy evidence",
+    "Immunoprecipitation evidence",
+    "Iodine-125-labeled ligand binding assay evidence",
+    "Isothermal titration calorimetry evidence",
+    "Nuclear magnetic resonance spectroscopy evidence",
+    "Peptide array evidence",
+    "Phage display evidence",
+    "Protein hydrogen-deuterium exchange mass spectrometry evidence",
+    "Protein inhibition evidence",
+    "Quantitative western immunoblotting evidence",
+    "Radioligand binding assay evidence",
+    "Small-angle X-ray scattering evidence",
+    "Sodium dodecyl sulfate polyacrylamide gel electrophoresis evidence",
+    "Surface plasmon resonance evidence",
+    "X-ray crystallography evidence",
+)
+
+
+def _summary_rows():
+    """ Return a queryset with one row per Protein (by UniProt accession) or
+    peptide (by peptide name), aggregating all of its ProteinInteractor
+    records in a single grouped query.
+    """
+
+    return ProteinInteractor.objects.values(
+        'protein__uniprot',
+        'protein__peptide',
+    ).annotate(
+        first_id=Min('id'),
+        entry_id=Min('protein_id'),
+        interaction_type=Min('type_of_interaction'),
+        names=ConcatDistinct('name'),
+        methods=ConcatDistinct('experimental_method'),
+        integrins=ConcatDistinct('target_integrin'),
+        pubmeds=ConcatDistinct('pubmed'),
+        has_strength=any_match(interaction_strength__icontains="="),
+        has_structure=any_match(xref__icontains="PDB"),
+    ).order_by('first_id')
+
+
+def _information_by_uniprot():
+    """ Return a dictionary mapping UniProt accessions to the values of the
+    (first) ProteinInformation for it.
+    """
+
+    information = {}
+
+    data = ProteinInformation.objects.order_by('pk').values(
+        'protein__uniprot',
+        'name',
+        'alternative_name',
+        'gene_name',
+        'organism_scientific',
+        'function',
+    )
+
+    for entry in data:
+        information.setdefault(entry['protein__uniprot'], entry)
+
+    return information
+
+
+def _build_summary(row, information):
+    """ Build an (unsaved) ProteinSummary from a single row of `_summary_rows`.
+    """
+
+    methods = split_concat(row['methods'])
+
+    summary = ProteinSummary(
+        protein_id=row['entry_id'],
+        uniprot=row['protein__uniprot'],
+        peptide=row['protein__peptide'],
+        position=row['first_id'],
+        type_of_interaction=row['interaction_type'],
+        experimental_method=', '.join(methods),
+        integrins=', '.join(split_concat(row['integrins'])),
+        pubmed=', '.join(split_concat(row['pubmeds'])),
+        interaction_strength=bool(row['has_strength']),
+        bound_structure=bool(row['has_structure']),
+        cell_based_assay=any(m in CELL_BASED_ASSAY for m in methods),
+        purified_assay=any(m in PURIFIED_ASSAY for m in methods),
+    )
+    summary.integrins_html = display.integrin_name(summary.integrins)
+
+    document = [
+        summary.uniprot,
+        summary.peptide,
+        summary.integrins,
+        summary.pubmed,
+    ]
+    document.extend(split_concat(row['names']))
+
+    if summary.uniprot != "-" and summary.uniprot in information:
+        entry = information[summary.uniprot]
+        summary.name = entry['name']
+        summary.organism = entry['organism_scientific']
+        document.extend([
+            entry['name'],
+            entry['alternative_name'],
+            entry['gene_name'],
+            entry['organism_scientific'],
+            entry['function'],
+        ])
+
+    summary.document = " ".join(document).lower()
+
+    return summary
+
+
+def rebuild_protein_summaries():
+    """ Delete and rebuild all ProteinSummary instances from the
+    ProteinInteractor and ProteinInformation tables.
+
+    Returns:
+        count (int): The number of ProteinSummary instances created.
+    """
+
+    information = _information_by_uniprot()
+    summaries = [_build_summary(row, information) for row in _summary_rows()]
+
+    with transaction.atomic():
+        ProteinSummary.objects.all().delete()
+        ProteinSummary.objects.bulk_create(summaries)
+        rebuild_search_index()
+
+    bump_dataset_version()
+
+    return len(summaries)
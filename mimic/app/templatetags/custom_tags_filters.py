@@ -1,8 +1,15 @@
-import re
-
 from django import template
+from django.templatetags.static import static
 from django.template.defaultfilters import stringfilter
 
+from IntegrinDiagram.integrinDiagram import SPRITE_ID
+from IntegrinDiagram.integrinDiagram import SPRITE_STATIC_PATH
+from IntegrinDiagram.integrinDiagram import sprite_dimensions
+
+from app import display
+from app.dataset_cache import fragment_cache
+from app.integrin_images import get_integrin_images
+
 register = template.Library()
 
 
@@ -67,23 +74,7 @@ def superscript_replace_graph(str):
 @register.filter
 @stringfilter
 def three_digit_round(string):
-    if ";" in string:
-        t = string.split(";")
-        temp = []
-        for val in t:
-            val = val.strip()
-            if re.search(r"(\d+\.\d{5}).*", val):
-                val = round(float(val), 4)
-                print(val)
-                val = str(val)
-                temp.append(val)
-            else:
-                val = str(val)
-                temp.append(val)
-            string = "; ".join(temp)
-    elif re.search(r"(\d+\.\d{5}).*", string):
-        string = round(float(string), 4)
-    return string
+    return display.three_digit_round(string)
 
 
 @register.filter
@@ -169,44 +160,25 @@ def split(string, sep):
 @register.filter
 @stringfilter
 def ionindex(name):
-    if "2+" in name:
-        name = name.replace("2+", "<sup>2+</sup>")
-    if "3+" in name:
-        name = name.replace("3+", "<sup>3+</sup>")
-    if " ->" in name:
-        name = name.replace("->", " &#129058; ")
-    if "Kd=" in name:
-        name = name.replace("Kd=", "K<sub>d</sub>=")
-    return name
+    return display.ionindex(name)
 
 
 @register.filter
 @stringfilter
 def kd(name):
-    new_name = name
-    if "Kd=" in name:
-        name = name.split("Kd")
-        new_name = name[0] + "K<sub>d</sub>" + name[1]
-    return new_name
+    return display.kd(name)
 
 
 @register.filter
 @stringfilter
 def function_pubmed_link(text):
-    # < a href = "https://pubmed.ncbi.nlm.nih.gov/7989369/"
-    # target = "_blank"class ="btn btn-rounded btn-info" > 7989369 < / a >
-    link_pattern = '<a href = "https://pubmed.ncbi.nlm.nih.gov/\\1/"' \
-                   'target = "_blank" class ="btn btn-rounded btn-info">\\1</a>'
-    pubmed = re.sub(r"PubMed\:(\d+)", link_pattern, text)
-    return pubmed
+    return display.function_pubmed_link(text)
 
 
 @register.filter
 @stringfilter
 def integrin_name(text):
-    text = text.replace("alpha-", "&alpha;")
-    text = text.replace("beta-", "&beta;")
-    return text
+    return display.integrin_name(text)
 
 
 @register.filter
@@ -227,3 +199,80 @@ def synthetic_peptide_capital(text):
     if "synthetic peptide" in text:
         text = text.replace("synthetic peptide", "Synthetic Peptide")
     return text
+
+
+@register.inclusion_tag('app/integrin_sprite.html')
+def integrin_sprite(style):
+    """ Show the integrin sprite, colored with 'style' (see
+    IntegrinDiagram.integrinDiagram.sprite_style).
+    """
+
+    return {
+        'dimensions': sprite_dimensions(),
+        'sprite': "{0}#{1}".format(static(SPRITE_STATIC_PATH), SPRITE_ID),
+        'style': style,
+    }
+
+
+@register.inclusion_tag('app/integrin_image.html')
+def integrin_image(kind, name, style, alt=""):
+    """ Show the pre-built image (see app.integrin_images) of a Dimer or Pdb
+    diagram, or the integrin sprite colored with 'style' if there is none.
+
+    Args:
+        kind (str): One of 'dimers' or 'pdbs'
+        name (str): The Dimer lookup_name, or the PDB ID
+        style (str): The sprite style of the Dimer or Pdb
+        alt (str): Alternative text for the image
+    """
+
+    context = integrin_sprite(style)
+    context['images'] = get_integrin_images(kind, name)
+    context['alt'] = alt
+
+    return context
+
+
+class DatasetFragmentNode(template.Node):
+    """ Node of the dataset_fragment tag.
+    """
+
+    def __init__(self, nodelist, name, vary_on):
+        self.nodelist = nodelist
+        self.name = name
+        self.vary_on = vary_on
+
+    def render(self, context):
+        key = ":".join(
+            ["app.fragment", str(self.name.resolve(context))] +
+            [str(var.resolve(context)) for var in self.vary_on]
+        )
+        return fragment_cache.get(key, lambda: self.nodelist.render(context))
+
+
+@register.tag
+def dataset_fragment(parser, token):
+    """ Cache the contents of the tag by dataset version, in memory (see
+    app.dataset_cache.fragment_cache). Like Django's cache tag, it takes a
+    fragment name and any number of variables the contents depend on:
+
+    {% dataset_fragment "interaction" record.pk %}
+        ...
+    {% enddataset_fragment %}
+    """
+
+    bits = token.split_contents()
+
+    if len(bits) < 2:
+        raise template.TemplateSyntaxError(
+            "'{0}' tag requires at least 1 argument.".format(bits[0])
+        )
+
+    nodelist = parser.parse(('enddataset_fragment',))
+    parser.delete_first_token()
+
+    return DatasetFragmentNode(
+        nodelist,
+        parser.compile_filter(bits[1]),
+        [parser.compile_filter(bit) for bit in bits[2:]],
+    )
@@ -184,7 +184,7 @@ class DimerFactory(factory.DjangoModelFactory):
     alpha = factory.SubFactory(AlphaFactory)
     beta = factory.SubFactory(BetaFactory)
     expression = factory.LazyAttribute(lambda t: random_string(60))
-    notes = factory.LazyAttribute(lambda t: random_string(160))
+    function = factory.LazyAttribute(lambda t: random_string(160))
 
     class Meta:
         model = Dimer
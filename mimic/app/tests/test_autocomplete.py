@@ -0,0 +1,176 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from app.autocomplete import PrefixTrie
+from app.autocomplete import autocomplete
+from app.autocomplete import get_autocomplete_trie
+from app.dataset_cache import bump_dataset_version
+from app.models import ProteinInformation
+from app.models import ProteinInteractor
+
+from app.tests.factories import DimerFactory
+from app.tests.factories import DimerToDrugFactory
+from app.tests.factories import ProteinFactory
+
+
+def entry(label, score):
+    return {'label': label, 'url': "/" + label, 'score': score}
+
+
+class PrefixTrieTest(TestCase):
+    """ Test the compressed prefix trie.
+    """
+
+    def setUp(self):
+        self.trie = PrefixTrie(limit=3)
+
+        for key, label, score in [
+                ("fibronectin", "fibronectin", 5),
+                ("fibrinogen", "fibrinogen", 8),
+                ("fibrillin", "fibrillin", 1),
+                ("fibulin", "fibulin", 2),
+                ("FN1", "fibronectin", 5),
+                ("vitronectin", "vitronectin", 3),
+        ]:
+            self.trie.insert(key, entry(label, score))
+
+        self.trie.finalize()
+
+    def labels(self, prefix, count=3):
+        return [e['label'] for e in self.trie.complete(prefix, count)]
+
+    def test_complete(self):
+        """ Test that completions are ranked by score, limited, and found
+        from prefixes ending inside and at the end of compressed edges.
+        """
+
+        self.assertEqual(
+            self.labels("fib"), ["fibrinogen", "fibronectin", "fibulin"]
+        )
+        self.assertEqual(
+            self.labels("FIBR"), ["fibrinogen", "fibronectin", "fibrillin"]
+        )
+        self.assertEqual(self.labels("fibri"), ["fibrinogen", "fibrillin"])
+        self.assertEqual(self.labels("fibronectin"), ["fibronectin"])
+        self.assertEqual(self.labels("f", 1), ["fibrinogen"])
+        self.assertEqual(self.labels("fibronectins"), [])
+        self.assertEqual(self.labels("x"), [])
+
+    def test_complete_unique(self):
+        """ Test that an entry inserted with several keys is returned once.
+        """
+
+        self.assertEqual(self.labels("f", 10), [
+            "fibrinogen", "fibronectin", "fibulin",
+        ])
+
+
+class AutocompleteTest(TestCase):
+    """ Test the completions of the data, and the autocomplete endpoint.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Create a protein with two interactions and its information, a
+        peptide with one interaction, and a Dimer targeted by a Drug.
+        """
+
+        fibronectin = ProteinFactory.create(uniprot="P02751", peptide="-")
+        peptide = ProteinFactory.create(uniprot="-", peptide="FIBRGD")
+        cls.dimer = DimerFactory.create()
+
+        for protein in (fibronectin, fibronectin, peptide):
+            ProteinInteractor.objects.create(
+                protein=protein,
+                name="Interactor",
+                type_of_evidence="+",
+                target_integrin=cls.dimer.lookup_name,
+            )
+
+        ProteinInformation.objects.create(
+            protein=fibronectin,
+            length="2477",
+            name="Fibronectin",
+            gene_name="FN1 FN",
+            organism_scientific="Homo sapiens",
+        )
+
+        cls.drug = DimerToDrugFactory.create(dimer=cls.dimer).drug
+
+    def setUp(self):
+        bump_dataset_version()
+
+    def test_autocomplete(self):
+        """ Test the completions of names, gene names, UniProt accessions
+        and peptides, ranked by number of interactions.
+        """
+
+        completions = autocomplete("fib")
+        self.assertEqual(
+            [(c['type'], c['label'], c['score']) for c in completions],
+            [('protein', "Fibronectin (P02751)", 2),
+             ('peptide', "FIBRGD", 1)]
+        )
+        self.assertEqual(
+            completions[0]['url'], reverse('interactions', args=("P02751",))
+        )
+
+        self.assertEqual(autocomplete("fn1"), autocomplete("p0275")[:1])
+        self.assertEqual(autocomplete("   "), [])
+
+    def test_autocomplete_integrins_and_drugs(self):
+        completions = autocomplete(self.dimer.lookup_name)
+        self.assertEqual(completions[0]['type'], 'integrin')
+        self.assertEqual(completions[0]['score'], 3)
+
+        completions = autocomplete(self.dimer.alpha.gene_name)
+        self.assertEqual(
+            completions[0]['url'],
+            reverse('alpha', args=(self.dimer.alpha.name,))
+        )
+
+        completions = autocomplete(self.drug.name)
+        self.assertEqual(completions[0]['type'], 'drug')
+        self.assertEqual(completions[0]['score'], 1)
+
+    def test_rebuild(self):
+        """ Test that the trie is kept until the dataset version changes.
+        """
+
+        trie = get_autocomplete_trie()
+        self.assertIs(get_autocomplete_trie(), trie)
+
+        ProteinInteractor.objects.create(
+            protein=ProteinFactory.create(uniprot="Q12345", peptide="-"),
+            name="Interactor",
+            type_of_evidence="+",
+            target_integrin="-",
+        )
+        self.assertEqual(autocomplete("q123"), [])
+
+        bump_dataset_version()
+        self.assertIsNot(get_autocomplete_trie(), trie)
+        self.assertEqual(len(autocomplete("q123")), 1)
+
+    def test_autocomplete_view(self):
+        response = self.client.get(reverse('autocomplete'), {'q': "Fib"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [c['label'] for c in response.json()['results']],
+            ["Fibronectin (P02751)", "FIBRGD"]
+        )
+
+        response = self.client.get(
+            reverse('autocomplete'), {'q': "Fib", 'k': "1"}
+        )
+        self.assertEqual(len(response.json()['results']), 1)
+
+        response = self.client.get(
+            reverse('autocomplete'), {'q': "Fib", 'k': "x"}
+        )
+        self.assertEqual(len(response.json()['results']), 2)
+
+        response = self.client.get(
+            reverse('autocomplete'), {'q': "Fib", 'k': "-1"}
+        )
+        self.assertEqual(response.json()['results'], [])
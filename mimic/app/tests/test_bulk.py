@@ -0,0 +1,356 @@
+import collections
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+import pandas as pd
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.test import override_settings
+
+from app.bulk import LookupTable
+from app.models import AlternativeName
+from app.models import Dimer
+from app.models import DimerToDrug
+from app.models import Drug
+from app.models import Monomer
+from app.models import MonomerToStructure
+from app.models import Pdb
+from app.models import PdbToProtein
+from app.models import Protein
+from app.models import ProteinInformation
+from app.models import ProteinInteractor
+from app.models import Structure
+from app.parsers import DimerParser
+from app.parsers import DrugParser
+from app.parsers import MonomerParser
+from app.parsers import PdbParser
+from app.parsers import ProteinInformationParser
+from app.parsers import ProteinInteractorParser
+from app.parsers import StructureParser
+
+from app.tests.factories import ProteinFactory
+
+
+class LookupTableTest(TestCase):
+    """ Test the in-memory lookup of instances.
+    """
+
+    def test_get(self):
+        """ Test that instances are looked up by their field values, the
+        first one by primary key if there are several.
+        """
+
+        first = ProteinFactory(uniprot="P02751", species="Homo sapiens")
+        ProteinFactory(uniprot="P02751", species="Mus musculus")
+
+        proteins = LookupTable(Protein.objects.all(), ('uniprot',))
+
+        self.assertEqual(len(proteins), 1)
+        self.assertEqual(proteins.get(uniprot="P02751"), first)
+
+        with self.assertRaises(Protein.DoesNotExist):
+            proteins.get(uniprot="P04004")
+
+    def test_get_or_add(self):
+        """ Test that missing instances are only created on save, with the
+        defaults, and can be looked up by related instance afterwards.
+        """
+
+        existing = ProteinFactory(uniprot="P02751")
+        proteins = LookupTable(Protein.objects.all(), ('uniprot',))
+
+        self.assertEqual(
+            proteins.get_or_add(uniprot="P02751"), (existing, False)
+        )
+
+        added, created = proteins.get_or_add(
+            uniprot="P04004", defaults={'species': "Homo sapiens"},
+        )
+        self.assertTrue(created)
+        self.assertEqual(proteins.get_or_add(uniprot="P04004")[1], False)
+        self.assertFalse(Protein.objects.filter(uniprot="P04004").exists())
+
+        proteins.save()
+
+        protein = proteins.get(uniprot="P04004")
+        self.assertIsNotNone(protein.pk)
+        self.assertEqual(protein.species, "Homo sapiens")
+
+        AlternativeName.objects.create(protein=protein, name="Vitronectin")
+        names = LookupTable(
+            AlternativeName.objects.all(), ('protein', 'name'),
+        )
+        self.assertEqual(
+            names.get(protein=protein, name="Vitronectin").protein_id,
+            protein.pk,
+        )
+
+    def test_values(self):
+        """ Test that only the instances with one of the values of the first
+        field are loaded, in batches, also after a save.
+        """
+
+        fibronectin = ProteinFactory(uniprot="P02751")
+        ProteinFactory(uniprot="P04004")
+
+        with mock.patch('app.bulk.VALUES_BATCH_SIZE', 1):
+            with self.assertNumQueries(2):
+                proteins = LookupTable(
+                    Protein.objects.all(), ('uniprot',),
+                    values=["P02751", "P02751", "P12345"],
+                )
+
+            self.assertEqual(len(proteins), 1)
+            self.assertEqual(proteins.get(uniprot="P02751"), fibronectin)
+
+            proteins.get_or_add(
+                uniprot="P12345", defaults={'species': "Homo sapiens"},
+            )
+            proteins.save()
+
+        self.assertEqual(len(proteins), 2)
+
+        AlternativeName.objects.create(protein=fibronectin, name="FN")
+        names = LookupTable(
+            AlternativeName.objects.all(), ('protein', 'name'),
+            values=[proteins.get(uniprot="P12345")],
+        )
+        self.assertEqual(len(names), 0)
+
+
+class BulkUploadTest(TestCase):
+    """ Test that uploading files in bulk creates the same instances as
+    uploading them row by row.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+        self.files = [
+            (StructureParser, self.sheet('structures', [
+                ("Domain_shorthand", "Domain_name"),
+                ("alpha-I", "alpha-I domain"),
+                ("beta-I", "beta-I domain"),
+                ("PSI", "Plexin-semaphorin-integrin domain"),
+            ])),
+            (MonomerParser, self.sheet('monomers', [
+                ("Integrin_name", "UniProt_accession", "Ensembl_accession",
+                 "Gene_name", "Alternative_names", "Domains_and_regions",
+                 "Length", "Sequence", "Expression", "Notes"),
+                ("alpha-1", "P56199", "ENSG00000213949", "ITGA1",
+                 "CD49a|VLA1", "alpha-I@1-3|PSI@4-5", 5, ">alpha-1&MFNVE",
+                 "Smooth muscle", "-"),
+                ("beta-1", "P05556", "ENSG00000150093", "ITGB1", "",
+                 "beta-I@1-4", 4, ">beta-1&MNLQ", "Ubiquitous", "Note"),
+            ])),
+            (DimerParser, self.sheet('dimers', [
+                ("Dimer_name", "Function", "Expression"),
+                ("alpha-1/beta-1", "Collagen receptor", "Endothelium"),
+            ])),
+            (DrugParser, self.sheet('drugs', [
+                ("Name", "Marketing_name", "Status", "Type", "Administration",
+                 "ATC_code", "ATC_definition", "Drugbank_ID",
+                 "Target_integrin", "Launch_year", "Notes"),
+                ("Natalizumab", "Tysabri", "marketed", "monoclonal antibody",
+                 "IV", "L04AA23", "Immunosuppressant", "DB00108",
+                 "alpha-1/beta-1", 2004, "-"),
+            ])),
+            (ProteinInformationParser, self.sheet('information', [
+                ("Accession", "Length", "Protein_name",
+                 "Protein_name_alternative", "Gene_name",
+                 "Organism_scientific", "Organism_common", "Function"),
+                ("P02751", 2477, "Fibronectin", "FN", "FN1", "Homo sapiens",
+                 "Human", "Binds cell surfaces (PubMed:123)"),
+                ("P56199", 1179, "Integrin alpha-1", "-", "ITGA1",
+                 "Homo sapiens", "Human", "Collagen receptor"),
+            ])),
+            (PdbParser, self.sheet('pdbs', [
+                ("PDB_ID", "Exp_tech", "Resolution", "Alpha_subunit",
+                 "Alpha_domains", "Beta_subunit", "Beta_domains",
+                 "Protein_interactors", "Other_interactors"),
+                ("1pt6", "X-ray", 1.87, "alpha-1", "alpha-I|alpha-I", "-",
+                 "-", "native:P02751@1-10(Fibronectin)", "-"),
+                ("3vi4", "NMR", "-", "alpha-1", "alpha-I", "beta-1",
+                 "beta-I|PSI",
+                 "native:P02751@5-20(Fibronectin)|"
+                 "non-native(Crotalus atrox):Q9DGB9@1-71(Snake)",
+                 "peptide:C:RGD peptide|other:D:Collagen"),
+            ])),
+            (ProteinInteractorParser, self.sheet('interactors', [
+                ("Type of evidence (positive / negative)",
+                 "Type of interaction", "UniProt accession", "Peptide name",
+                 "Construct boundaries", "Interacting region boundaries",
+                 "Oligomerization state", "ELM link (if motif mediated)",
+                 "Target integrin", "PubMed ID", "Experimental method",
+                 "ECO accession", "Competitor (if applicable)",
+                 "Interaction strength (Kd, IC50, etc)",
+                 "Interaction strength in nM, single value",
+                 "Xref for bound structure (if applicable)", "Notes"),
+                ("+", "direct", "P02751", "-", "1-100", "10-12", "monomer",
+                 "LIG_Integrin_RGD_1", "alpha-1/beta-1", 22242136, "ELISA",
+                 "ECO:0000267", "-", "kd=164 nM", 164, "-", "Ca2+ binding"),
+                ("+", "direct", "P02751", "-", "1-100", "10-12", "monomer",
+                 "LIG_Integrin_RGD_1", "alpha-1/beta-1", 22242136, "ELISA",
+                 "ECO:0000267", "-", "kd=164 nM", 164, "-", "Ca2+ binding"),
+                ("-", "direct", "P02751", "-", "1-100", "-", "dimer", "-",
+                 "alpha-1/beta-1", 1234, "NMR", "-", "-", "-", "-", "-", "-"),
+                ("+", "direct", "-", "cyclo-RGDfV", "-", "-", "-", "-",
+                 "alpha-1/beta-1", 4321, "SPR", "-", "-", "IC50=5 nM", 5,
+                 "-", "-"),
+            ])),
+        ]
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def sheet(self, name, rows):
+        """ Write 'rows' (the first being the header) to an excel file, and
+        return its path.
+        """
+
+        path = os.path.join(self.directory.name, "{0}.xlsx".format(name))
+        pd.DataFrame(rows[1:], columns=rows[0]).to_excel(path, index=False)
+
+        return path
+
+    def upload(self, **kwargs):
+        """ Upload all files, and return the messages of each parser.
+        """
+
+        messages = []
+
+        for parser_class, filename in self.files:
+            parser = parser_class(filename, **kwargs)
+            parser.parse_and_upload()
+            messages.append(sorted(parser.messages))
+
+        return messages
+
+    @staticmethod
+    def snapshot():
+        """ Return the field values of all uploaded instances, with the
+        related instances by name instead of primary key.
+        """
+
+        names = {
+            Structure: ('short',),
+            Protein: ('uniprot', 'peptide'),
+            Monomer: ('name',),
+            Dimer: ('lookup_name',),
+            Drug: ('name',),
+            Pdb: ('pdb',),
+        }
+
+        models = [
+            Structure, Protein, Monomer, AlternativeName, MonomerToStructure,
+            Dimer, Drug, DimerToDrug, Pdb, Pdb.alpha_domain.through,
+            Pdb.beta_domain.through, PdbToProtein, ProteinInformation,
+            ProteinInteractor,
+        ]
+
+        snapshot = {}
+
+        for model in models:
+            fields = []
+
+            for field in model._meta.concrete_fields:
+                if field.primary_key:
+                    continue
+                elif field.is_relation:
+                    fields.extend(
+                        "{0}__{1}".format(field.name, name)
+                        for name in names[field.related_model]
+                    )
+                else:
+                    fields.append(field.name)
+
+            snapshot[model.__name__] = collections.Counter(
+                model.objects.values_list(*fields)
+            )
+
+        return snapshot
+
+    @override_settings(INGEST_CHUNK_SIZE=2)
+    def test_bulk_upload(self):
+        """ Test that a bulk upload (in small batches and chunks) creates the
+        same instances, with the same messages, as a row by row upload.
+        """
+
+        row_messages = self.upload()
+        row_snapshot = self.snapshot()
+
+        self.assertEqual(
+            row_snapshot['Protein'][("-", "cyclo-RGDfV", "N/A")], 1
+        )
+        self.assertEqual(sum(row_snapshot['ProteinInteractor'].values()), 3)
+        self.assertEqual(sum(row_snapshot['Pdb_alpha_domain'].values()), 2)
+
+        Structure.objects.all().delete()
+        Protein.objects.all().delete()
+        Drug.objects.all().delete()
+
+        bulk_messages = self.upload(bulk=True, batch_size=2)
+
+        self.assertEqual(self.snapshot(), row_snapshot)
+        self.assertEqual(bulk_messages, row_messages)
+
+    def test_bulk_upload_pdb_without_subunit(self):
+        """ Test that a Pdb without subunits is refused, as when saving it,
+        before any Pdb is created.
+        """
+
+        self.upload(bulk=True)
+
+        filename = self.sheet('no_subunits', [
+            ("PDB_ID", "Exp_tech", "Resolution", "Alpha_subunit",
+             "Alpha_domains", "Beta_subunit", "Beta_domains",
+             "Protein_interactors", "Other_interactors"),
+            ("5pdb", "X-ray", 2.5, "alpha-1", "alpha-I", "beta-1", "beta-I",
+             "native:P02751@1-10(Fibronectin)", "other:B:Collagen"),
+            ("4pdb", "X-ray", 2.5, "-", "-", "-", "-", "-", "-"),
+        ])
+
+        with self.assertRaises(ValueError):
+            PdbParser(filename, bulk=True).parse_and_upload()
+
+        self.assertFalse(Pdb.objects.filter(pdb__in=["4pdb", "5pdb"]).exists())
+
+    @override_settings(INGEST_CHUNK_SIZE=1)
+    def test_bulk_upload_report(self):
+        """ Test that all invalid rows of a bulk upload are reported by their
+        row in the sheet, across chunks, and that no Drug is created.
+        """
+
+        self.upload(bulk=True)
+
+        filename = self.sheet('invalid_drugs', [
+            ("Name", "Marketing_name", "Status", "Type", "Administration",
+             "ATC_code", "ATC_definition", "Drugbank_ID", "Target_integrin",
+             "Launch_year", "Notes"),
+            ("Natalizumab", "-", "withdrawn", "monoclonal antibody", "IV",
+             "L04AA24", "Immunosuppressant", "-", "alpha-1/beta-1", 2004,
+             "-"),
+            ("Lifitegrast", "Xiidra", "marketed", "eye drops", "topical",
+             "S01XA25", "Other ophthalmologicals", "DB11611",
+             "alpha-1/beta-1", 2016, "-"),
+            ("Tirofiban", "Aggrastat", "marketed", "small molecule", "IV",
+             "B01AC17", "Antithrombotic agent", "DB00775", "alpha-1/beta-1",
+             1998, "-"),
+        ])
+
+        with self.assertRaises(CommandError) as context:
+            call_command(
+                'upload_drugs', filename, bulk=True, stdout=StringIO(),
+            )
+
+        report = str(context.exception).splitlines()
+
+        self.assertEqual(report[0], "Invalid data in {0}:".format(filename))
+        self.assertEqual(
+            [line.split(" (")[0] for line in report[1:]],
+            ["Drug in row 2", "Drug in row 3"]
+        )
+        self.assertFalse(Drug.objects.filter(name="Tirofiban").exists())
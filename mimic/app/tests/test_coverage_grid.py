@@ -0,0 +1,124 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from IntegrinDiagram.integrinDiagram import ALPHA_COLORMAP
+from IntegrinDiagram.integrinDiagram import BETA_COLORMAP
+
+from app.coverage_grid import compute_coverage_grid
+from app.coverage_grid import get_coverage_grid
+from app.dataset_cache import bump_dataset_version
+from app.models import MonomerToStructure
+
+from app.tests.factories import BetaFactory
+from app.tests.factories import DimerFactory
+from app.tests.factories import PdbFactory
+from app.tests.factories import StructureFactory
+
+
+class CoverageGridTest(TestCase):
+    """ Test the domain coverage grid of all Dimers.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Create two Dimers sharing an Alpha subunit, and a third Dimer
+        with an alpha-I domain. Only the first Dimer has Pdbs.
+        """
+
+        first = DimerFactory.create()
+        second = DimerFactory.create(alpha=first.alpha, beta=BetaFactory())
+        third = DimerFactory.create(beta=first.beta)
+
+        thigh = StructureFactory.create(short='thigh')
+        beta_i = StructureFactory.create(short='beta-I')
+        alpha_i = StructureFactory.create(short='alpha-I')
+
+        MonomerToStructure.objects.create(
+            monomer=third.alpha, structure=alpha_i, start=1, stop=100
+        )
+
+        PdbFactory.create(
+            pdb='1abc',
+            alpha=first.alpha,
+            beta=first.beta,
+            alpha_domain=(thigh,),
+            beta_domain=(beta_i,),
+        )
+        PdbFactory.create(
+            pdb='2abc',
+            alpha=first.alpha,
+            beta=first.beta,
+            alpha_domain=(thigh,),
+        )
+
+        cls.dimers = [first, second, third]
+
+    def setUp(self):
+        bump_dataset_version()
+
+    def test_compute_coverage_grid(self):
+        """ Test the layout and coverage of the grid, which takes a constant
+        number of queries.
+        """
+
+        # The Dimers, the coverage of all Monomers and the alpha-I domains.
+        with self.assertNumQueries(3):
+            grid = compute_coverage_grid()
+
+        first, second, third = self.dimers
+
+        self.assertEqual(
+            grid['betas'],
+            [first.beta.display_name(), second.beta.display_name()]
+        )
+        self.assertEqual(
+            [row['alpha'] for row in grid['rows']],
+            [first.alpha.display_name(), third.alpha.display_name()]
+        )
+
+        cell = grid['rows'][0]['cells'][0]
+        self.assertEqual(cell['lookup_name'], first.lookup_name)
+        self.assertEqual(cell['covered'], 2)
+        self.assertIn('--thigh-fill:{0}'.format(ALPHA_COLORMAP[1][0]), cell['style'])
+        self.assertIn('--beta-I-fill:{0}'.format(BETA_COLORMAP[1][0]), cell['style'])
+        self.assertIn('--alpha-I-display:none', cell['style'])
+
+        # The second Dimer shares the covered Alpha subunit.
+        cell = grid['rows'][0]['cells'][1]
+        self.assertEqual(cell['lookup_name'], second.lookup_name)
+        self.assertEqual(cell['covered'], 1)
+        self.assertNotIn('--beta-I-fill', cell['style'])
+
+        # The Alpha subunit of the third Dimer has no Dimer with the second
+        # Beta subunit.
+        cell = grid['rows'][1]['cells'][0]
+        self.assertEqual(cell['lookup_name'], third.lookup_name)
+        self.assertNotIn('--alpha-I-display', cell['style'])
+        self.assertIsNone(grid['rows'][1]['cells'][1])
+
+    def test_get_coverage_grid_cached(self):
+        """ Test that the grid is only computed once per dataset version.
+        """
+
+        grid = get_coverage_grid()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_coverage_grid(), grid)
+
+        bump_dataset_version()
+
+        with self.assertNumQueries(3):
+            get_coverage_grid()
+
+    def test_coverage_grid_view(self):
+        """ Test that the grid page links every Dimer.
+        """
+
+        response = self.client.get(reverse('coverage'))
+
+        self.assertEqual(response.status_code, 200)
+        for dimer in self.dimers:
+            self.assertContains(
+                response, reverse('dimer', args=(dimer.lookup_name,))
+            )
+
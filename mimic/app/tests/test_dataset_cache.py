@@ -0,0 +1,148 @@
+from unittest import mock
+
+from django.core.cache import caches
+from django.template import Context
+from django.template import Template
+from django.test import TestCase
+
+from app.dataset_cache import DATASET_VERSION_KEY
+from app.dataset_cache import DATASET_VERSION_TIMEOUT
+from app.dataset_cache import DatasetCache
+from app.dataset_cache import bump_dataset_version
+from app.dataset_cache import dataset_cached
+from app.dataset_cache import fragment_cache
+from app.dataset_cache import get_dataset_version
+
+
+class DatasetCacheTest(TestCase):
+    """ Test the dataset version, and the cache keyed by it.
+    """
+
+    def setUp(self):
+        self.computed = []
+        bump_dataset_version()
+
+    def compute(self, value):
+        """ Return a compute function for 'value', which records its calls.
+        """
+
+        def compute():
+            self.computed.append(value)
+            return value
+        return compute
+
+    def test_get_dataset_version(self):
+        """ Test that the version is read from the cache, and incremented by
+        bump_dataset_version.
+        """
+
+        stamp = get_dataset_version()
+
+        with self.assertNumQueries(0):
+            self.assertEqual(get_dataset_version(), stamp)
+
+        bumped = bump_dataset_version()
+
+        self.assertEqual(bumped.version, stamp.version + 1)
+        self.assertNotEqual(bumped.token, stamp.token)
+
+        # The bump stores the new version, rather than deleting the old one
+        with self.assertNumQueries(0):
+            self.assertEqual(get_dataset_version(), bumped)
+
+    def test_get_dataset_version_timeout(self):
+        """ Test that a version read from the database expires, so a version
+        read just before a bump is not used forever.
+        """
+
+        cache = caches['default']
+        cache.delete(DATASET_VERSION_KEY)
+
+        with mock.patch.object(cache, 'set') as cache_set:
+            stamp = get_dataset_version()
+
+        cache_set.assert_called_once_with(
+            DATASET_VERSION_KEY, stamp, DATASET_VERSION_TIMEOUT
+        )
+
+    def test_get_computes_once_per_version(self):
+        """ Test that a value is only computed again after a bump.
+        """
+
+        cache = DatasetCache()
+
+        self.assertEqual(cache.get('a', self.compute(1)), 1)
+        self.assertEqual(cache.get('a', self.compute(2)), 1)
+
+        bump_dataset_version()
+
+        self.assertEqual(cache.get('a', self.compute(3)), 3)
+        self.assertEqual(self.computed, [1, 3])
+
+    def test_shared_between_caches(self):
+        """ Test that values are shared between processes (caches) through
+        the shared cache, also when they are None.
+        """
+
+        DatasetCache().get('a', self.compute(None))
+
+        self.assertIsNone(DatasetCache().get('a', self.compute(1)))
+        self.assertEqual(self.computed, [None])
+
+    def test_least_recently_used(self):
+        """ Test that only 'size' values are kept in memory.
+        """
+
+        cache = DatasetCache(size=2)
+
+        for key in ['a', 'b', 'a', 'c']:
+            cache.get(key, self.compute(key))
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.stats(), {'hits': 1, 'misses': 3, 'size': 2})
+
+    def test_dataset_cached(self):
+        """ Test that the decorator caches by name and arguments.
+        """
+
+        @dataset_cached('test.double')
+        def double(value):
+            self.computed.append(value)
+            return value * 2
+
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double(2), 4)
+        self.assertEqual(double(3), 6)
+        self.assertEqual(self.computed, [2, 3])
+
+
+class DatasetFragmentTest(TestCase):
+    """ Test the dataset_fragment template tag.
+    """
+
+    TEMPLATE = Template(
+        "{% load custom_tags_filters %}"
+        "{% dataset_fragment 'test_row' pk %}{{ name }}{% enddataset_fragment %}"
+    )
+
+    def setUp(self):
+        bump_dataset_version()
+
+    def render(self, **context):
+        return self.TEMPLATE.render(Context(context))
+
+    def test_fragment_cached(self):
+        """ Test that a fragment is cached by its variables, until the
+        dataset version changes.
+        """
+
+        misses = fragment_cache.misses
+
+        self.assertEqual(self.render(pk=1, name='a'), 'a')
+        self.assertEqual(self.render(pk=1, name='b'), 'a')
+        self.assertEqual(self.render(pk=2, name='b'), 'b')
+        self.assertEqual(fragment_cache.misses - misses, 2)
+
+        bump_dataset_version()
+
+        self.assertEqual(self.render(pk=1, name='c'), 'c')
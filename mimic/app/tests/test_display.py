@@ -0,0 +1,61 @@
+from django.test import SimpleTestCase
+from django.test import TestCase
+
+from app import display
+from app.models import ProteinInformation
+from app.models import ProteinInteractor
+
+from app.tests.factories import ProteinFactory
+
+
+class DisplayTest(SimpleTestCase):
+    """ Test rendering the display HTML of data fields.
+    """
+
+    def test_integrin_name(self):
+        self.assertEqual(
+            display.integrin_name("alpha-5_beta-1"), "&alpha;5_&beta;1"
+        )
+
+    def test_function_pubmed_link(self):
+        html = display.function_pubmed_link("Binds (PubMed:7989369).")
+
+        self.assertIn('https://pubmed.ncbi.nlm.nih.gov/7989369/', html)
+        self.assertNotIn('PubMed:', html)
+
+    def test_three_digit_round(self):
+        self.assertEqual(
+            display.three_digit_round("1.123456; 2.5"), "1.1235; 2.5"
+        )
+
+
+class DisplayFieldsTest(TestCase):
+    """ Test that the display HTML is stored when saving.
+    """
+
+    def test_protein_interactor(self):
+        interactor = ProteinInteractor.objects.create(
+            protein=ProteinFactory.create(),
+            type_of_evidence="+",
+            target_integrin="alpha-V_beta-3",
+            interaction_strength="Kd=10 nM",
+            notes="Requires Mg2+",
+        )
+
+        self.assertEqual(interactor.target_integrin_html, "&alpha;V_&beta;3")
+        self.assertEqual(
+            interactor.interaction_strength_html, "K<sub>d</sub>=10 nM"
+        )
+        self.assertEqual(interactor.notes_html, "Requires Mg<sup>2+</sup>")
+
+    def test_protein_information(self):
+        information = ProteinInformation.objects.create(
+            protein=ProteinFactory.create(),
+            length="100",
+            name="Fibronectin",
+            function="Binds integrins (PubMed:1234).",
+        )
+
+        self.assertIn(
+            'https://pubmed.ncbi.nlm.nih.gov/1234/', information.function_html
+        )
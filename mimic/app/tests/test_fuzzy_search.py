@@ -0,0 +1,129 @@
+import random
+
+from django.test import TestCase
+from django.urls import reverse
+
+from app.dataset_cache import bump_dataset_version
+from app.fuzzy_search import TrigramIndex
+from app.fuzzy_search import fuzzy_search_protein_summaries
+from app.fuzzy_search import trigrams
+from app.models import ProteinInformation
+from app.models import ProteinInteractor
+from app.summaries import rebuild_protein_summaries
+
+from app.tests.factories import ProteinFactory
+from app.tests.factories import random_string
+
+
+class TrigramIndexTest(TestCase):
+    """ Test the in-memory trigram index.
+    """
+
+    def test_trigrams(self):
+        self.assertEqual(
+            sorted(trigrams("Ca-t")), ['  c', '  t', ' ca', ' t ', 'ca ']
+        )
+        self.assertEqual(trigrams(" - "), set())
+
+    def test_search(self):
+        index = TrigramIndex([
+            "Fibronectin", "Vitronectin", "Crotalus simus", "Crotalus atrox",
+        ])
+
+        self.assertEqual(len(index), 4)
+        self.assertEqual(
+            [name for name, _ in index.search("fibronectn")], ["Fibronectin"]
+        )
+        # Both share "Crotalus", but the misspelled species ranks first
+        self.assertEqual(
+            [name for name, _ in index.search("Crotalus simsu")],
+            ["Crotalus simus", "Crotalus atrox"]
+        )
+        self.assertEqual(index.search("fibronectin")[0][1], 1)
+        self.assertEqual(index.search("laminin"), [])
+
+    def test_search_candidates(self):
+        """ Test that reading only the rarest trigrams finds the same names
+        as comparing the query to every name.
+        """
+
+        random.seed(1)
+        names = [random_string(12) for _ in range(500)]
+        index = TrigramIndex(names)
+
+        for name in random.sample(names, 50):
+            query = name[:10] + random_string(2)
+            expected = sorted(
+                other for other in set(names)
+                if len(trigrams(query) & trigrams(other)) >= 0.6 * len(
+                    trigrams(query)
+                )
+            )
+
+            self.assertEqual(
+                sorted(name for name, _ in index.search(query)), expected
+            )
+
+
+class FuzzySearchTest(TestCase):
+    """ Test the fuzzy search of the interactors, and its use by the
+    SearchView.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Create two interacting proteins, one of which has its
+        ProteinInformation, and build the ProteinSummaries.
+        """
+
+        fibronectin = ProteinFactory.create(uniprot="P02751", peptide="-")
+        disintegrin = ProteinFactory.create(uniprot="P0C6B6", peptide="-")
+
+        for protein, name in [
+                (fibronectin, "Fibronectin"),
+                (disintegrin, "Disintegrin basicin"),
+        ]:
+            ProteinInteractor.objects.create(
+                protein=protein,
+                name=name,
+                type_of_evidence="+",
+                target_integrin="alpha-5_beta-1",
+            )
+
+        ProteinInformation.objects.create(
+            protein=disintegrin,
+            length="73",
+            name="Disintegrin basicin",
+            gene_name="-",
+            organism_scientific="Crotalus oreganus helleri",
+        )
+
+        rebuild_protein_summaries()
+
+    def setUp(self):
+        bump_dataset_version()
+
+    def search(self, query):
+        return [
+            s.uniprot for s in fuzzy_search_protein_summaries(query)[:10]
+        ]
+
+    def test_fuzzy_search(self):
+        self.assertEqual(self.search("fibronectn"), ["P02751"])
+        self.assertEqual(self.search("Crotalus oregnus"), ["P0C6B6"])
+        self.assertEqual(self.search("basicn"), ["P0C6B6"])
+        self.assertEqual(self.search("laminin"), [])
+
+    def test_search_view_fallback(self):
+        """ Test that the fuzzy search is only used when the query has no
+        exact match.
+        """
+
+        response = self.client.get(reverse('search'), {'q': 'fibronectin'})
+        self.assertContains(response, "1 results")
+        self.assertFalse(response.context['fuzzy'])
+
+        response = self.client.get(reverse('search'), {'q': 'fibronectn'})
+        self.assertContains(response, "No exact matches")
+        self.assertContains(response, "P02751")
+        self.assertTrue(response.context['fuzzy'])
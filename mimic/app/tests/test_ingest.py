@@ -0,0 +1,212 @@
+import os
+import signal
+import tempfile
+
+import pandas as pd
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+
+from app.ingest import upload_file
+from app.models import IngestCheckpoint
+from app.models import Structure
+from app.parsers import StructureParser
+from app.sheets import read_sheet
+
+
+class UploadFileTest(TestCase):
+    """ Test the transactional upload of a file, chunk by chunk.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.filename = os.path.join(self.directory.name, "structures.xlsx")
+
+        self.data = pd.DataFrame(
+            [["S{0}".format(number), "Structure {0}".format(number)]
+             for number in range(5)],
+            columns=["Domain_shorthand", "Domain_name"],
+        )
+        self.data.to_excel(self.filename, index=False)
+
+        self.uploaded = []
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def upload_chunk(self, data, fail=None):
+        """ Create the Structures of 'data', raising 'fail' after the first
+        one of the chunk starting with row 2.
+        """
+
+        for short in data["Domain_shorthand"]:
+            Structure.objects.create(short=short, name=short)
+
+            if fail is not None and short == "S2":
+                raise fail
+
+        self.uploaded.append(list(data["Domain_shorthand"]))
+
+    def upload(self, fail=None, resume=False, chunk_size=2):
+        return upload_file(
+            "StructureParser", self.filename,
+            read_sheet(self.filename, chunk_size=chunk_size),
+            lambda data: self.upload_chunk(data, fail), resume=resume,
+        )
+
+    def test_upload(self):
+        """ Test that all chunks are uploaded, and the file is checkpointed as
+        finished.
+        """
+
+        self.assertTrue(self.upload())
+
+        self.assertEqual(self.uploaded, [["S0", "S1"], ["S2", "S3"], ["S4"]])
+
+        checkpoint = IngestCheckpoint.objects.get()
+        self.assertEqual(checkpoint.row, 6)
+        self.assertTrue(checkpoint.finished)
+
+    def test_error(self):
+        """ Test that an error rolls back the upload of the whole file.
+        """
+
+        with self.assertRaises(ValueError):
+            self.upload(fail=ValueError("Invalid row"))
+
+        self.assertFalse(Structure.objects.exists())
+        self.assertEqual(IngestCheckpoint.objects.get().row, 0)
+
+    def test_errors(self):
+        """ Test that the errors of all invalid chunks are reported together,
+        and the whole file is rolled back.
+        """
+
+        def upload_chunk(data):
+            self.upload_chunk(data)
+
+            if "S0" not in list(data["Domain_shorthand"]):
+                raise ValidationError(
+                    ["Row {0}".format(number) for number in data.index]
+                )
+
+        with self.assertRaises(ValidationError) as context:
+            upload_file(
+                "StructureParser", self.filename,
+                read_sheet(self.filename, chunk_size=2), upload_chunk,
+            )
+
+        self.assertEqual(
+            context.exception.messages, ["Row 4", "Row 5", "Row 6"]
+        )
+        self.assertFalse(Structure.objects.exists())
+        self.assertEqual(IngestCheckpoint.objects.get().row, 0)
+
+    def test_resume(self):
+        """ Test that an interrupt only rolls back the current chunk, and the
+        upload resumes from it.
+        """
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.upload(fail=KeyboardInterrupt())
+
+        self.assertEqual(
+            list(Structure.objects.values_list('short', flat=True)),
+            ["S0", "S1"],
+        )
+        self.assertEqual(IngestCheckpoint.objects.get().row, 3)
+
+        self.uploaded = []
+        self.assertTrue(self.upload(resume=True))
+
+        self.assertEqual(self.uploaded, [["S2", "S3"], ["S4"]])
+        self.assertEqual(Structure.objects.count(), 5)
+
+        self.uploaded = []
+        self.assertFalse(self.upload(resume=True))
+        self.assertEqual(self.uploaded, [])
+
+    def test_resume_chunk_size(self):
+        """ Test that an upload resumes after the last uploaded row, when the
+        file is read in chunks of another size.
+        """
+
+        with self.assertRaises(KeyboardInterrupt):
+            self.upload(fail=KeyboardInterrupt())
+
+        self.uploaded = []
+        self.assertTrue(self.upload(resume=True, chunk_size=3))
+
+        self.assertEqual(self.uploaded, [["S2"], ["S3", "S4"]])
+        self.assertEqual(Structure.objects.count(), 5)
+
+    def test_resume_sigterm(self):
+        """ Test that SIGTERM interrupts an upload as Ctrl-C does.
+        """
+
+        def terminate(data):
+            if "S2" in list(data["Domain_shorthand"]):
+                os.kill(os.getpid(), signal.SIGTERM)
+
+            self.upload_chunk(data)
+
+        with self.assertRaises(KeyboardInterrupt):
+            upload_file(
+                "StructureParser", self.filename,
+                read_sheet(self.filename, chunk_size=2), terminate,
+            )
+
+        self.assertEqual(Structure.objects.count(), 2)
+        self.assertEqual(IngestCheckpoint.objects.get().row, 3)
+        self.assertIs(
+            signal.getsignal(signal.SIGTERM), signal.SIG_DFL
+        )
+
+    def test_resume_reading(self):
+        """ Test that an interrupt while a chunk is read only rolls back that
+        chunk, as while it is uploaded.
+        """
+
+        def chunks():
+            for number, chunk in enumerate(
+                    read_sheet(self.filename, chunk_size=2)):
+                if number == 2:
+                    raise KeyboardInterrupt
+
+                yield chunk
+
+        with self.assertRaises(KeyboardInterrupt):
+            upload_file(
+                "StructureParser", self.filename, chunks(), self.upload_chunk,
+            )
+
+        self.assertEqual(Structure.objects.count(), 4)
+        self.assertEqual(IngestCheckpoint.objects.get().row, 5)
+
+        self.uploaded = []
+        self.assertTrue(self.upload(resume=True))
+
+        self.assertEqual(self.uploaded, [["S4"]])
+        self.assertEqual(Structure.objects.count(), 5)
+
+    def test_resume_parser(self):
+        """ Test that a parser skips a file which was already uploaded, but
+        not a changed file.
+        """
+
+        StructureParser(self.filename, resume=True).parse_and_upload()
+
+        parser = StructureParser(self.filename, resume=True)
+        parser.parse_and_upload()
+
+        self.assertEqual(
+            parser.messages,
+            ["Skipped {0}: it was already uploaded".format(self.filename)],
+        )
+
+        self.data.iloc[:, 0] = ["T{0}".format(n) for n in range(5)]
+        self.data.to_excel(self.filename, index=False)
+
+        StructureParser(self.filename, resume=True).parse_and_upload()
+
+        self.assertEqual(Structure.objects.count(), 10)
+        self.assertEqual(IngestCheckpoint.objects.count(), 2)
@@ -0,0 +1,248 @@
+import tempfile
+import xml.etree.ElementTree as ET
+from unittest import mock
+
+from django.test import SimpleTestCase
+from django.test import TestCase
+
+from IntegrinDiagram.diagramStore import DiagramStore
+
+from IntegrinDiagram.integrinDiagram import ALPHA_COLORMAP
+from IntegrinDiagram.integrinDiagram import BETA_COLORMAP
+from IntegrinDiagram.integrinDiagram import build_dimer_diagram
+from IntegrinDiagram.integrinDiagram import build_pdb_sprite_style
+from IntegrinDiagram.integrinDiagram import build_sprite
+from IntegrinDiagram.integrinDiagram import diagram_version
+from IntegrinDiagram.integrinDiagram import dimer_domain_coverage
+from IntegrinDiagram.integrinDiagram import sprite_style
+
+from app.models import Dimer
+
+from app.tests.factories import DimerFactory
+from app.tests.factories import PdbFactory
+from app.tests.factories import StructureFactory
+
+
+def get_element(svg, elem_id):
+    """ Return the element with ID 'elem_id' from the svg string, or None.
+    """
+
+    for element in ET.fromstring(svg).iter():
+        if element.get('id') == elem_id:
+            return element
+    return None
+
+
+class IntegrinDiagramTest(TestCase):
+    """ Test building the Dimer and Pdb diagrams from the domain coverage.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Create a Dimer with two Pdbs covering the 'thigh' domain, one of
+        which also covers 'bP1' and 'beta-I'.
+        """
+
+        dimer = DimerFactory.create()
+
+        thigh = StructureFactory.create(short='thigh')
+        propeller = StructureFactory.create(short='bP1')
+        beta_i = StructureFactory.create(short='beta-I')
+
+        cls.pdb = PdbFactory.create(
+            pdb='1abc',
+            alpha=dimer.alpha,
+            beta=dimer.beta,
+            alpha_domain=(thigh, propeller),
+            beta_domain=(beta_i,),
+        )
+        PdbFactory.create(
+            pdb='2abc',
+            alpha=dimer.alpha,
+            beta=dimer.beta,
+            alpha_domain=(thigh,),
+        )
+
+        cls.dimer_pk = dimer.pk
+
+    def get_dimer(self):
+        return Dimer.objects.select_related('alpha', 'beta').get(
+            pk=self.dimer_pk
+        )
+
+    def test_dimer_domain_coverage(self):
+        """ Test that the coverage maps each covered domain to its PDB IDs,
+        using one query per subunit.
+        """
+
+        dimer = self.get_dimer()
+
+        with self.assertNumQueries(2):
+            alpha_coverage, beta_coverage = dimer_domain_coverage(dimer)
+
+        self.assertEqual(
+            alpha_coverage,
+            {'thigh': {'1abc', '2abc'}, 'bP1': {'1abc'}}
+        )
+        self.assertEqual(beta_coverage, {'beta-I': {'1abc'}})
+
+    def test_build_dimer_diagram(self):
+        """ Test the colors and popovers of the Dimer diagram, and that the
+        number of queries does not depend on the number of domains.
+        """
+
+        dimer = self.get_dimer()
+
+        # Two coverage queries, and one to check for an alpha-I domain.
+        with self.assertNumQueries(3):
+            svg = build_dimer_diagram(dimer)
+
+        thigh = get_element(svg, 'thigh')
+        self.assertIn('fill:{0}'.format(ALPHA_COLORMAP[1][0]), thigh.get('style'))
+        self.assertIn('1abc', thigh.get('data-content'))
+        self.assertIn('2abc', thigh.get('data-content'))
+
+        calf = get_element(svg, 'calf1')
+        self.assertIn('fill:{0}'.format(ALPHA_COLORMAP[0][0]), calf.get('style'))
+        self.assertIsNone(calf.get('data-content'))
+
+        beta_i = get_element(svg, 'beta-I')
+        self.assertIn('fill:{0}'.format(BETA_COLORMAP[1][0]), beta_i.get('style'))
+        self.assertNotIn('2abc', beta_i.get('data-content'))
+
+        # The alpha subunit has no alpha-I domain.
+        self.assertIsNone(get_element(svg, 'alpha-I'))
+
+    def test_build_pdb_sprite_style(self):
+        """ Test that the sprite style only colors the covered domains, using
+        one query per subunit.
+        """
+
+        with self.assertNumQueries(2):
+            style = build_pdb_sprite_style(self.pdb)
+
+        self.assertIn('--bP_body-fill:{0}'.format(ALPHA_COLORMAP[1][0]), style)
+        self.assertIn('--beta-I-stroke:{0}'.format(BETA_COLORMAP[1][1]), style)
+        self.assertNotIn('--calf1-fill', style)
+        self.assertNotIn('--alpha-I-display', style)
+
+
+class IntegrinSpriteTest(SimpleTestCase):
+    """ Test the integrin sprite, and its styles.
+    """
+
+    def test_build_sprite(self):
+        """ Test that the domains in the sprite are colored by custom
+        properties, which default to the uncovered colors.
+        """
+
+        sprite = build_sprite()
+        symbol = get_element(sprite, 'integrin')
+
+        self.assertTrue(symbol.tag.endswith('symbol'))
+
+        thigh = get_element(sprite, 'thigh')
+        self.assertIn(
+            'fill:var(--thigh-fill, {0})'.format(ALPHA_COLORMAP[0][0]),
+            thigh.get('style'),
+        )
+        self.assertEqual(thigh.get('class'), 'integrin-domain')
+        self.assertIn(
+            'display:var(--alpha-I-display, inline)',
+            get_element(sprite, 'alpha-I-link').get('style'),
+        )
+
+    def test_sprite_style_alpha_i(self):
+        """ Test that the alpha-I domain is hidden with a custom property.
+        """
+
+        style = sprite_style({}, {'Hyb1': {'1abc'}}, alpha_i=False)
+
+        self.assertEqual(
+            style,
+            '--Hyb-fill:{0};--Hyb-stroke:{1};--alpha-I-display:none'.format(
+                *BETA_COLORMAP[1]
+            )
+        )
+
+
+class DiagramStoreTest(SimpleTestCase):
+    """ Test the DiagramStore LRU and spill directory.
+    """
+
+    def setUp(self):
+        self.builds = []
+
+    def build(self, svg):
+        """ Return a build function for 'svg', which records its calls.
+        """
+
+        def build():
+            self.builds.append(svg)
+            return svg
+        return build
+
+    def test_get_builds_once(self):
+        """ Test that a diagram is only built the first time.
+        """
+
+        store = DiagramStore('template')
+
+        self.assertEqual(store.get(['dimer', 1], self.build('a')), 'a')
+        self.assertEqual(store.get(['dimer', 1], self.build('b')), 'a')
+        self.assertEqual(self.builds, ['a'])
+
+    def test_namespace(self):
+        """ Test that keys are separated by namespace (template hash).
+        """
+
+        store = DiagramStore('template')
+        store.get(['dimer', 1], self.build('a'))
+
+        other = DiagramStore('other template')
+        self.assertEqual(other.get(['dimer', 1], self.build('b')), 'b')
+
+    def test_diagram_version(self):
+        """ Test that the version of the diagrams changes with the version of
+        the builders, not only with the template.
+        """
+
+        version = diagram_version()
+
+        with mock.patch(
+                'IntegrinDiagram.integrinDiagram.BUILDER_VERSION', 0):
+            self.assertNotEqual(diagram_version(), version)
+
+    def test_least_recently_used(self):
+        """ Test that the least recently used diagram is evicted.
+        """
+
+        store = DiagramStore('template', size=2)
+
+        store.get('a', self.build('a'))
+        store.get('b', self.build('b'))
+        store.get('a', self.build('a'))
+        store.get('c', self.build('c'))
+
+        self.assertEqual(len(store), 2)
+
+        store.get('a', self.build('a'))
+        store.get('b', self.build('b'))
+
+        self.assertEqual(self.builds, ['a', 'b', 'c', 'b'])
+
+    def test_spill_directory(self):
+        """ Test that diagrams are read back from the spill directory.
+        """
+
+        with tempfile.TemporaryDirectory() as directory:
+            store = DiagramStore('template', directory=directory)
+            store.get('a', self.build('a'))
+
+            store.clear()
+            self.assertEqual(store.get('a', self.build('b')), 'a')
+
+            other = DiagramStore('template', directory=directory)
+            self.assertEqual(other.get('a', self.build('c')), 'a')
+
+        self.assertEqual(self.builds, ['a'])
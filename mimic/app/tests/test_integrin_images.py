@@ -0,0 +1,232 @@
+import hashlib
+import json
+import os
+import tempfile
+
+from io import BytesIO
+from io import StringIO
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase
+from django.test import TestCase
+from PIL import Image
+
+from IntegrinDiagram.integrinDiagram import RASTER_FORMATS
+from IntegrinDiagram.integrinDiagram import RASTER_SIZES
+from IntegrinDiagram.integrinDiagram import build_thumbnail_diagram
+from IntegrinDiagram.integrinDiagram import diagram_version
+from IntegrinDiagram.integrinDiagram import rasterize
+
+from app import integrin_images
+
+from app.tests.factories import DimerFactory
+from app.tests.factories import PdbFactory
+from app.tests.factories import StructureFactory
+
+# The module of the generate_integrin_diagrams command.
+COMMAND_MODULE = 'app.management.commands.generate_integrin_diagrams'
+
+
+def fake_rasterize(svg):
+    """ Return distinct image data for every diagram, size and format, in
+    place of `rasterize`.
+    """
+
+    return {
+        size: {
+            image_format: hashlib.sha1(
+                (svg + size + image_format).encode('utf-8')
+            ).digest()
+            for image_format in RASTER_FORMATS
+        }
+        for size in RASTER_SIZES
+    }
+
+
+class RasterizeTest(SimpleTestCase):
+    """ Test rasterizing a diagram to several sizes and formats.
+    """
+
+    def test_rasterize(self):
+        """ Test that every size is produced in every format.
+        """
+
+        svg = build_thumbnail_diagram({}, {}, True).get_xml_str()
+        images = rasterize(svg, sizes={'small': 50, 'large': 100})
+
+        self.assertEqual(set(images), {'small', 'large'})
+
+        for size, width in [('small', 50), ('large', 100)]:
+            self.assertEqual(set(images[size]), {'png', 'webp'})
+
+            for image_format, data in images[size].items():
+                image = Image.open(BytesIO(data))
+                self.assertEqual(image.format, image_format.upper())
+                self.assertEqual(image.width, width)
+
+
+class IntegrinImagesTest(SimpleTestCase):
+    """ Test looking up the pre-built images in the manifest.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.manifest_path = os.path.join(self.directory.name, 'manifest.json')
+
+        files = {
+            size: {
+                'png': '{0}-000000000000.png'.format(size),
+                'webp': '{0}-000000000000.webp'.format(size),
+            }
+            for size in ['thumbnail', 'card', 'retina']
+        }
+
+        with open(self.manifest_path, 'w') as o:
+            json.dump({
+                'images': {'key': files},
+                'dimers': {'alpha-1_beta-1': 'key'},
+                'pdbs': {},
+            }, o)
+
+        patcher = mock.patch.object(
+            integrin_images, 'MANIFEST_PATH', self.manifest_path
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(self.directory.cleanup)
+
+    def test_get_integrin_images(self):
+        """ Test the 1x and 2x urls of a Dimer with images.
+        """
+
+        images = integrin_images.get_integrin_images('dimers', 'alpha-1_beta-1')
+
+        self.assertTrue(images['webp']['src'].endswith('card-000000000000.webp'))
+        self.assertTrue(
+            images['png']['srcset'].endswith('retina-000000000000.png 2x')
+        )
+
+    def test_get_integrin_images_missing(self):
+        """ Test that there are no images for unknown Dimers and Pdbs.
+        """
+
+        self.assertIsNone(integrin_images.get_integrin_images('pdbs', '1abc'))
+        self.assertIsNone(
+            integrin_images.get_integrin_images('dimers', 'alpha-2_beta-1')
+        )
+
+
+class GenerateIntegrinDiagramsTest(TestCase):
+    """ Test the generate_integrin_diagrams command, writing to a temporary
+    directory.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Create a Dimer with a Pdb covering its beta-I domain, and a Pdb
+        covering no domain, which have three distinct diagrams.
+        """
+
+        cls.dimer = DimerFactory.create()
+        cls.pdb = PdbFactory.create(
+            pdb="1abc", alpha=cls.dimer.alpha, beta=cls.dimer.beta,
+            beta_domain=(StructureFactory.create(short='beta-I'),),
+        )
+        cls.empty_pdb = PdbFactory.create(pdb="2abc")
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+        self.integrins_path = os.path.join(self.directory.name, 'integrins')
+        self.manifest_path = self.integrins_path + '.json'
+        os.mkdir(self.integrins_path)
+
+        for name, value in [
+                ('INTEGRINS_PATH', self.integrins_path),
+                ('MANIFEST_PATH', self.manifest_path),
+                ('rasterize', fake_rasterize),
+        ]:
+            patcher = mock.patch('{0}.{1}'.format(COMMAND_MODULE, name), value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def generate(self, **options):
+        """ Run the command, and return its last line of output and the
+        manifest it wrote.
+        """
+
+        out = StringIO()
+        call_command('generate_integrin_diagrams', stdout=out, **options)
+
+        with open(self.manifest_path) as o:
+            return out.getvalue().splitlines()[-1], json.load(o)
+
+    def image_files(self, manifest, key):
+        """ Return the image files of the diagram 'key' in 'manifest'.
+        """
+
+        return set(
+            filename
+            for formats in manifest['images'][key].values()
+            for filename in formats.values()
+        )
+
+    def test_incremental(self):
+        """ Test that a second incremental run only renders new diagrams, and
+        removes the images which are no longer used.
+        """
+
+        output, manifest = self.generate(incremental=True)
+
+        self.assertTrue(output.startswith(
+            "Created images of 3 and skipped 0 diagrams (1 dimers, 2 pdbs)"
+        ))
+        self.assertEqual(manifest['version'], diagram_version())
+        self.assertEqual(
+            sorted(manifest['pdbs']), [self.pdb.pdb, self.empty_pdb.pdb]
+        )
+        self.assertEqual(len(set(manifest['pdbs'].values())), 2)
+
+        empty_files = self.image_files(manifest, manifest['pdbs']["2abc"])
+        self.assertEqual(len(empty_files), 6)
+
+        # An unused image is removed, but other files are kept
+        for filename in ['card-0123456789ab.png', 'notes.txt']:
+            open(os.path.join(self.integrins_path, filename), 'w').close()
+
+        self.empty_pdb.delete()
+
+        output, second = self.generate(incremental=True)
+
+        self.assertTrue(output.startswith(
+            "Created images of 0 and skipped 2 diagrams (1 dimers, 1 pdbs)"
+        ))
+        self.assertEqual(second['dimers'], manifest['dimers'])
+        self.assertEqual(second['pdbs'], {"1abc": manifest['pdbs']["1abc"]})
+        self.assertEqual(len(second['images']), 2)
+
+        used = set()
+
+        for key in second['images']:
+            used |= self.image_files(second, key)
+
+        self.assertEqual(
+            set(os.listdir(self.integrins_path)), used | {'notes.txt'}
+        )
+        self.assertFalse(used & empty_files)
+
+    def test_jobs(self):
+        """ Test that rendering in several processes writes the same images,
+        after closing the database connections.
+        """
+
+        _, manifest = self.generate()
+
+        with mock.patch(
+                '{0}.connections'.format(COMMAND_MODULE)) as connections:
+            _, parallel = self.generate(jobs=2)
+
+        connections.close_all.assert_called_once_with()
+        self.assertEqual(parallel, manifest)
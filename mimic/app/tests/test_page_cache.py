@@ -0,0 +1,101 @@
+from django.http import HttpResponseRedirect
+from django.test import RequestFactory
+from django.test import TestCase
+from django.test import override_settings
+from django.urls import reverse
+
+from app.dataset_cache import bump_dataset_version
+from app.page_cache import dataset_cache_page
+
+from app.tests.factories import DimerFactory
+
+
+class PageCacheTest(TestCase):
+    """ Test the page cache, ETags and conditional requests of the read-only
+    views.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.dimer = DimerFactory.create()
+
+    def setUp(self):
+        bump_dataset_version()
+        self.url = reverse('dimer', args=(self.dimer.lookup_name,))
+
+    def test_page_cached(self):
+        """ Test that the page is served from the cache the second time.
+        """
+
+        response = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url)
+
+        self.assertEqual(cached.status_code, 200)
+        self.assertEqual(cached.content, response.content)
+
+    def test_not_modified(self):
+        """ Test that a conditional request with the ETag or Last-Modified
+        time is answered with 304, without querying the database.
+        """
+
+        response = self.client.get(self.url)
+
+        with self.assertNumQueries(0):
+            etag = self.client.get(
+                self.url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+            modified = self.client.get(
+                self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']
+            )
+
+        self.assertEqual(etag.status_code, 304)
+        self.assertEqual(modified.status_code, 304)
+
+    def test_etag_per_url_and_version(self):
+        """ Test that the ETag depends on the query string, the dataset
+        version and the deploy version.
+        """
+
+        etag = self.client.get(self.url)['ETag']
+
+        self.assertFalse(etag.startswith('W/'))
+        self.assertNotEqual(self.client.get(self.url + '?a=1')['ETag'], etag)
+
+        bump_dataset_version()
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+        with override_settings(DEPLOY_VERSION='deployed'):
+            deployed = self.client.get(
+                self.url, HTTP_IF_NONE_MATCH=response['ETag']
+            )
+
+        self.assertEqual(deployed.status_code, 200)
+        self.assertNotEqual(deployed['ETag'], response['ETag'])
+
+    def test_redirect_not_cached(self):
+        """ Test that only successful responses are cached, and others are
+        returned with their headers.
+        """
+
+        calls = []
+
+        def redirect(request):
+            calls.append(request)
+            return HttpResponseRedirect('/browser')
+
+        view = dataset_cache_page(redirect)
+        request = RequestFactory().get('/redirect')
+
+        for _ in range(2):
+            response = view(request)
+
+            self.assertEqual(response.status_code, 302)
+            self.assertEqual(response['Location'], '/browser')
+
+        self.assertEqual(len(calls), 2)
@@ -0,0 +1,239 @@
+from unittest import mock
+
+from django.test import TestCase
+from django.urls import reverse
+
+from app.models import ProteinInformation
+from app.models import ProteinInteractor
+from app.models import ProteinSummary
+from app.models import SearchDocument
+from app.search_index import _is_indexed
+from app.search_index import rebuild_search_index
+from app.search_index import search_documents
+from app.search_index import search_terms
+from app.summaries import rebuild_protein_summaries
+
+from app.tests.factories import DimerFactory
+from app.tests.factories import DrugFactory
+from app.tests.factories import PdbFactory
+from app.tests.factories import ProteinFactory
+
+
+class SearchTest(TestCase):
+    """ Test the full text search of the interactors.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Create two interacting proteins, one of which has its
+        ProteinInformation, and build the ProteinSummaries.
+        """
+
+        fibronectin = ProteinFactory.create(uniprot="P02751", peptide="-")
+        vitronectin = ProteinFactory.create(uniprot="P04004", peptide="-")
+
+        for protein, pubmed in [(fibronectin, "7989369"), (vitronectin, "1")]:
+            ProteinInteractor.objects.create(
+                protein=protein,
+                name="Interactor",
+                type_of_evidence="+",
+                target_integrin="alpha-5_beta-1",
+                pubmed=pubmed,
+            )
+
+        ProteinInformation.objects.create(
+            protein=fibronectin,
+            length="2477",
+            name="Fibronectin",
+            gene_name="FN1",
+            organism_scientific="Homo sapiens",
+            function="Binds cell surfaces and fibrin.",
+        )
+
+        rebuild_protein_summaries()
+
+    def search(self, query):
+        """ Return the UniProt accessions of the interactors found by
+        'query'.
+        """
+
+        groups = search_documents(query)
+
+        if not groups:
+            return []
+
+        summaries = ProteinSummary.objects.in_bulk(
+            [document.object_id for document in groups[0].documents]
+        )
+
+        return [
+            summaries[document.object_id].uniprot
+            for document in groups[0].documents
+        ]
+
+    def test_search_terms(self):
+        self.assertEqual(search_terms("Alpha-V, FN1"), ['alpha', 'v', 'fn1'])
+
+    def test_search_fields(self):
+        """ Test that names, UniProt accessions, gene names, function,
+        PubMed IDs and integrins are searched, by word prefix.
+        """
+
+        self.assertEqual(self.search("fibro"), ["P02751"])
+        self.assertEqual(self.search("p04004"), ["P04004"])
+        self.assertEqual(self.search("FN1"), ["P02751"])
+        self.assertEqual(self.search("fibrin surfaces"), ["P02751"])
+        self.assertEqual(self.search("7989369"), ["P02751"])
+        self.assertEqual(
+            sorted(self.search("alpha-5")), ["P02751", "P04004"]
+        )
+        self.assertEqual(self.search("fibronectin vitronectin"), [])
+
+    def test_search_without_index(self):
+        """ Test the sequential scan used without a full text index.
+        """
+
+        with mock.patch('app.search_index._is_indexed', return_value=False):
+            self.assertEqual(self.search("fibro"), ["P02751"])
+
+    def test_search_view(self):
+        """ Test that the view lists the number of results.
+        """
+
+        response = self.client.get(reverse('search'), {'q': 'homo'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "1 results")
+        self.assertContains(response, "P02751")
+
+
+class UnifiedSearchTest(TestCase):
+    """ Test the search of all entity types, grouped by type.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Create a Dimer with a Pdb, three Drugs with similar ATC codes and
+        an interactor.
+        """
+
+        cls.dimer = DimerFactory.create()
+        PdbFactory.create(
+            pdb="1abc", alpha=cls.dimer.alpha, beta=cls.dimer.beta
+        )
+
+        for name, atc in [
+                ("Abciximab", "B01AC13"),
+                ("Eptifibatide", "B01AC16"),
+                ("Tirofiban", "B01AC17"),
+        ]:
+            DrugFactory.create(name=name, marketing_name="", atc=atc)
+
+        ProteinInteractor.objects.create(
+            protein=ProteinFactory.create(uniprot="P02751", peptide="-"),
+            name="Interactor",
+            type_of_evidence="+",
+            target_integrin=cls.dimer.lookup_name,
+        )
+
+        rebuild_protein_summaries()
+
+    def test_rebuild_search_index(self):
+        """ Test that every instance has a SearchDocument.
+        """
+
+        self.assertEqual(rebuild_search_index(), 8)
+        self.assertEqual(
+            sorted(set(SearchDocument.objects.values_list(
+                'entity_type', flat=True
+            ))),
+            ['drug', 'integrin', 'interactor', 'structure', 'subunit']
+        )
+
+    def test_search_documents(self):
+        """ Test that results are grouped by type, in a single query.
+        """
+
+        with self.assertNumQueries(1):
+            groups = search_documents(self.dimer.alpha.name)
+
+        self.assertEqual(
+            [(group.entity_type, group.count) for group in groups],
+            [('interactor', 1), ('integrin', 1), ('subunit', 1)]
+        )
+        self.assertEqual(
+            groups[1].documents[0].url,
+            reverse('dimer', args=(self.dimer.lookup_name,))
+        )
+
+        groups = search_documents("1ABC")
+        self.assertEqual(groups[0].entity_type, 'structure')
+        self.assertEqual(groups[0].documents[0].label, "1abc")
+
+        self.assertEqual(search_documents("-"), [])
+
+    def test_search_documents_rank(self):
+        """ Test that the best matches are listed first, across pages.
+        """
+
+        if not _is_indexed():
+            self.skipTest("The documents have no full text index")
+
+        DrugFactory.create(
+            name="Zontivity",
+            marketing_name="Tirofiban, tirofiban",
+            atc="B01AC24",
+        )
+        rebuild_search_index()
+
+        groups = search_documents("tirofiban", page_size=1)
+
+        self.assertEqual(groups[0].documents[0].label, "Zontivity")
+
+        groups = search_documents(
+            "tirofiban", cursors={'drug': groups[0].next_cursor}, page_size=1
+        )
+
+        self.assertEqual(groups[0].documents[0].label, "Tirofiban")
+        self.assertIsNone(groups[0].next_cursor)
+
+    def test_search_documents_cursor(self):
+        """ Test the cursor pagination of a single entity type.
+        """
+
+        groups = search_documents("b01ac", page_size=2)
+        drugs = groups[0]
+
+        self.assertEqual(drugs.count, 3)
+        self.assertEqual(
+            [document.label for document in drugs.documents],
+            ["Abciximab", "Eptifibatide"]
+        )
+
+        groups = search_documents(
+            "b01ac", cursors={'drug': drugs.next_cursor}, page_size=2
+        )
+
+        self.assertEqual(groups[0].count, 3)
+        self.assertEqual(
+            [document.label for document in groups[0].documents],
+            ["Tirofiban"]
+        )
+        self.assertIsNone(groups[0].next_cursor)
+
+    def test_search_view(self):
+        response = self.client.get(reverse('search'), {'q': "b01ac"})
+
+        self.assertContains(response, "3 results")
+        self.assertContains(response, "Tirofiban")
+        self.assertFalse(response.context['fuzzy'])
+
+        response = self.client.get(
+            reverse('search'), {'q': "b01ac", 'after_drug': "2"}
+        )
+
+        self.assertContains(response, "Tirofiban")
+        self.assertNotContains(response, "Eptifibatide")
+        self.assertEqual(
+            response.context['groups'][0]['first_url'], "?q=b01ac"
+        )
@@ -0,0 +1,123 @@
+import datetime
+import os
+import tempfile
+from unittest import mock
+
+import numpy as np
+import openpyxl
+from django.test import SimpleTestCase
+from django.test import override_settings
+
+from app.sheet_cache import read_cached_sheet
+from app.sheets import NA_VALUES
+
+
+class ReadCachedSheetTest(SimpleTestCase):
+    """ Test the cache of the sheets read by the parsers.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache_dir = os.path.join(self.directory.name, "sheets")
+        self.filename = os.path.join(self.directory.name, "sheet.xlsx")
+
+        self.write([
+            ("Strength", "Notes", "Date", "Empty"),
+            (164, "-", datetime.datetime(2022, 7, 27), None),
+            (2.5, "Binds", None, None),
+            ("-", "N/A", None, None),
+        ])
+
+        override = override_settings(SHEET_CACHE_DIR=self.cache_dir)
+        override.enable()
+        self.addCleanup(override.disable)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, rows):
+        workbook = openpyxl.Workbook()
+
+        for row in rows:
+            workbook.active.append(row)
+
+        workbook.save(self.filename)
+
+    def read(self, version=1, **kwargs):
+        """ Return the rows of all chunks read from the sheet, as records.
+        """
+
+        return [
+            (list(chunk.index), chunk.to_dict('records'))
+            for chunk in read_cached_sheet(
+                self.filename, "TestParser", version, chunk_size=2, **kwargs
+            )
+        ]
+
+    def test_cache(self):
+        """ Test that a cached sheet is read as the excel file is, with the
+        same types, without parsing the file again.
+        """
+
+        kwargs = {'na_values': NA_VALUES | {"-"}, 'na': "-"}
+
+        chunks = self.read(**kwargs)
+
+        self.assertEqual(chunks[1], ([4], [
+            {"Strength": "-", "Notes": "-", "Date": "-", "Empty": "-"},
+        ]))
+        self.assertIs(type(chunks[0][1][0]["Strength"]), int)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        with mock.patch('app.sheet_cache.read_sheet') as read_sheet:
+            cached_chunks = self.read(**kwargs)
+
+        read_sheet.assert_not_called()
+        self.assertEqual(cached_chunks, chunks)
+        self.assertIs(type(cached_chunks[0][1][0]["Strength"]), int)
+        self.assertIs(type(cached_chunks[0][1][1]["Strength"]), float)
+
+        # The missing values are replaced when the cached sheet is read.
+        with mock.patch('app.sheet_cache.read_sheet') as read_sheet:
+            records = self.read(na_values=NA_VALUES | {"-"}, na=None)[0][1]
+
+        read_sheet.assert_not_called()
+        self.assertEqual(records[0]["Date"], datetime.datetime(2022, 7, 27))
+        self.assertIsNone(records[0]["Notes"])
+        self.assertIsNone(records[1]["Date"])
+
+        self.assertEqual(self.read()[0][1][0]["Notes"], "-")
+        self.assertTrue(np.isnan(self.read()[0][1][1]["Empty"]))
+
+    def test_key(self):
+        """ Test that a changed file, or another version of the parser, is
+        not read from the cache.
+        """
+
+        self.read()
+        self.read(version=2)
+
+        self.assertEqual(len(os.listdir(self.cache_dir)), 2)
+
+        self.write([("Strength",), (5,)])
+
+        self.assertEqual(self.read(), [([2], [{"Strength": 5}])])
+
+    def test_partial(self):
+        """ Test that a sheet which was not read completely is not cached.
+        """
+
+        chunks = read_cached_sheet(self.filename, "TestParser", 1, chunk_size=2)
+        next(chunks)
+        chunks.close()
+
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    @override_settings(SHEET_CACHE_DIR=None)
+    def test_no_cache(self):
+        """ Test that without a SHEET_CACHE_DIR the sheet is read without
+        caching it.
+        """
+
+        self.assertEqual(len(self.read()), 2)
+        self.assertFalse(os.path.exists(self.cache_dir))
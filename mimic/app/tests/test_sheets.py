@@ -0,0 +1,101 @@
+import os
+import tempfile
+
+import numpy as np
+import openpyxl
+from django.test import SimpleTestCase
+
+from app.sheets import NA_VALUES
+from app.sheets import read_sheet
+
+
+class ReadSheetTest(SimpleTestCase):
+    """ Test the reading of excel sheets in chunks.
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def sheet(self, rows, formatted_row=None):
+        """ Write 'rows' to an excel file, with an empty but formatted cell
+        in 'formatted_row' if given, and return its path.
+        """
+
+        path = os.path.join(self.directory.name, "sheet.xlsx")
+
+        workbook = openpyxl.Workbook()
+        sheet = workbook.active
+
+        for row in rows:
+            sheet.append(row)
+
+        if formatted_row is not None:
+            sheet.cell(row=formatted_row, column=1).number_format = "0.00"
+
+        workbook.save(path)
+
+        return path
+
+    def test_chunks(self):
+        """ Test that the rows are read in chunks, numbered as in the whole
+        sheet, skipping blank rows.
+        """
+
+        filename = self.sheet([
+            ("Name", "Length"),
+            ("alpha-1", 1179),
+            (None, None),
+            ("alpha-2", 1181),
+            ("beta-1", 798),
+        ], formatted_row=100000)
+
+        chunks = list(read_sheet(filename, chunk_size=2))
+
+        self.assertEqual([len(chunk) for chunk in chunks], [2, 1])
+        self.assertEqual(list(chunks[1].index), [5])
+        self.assertEqual(list(chunks[0].columns), ["Name", "Length"])
+        self.assertEqual(
+            chunks[0].to_dict('records'),
+            [
+                {"Name": "alpha-1", "Length": 1179},
+                {"Name": "alpha-2", "Length": 1181},
+            ],
+        )
+
+    def test_values(self):
+        """ Test that the values are typed by cell, with missing values
+        replaced, and that the columns are named as by pandas.read_excel.
+        """
+
+        filename = self.sheet([
+            ("Strength", "Notes", None, "Notes", None),
+            (164.0, "N/A", "-", "", "ignored"),
+            (2.5, "Binds", 1998, "-"),
+            ("-", None, "1998"),
+        ])
+
+        data = next(read_sheet(filename))
+
+        self.assertEqual(
+            list(data.columns), ["Strength", "Notes", "Unnamed: 2", "Notes.1"]
+        )
+        self.assertEqual(data["Strength"][2], 164)
+        self.assertIs(type(data["Strength"][2]), int)
+        self.assertEqual(data["Strength"][3], 2.5)
+        self.assertEqual(data["Strength"][4], "-")
+        self.assertTrue(np.isnan(data["Notes"][2]))
+        self.assertTrue(np.isnan(data["Notes"][4]))
+        self.assertEqual(data["Unnamed: 2"][3], 1998)
+        self.assertEqual(data["Unnamed: 2"][4], "1998")
+
+        data = next(read_sheet(filename, na_values={"-"}, na=""))
+
+        self.assertEqual(list(data["Notes"]), ["N/A", "Binds", ""])
+        self.assertEqual(list(data["Notes.1"]), ["", "", ""])
+
+        data = next(read_sheet(filename, na_values=NA_VALUES | {"-"}, na="-"))
+
+        self.assertEqual(list(data["Strength"]), [164, 2.5, "-"])
@@ -0,0 +1,74 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from app.dataset_cache import bump_dataset_version
+from app.models import ProteinInteractor
+from app.site_statistics import compute_site_statistics
+
+from app.tests.factories import AlphaFactory
+from app.tests.factories import BetaFactory
+from app.tests.factories import DimerFactory
+from app.tests.factories import ProteinFactory
+
+
+class SiteStatisticsTest(TestCase):
+    """ Test the cached statistics of the home page.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Create an example Dimer, with two interacting proteins, one of
+        which interacts twice.
+        """
+
+        cls.dimer = DimerFactory.create(
+            alpha=AlphaFactory.create(name="alpha-5"),
+            beta=BetaFactory.create(name="beta-1"),
+        )
+
+        fibronectin = ProteinFactory.create(uniprot="P02751")
+
+        for protein, pubmed in [
+                (fibronectin, "1"),
+                (fibronectin, "2"),
+                (ProteinFactory.create(uniprot="P04004"), "3"),
+        ]:
+            ProteinInteractor.objects.create(
+                protein=protein,
+                name="Interactor",
+                type_of_evidence="+",
+                target_integrin=cls.dimer.lookup_name,
+                pubmed=pubmed,
+            )
+
+    def setUp(self):
+        bump_dataset_version()
+
+    def test_example_counts(self):
+        """ Test the counts of the example Dimer.
+        """
+
+        statistics = compute_site_statistics()
+
+        self.assertEqual(statistics['counts']['protein_interactors'], 3)
+        self.assertEqual(
+            [example['lookup_name'] for example in statistics['examples']],
+            ["alpha-5_beta-1"]
+        )
+        self.assertEqual(
+            statistics['examples'][0]['counts'],
+            {'drugs': 0, 'structures': 0, 'interactors': 2}
+        )
+
+    def test_home_page_cached(self):
+        """ Test that the home page shows the statistics, and does not query
+        the database once they are cached.
+        """
+
+        self.client.get(reverse('home'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('home'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "2 interactor(s)")
@@ -0,0 +1,114 @@
+from django.test import TestCase
+from django.urls import reverse
+
+from app.dataset_cache import bump_dataset_version
+from app.models import Pdb
+from app.models import PdbToProtein
+from app.models import Protein
+
+from app.tests.factories import AlphaFactory
+from app.tests.factories import BetaFactory
+
+
+# Number of Pdb instances to generate for the query count tests.
+NUMBER_OF_PDBS = 2000
+
+
+class StructureViewTest(TestCase):
+    """ Test the Structure (Pdb list) view.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Generate NUMBER_OF_PDBS Pdbs, with alternating alpha and beta
+        subunits, and every third Pdb linked to a Protein.
+
+        The instances are created with bulk_create, so this stays reasonably
+        fast.
+        """
+
+        alphas = AlphaFactory.create_batch(3)
+        betas = BetaFactory.create_batch(3)
+
+        Pdb.objects.bulk_create([
+            Pdb(
+                pdb="{0:04d}".format(i),
+                exp_tech='X-ray',
+                resolution=2.0,
+                alpha=alphas[i % len(alphas)],
+                beta=betas[i % len(betas)] if i % 2 else None,
+                other_interactors="protein:A" if i % 5 else None,
+            )
+            for i in range(NUMBER_OF_PDBS)
+        ])
+
+        Protein.objects.bulk_create([
+            Protein(uniprot="P{0:05d}".format(i))
+            for i in range(0, NUMBER_OF_PDBS, 3)
+        ])
+        proteins = {p.uniprot: p for p in Protein.objects.all()}
+
+        PdbToProtein.objects.bulk_create([
+            PdbToProtein(
+                pdb=pdb,
+                protein=proteins["P{0}".format(pdb.pdb.zfill(5))],
+                start=1,
+                stop=10,
+            )
+            for pdb in Pdb.objects.all()
+            if int(pdb.pdb) % 3 == 0
+        ])
+
+    def setUp(self):
+        bump_dataset_version()
+
+    def test_structure_view_200(self):
+        """ Test that the Structure view returns 200, and lists all Pdbs.
+        """
+
+        response = self.client.get(reverse('pdbs'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.context['records']), NUMBER_OF_PDBS)
+
+    def test_structure_view_number_of_queries(self):
+        """ Test that the Structure view uses a constant number of queries,
+        regardless of the number of Pdbs.
+        """
+
+        # One query for the Pdbs (with subunits) and one for the interactions.
+        with self.assertNumQueries(2):
+            self.client.get(reverse('pdbs'))
+
+    def test_structure_view_cached(self):
+        """ Test that the rows are cached until the dataset version changes.
+        """
+
+        self.client.get(reverse('pdbs'))
+
+        with self.assertNumQueries(0):
+            self.client.get(reverse('pdbs'))
+
+        Pdb.objects.filter(pdb='0001').update(exp_tech='NMR')
+        bump_dataset_version()
+
+        response = self.client.get(reverse('pdbs'))
+        records = {r['pdb']: r for r in response.context['records']}
+
+        self.assertEqual(records['0001']['exp_tech'], 'NMR')
+
+    def test_structure_view_interactions(self):
+        """ Test that the interacting UniProt IDs and subunits are listed for
+        each Pdb.
+        """
+
+        response = self.client.get(reverse('pdbs'))
+        records = {r['pdb']: r for r in response.context['records']}
+
+        self.assertEqual(records['0003']['interaction'], ['P00003'])
+        self.assertEqual(records['0001']['interaction'], "-")
+        self.assertEqual(records['0001']['alpha_subunit'].subunit, 'alpha')
+        self.assertEqual(records['0001']['beta_subunit'].subunit, 'beta')
+        self.assertIsNone(records['0002']['beta_subunit'])
+        self.assertTrue(records['0001']['protein_interactors'])
+        self.assertFalse(records['0005']['protein_interactors'])
@@ -0,0 +1,236 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import RequestFactory
+from django.test import TestCase
+from django.urls import reverse
+
+from app.dataset_cache import bump_dataset_version
+from app.models import ProteinInformation
+from app.models import ProteinInteractor
+from app.models import ProteinSummary
+from app.models import SearchDocument
+from app.search_index import _is_indexed
+from app.summaries import rebuild_protein_summaries
+from app.views.about import AboutView
+
+from app.tests.factories import ProteinFactory
+
+
+def create_interactor(protein, **fields):
+    """ Create a ProteinInteractor of 'protein', with 'fields' set.
+    """
+
+    fields.setdefault('target_integrin', "alpha-5_beta-1")
+
+    return ProteinInteractor.objects.create(
+        protein=protein, name="Interactor", type_of_evidence="+", **fields
+    )
+
+
+class ProteinSummaryTest(TestCase):
+    """ Test the ProteinSummaries built from the ProteinInteractors.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        """ Create a protein curated in two Protein rows and three
+        interactions, and two peptides.
+        """
+
+        cls.protein = ProteinFactory.create(uniprot="S0HPF7", peptide="-")
+        duplicate = ProteinFactory.create(uniprot="S0HPF7", peptide="-")
+
+        create_interactor(
+            cls.protein,
+            type_of_interaction="Binding",
+            experimental_method="Surface plasmon resonance evidence",
+            pubmed="2",
+            interaction_strength="Kd = 5 nM",
+        )
+        create_interactor(
+            duplicate,
+            type_of_interaction="Inhibition",
+            experimental_method="Peptide array evidence",
+            target_integrin="alpha-v_beta-3",
+            pubmed="1",
+        )
+        create_interactor(
+            cls.protein,
+            type_of_interaction="Binding",
+            experimental_method="Surface plasmon resonance evidence",
+            pubmed="2",
+        )
+
+        ProteinInformation.objects.create(
+            protein=cls.protein,
+            length="132",
+            name="Disintegrin",
+            organism_scientific="Echis ocellatus",
+        )
+
+        cls.rgd = ProteinFactory.create(uniprot="-", peptide="RGD")
+        create_interactor(
+            cls.rgd,
+            experimental_method="Adhesion assay evidence",
+            xref="PDB:1L5G",
+        )
+
+        cls.ldv = ProteinFactory.create(uniprot="-", peptide="LDV")
+        create_interactor(cls.ldv)
+
+    def test_grouping(self):
+        """ Test that there is one summary per UniProt accession or peptide,
+        in the order the interactors were curated.
+        """
+
+        self.assertEqual(rebuild_protein_summaries(), 3)
+
+        self.assertEqual(
+            list(ProteinSummary.objects.values_list('uniprot', 'peptide')),
+            [("S0HPF7", "-"), ("-", "RGD"), ("-", "LDV")],
+        )
+
+        summary = ProteinSummary.objects.get(uniprot="S0HPF7")
+
+        self.assertEqual(summary.protein, self.protein)
+        self.assertEqual(summary.name, "Disintegrin")
+        self.assertEqual(summary.organism, "Echis ocellatus")
+        self.assertEqual(summary.type_of_interaction, "Binding")
+        self.assertEqual(
+            summary.experimental_method,
+            "Peptide array evidence, Surface plasmon resonance evidence",
+        )
+        self.assertEqual(summary.integrins, "alpha-5_beta-1, alpha-v_beta-3")
+        self.assertEqual(summary.pubmed, "1, 2")
+        self.assertIn("disintegrin", summary.document)
+
+        peptide = ProteinSummary.objects.get(peptide="RGD")
+
+        self.assertEqual(peptide.protein, self.rgd)
+        self.assertEqual(peptide.name, "-")
+        self.assertEqual(peptide.organism, "-")
+
+    def test_flags(self):
+        """ Test the flags of the interaction strength, bound structure and
+        the kinds of assays, set if any interaction has them.
+        """
+
+        rebuild_protein_summaries()
+
+        flags = {
+            summary.uniprot if summary.uniprot != "-" else summary.peptide: (
+                summary.interaction_strength,
+                summary.bound_structure,
+                summary.cell_based_assay,
+                summary.purified_assay,
+            )
+            for summary in ProteinSummary.objects.all()
+        }
+
+        self.assertEqual(flags, {
+            "S0HPF7": (True, False, False, True),
+            "RGD": (False, True, True, False),
+            "LDV": (False, False, False, False),
+        })
+
+    def test_rebuild(self):
+        """ Test that a rebuild replaces all summaries, and indexes them for
+        searching.
+        """
+
+        rebuild_protein_summaries()
+        ProteinInteractor.objects.filter(protein=self.ldv).delete()
+
+        self.assertEqual(rebuild_protein_summaries(), 2)
+        self.assertEqual(ProteinSummary.objects.count(), 2)
+        self.assertEqual(
+            SearchDocument.objects.filter(
+                entity_type=SearchDocument.INTERACTOR
+            ).count(),
+            2,
+        )
+
+    def test_command(self):
+        """ Test the rebuild_protein_summaries command, and that deleting the
+        interactors deletes their summaries.
+        """
+
+        out = StringIO()
+        call_command('rebuild_protein_summaries', stdout=out)
+
+        self.assertEqual(out.getvalue(), "Rebuilt 3 ProteinSummaries.\n")
+        self.assertEqual(ProteinSummary.objects.count(), 3)
+
+        call_command('delete_all_protein_interactors', stdout=StringIO())
+
+        self.assertFalse(ProteinSummary.objects.exists())
+
+
+class ProteinSummaryViewsTest(TestCase):
+    """ Test that the views listing the interactors read the summaries with a
+    constant number of queries.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        for number in range(60):
+            protein = ProteinFactory.create(
+                uniprot="P{0:05d}".format(number), peptide="-"
+            )
+            create_interactor(protein, pubmed=str(number))
+            create_interactor(protein, target_integrin="alpha-v_beta-3")
+
+        rebuild_protein_summaries()
+
+    def setUp(self):
+        bump_dataset_version()
+
+    def test_browser(self):
+        """ Test that a page of the browser counts the rows and selects the
+        rows of the page only.
+        """
+
+        # The number of rows and the page itself
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('browser'), {'page': 2})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [record.uniprot for record in response.context['records']],
+            ["P{0:05d}".format(number) for number in range(50, 60)],
+        )
+
+        # Other pages use the cached number of rows
+        with self.assertNumQueries(1):
+            self.client.get(reverse('browser'))
+
+    def test_about(self):
+        """ Test that the about view lists all summaries in a single query.
+        """
+
+        with self.assertNumQueries(1):
+            response = AboutView(RequestFactory().get('/about'))
+
+        self.assertContains(response, "P00059")
+
+    def test_help(self):
+        """ Test that the help page does not query the summaries.
+        """
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('help'))
+
+        self.assertEqual(response.status_code, 200)
+
+    def test_search(self):
+        """ Test that searching the interactors takes a single query.
+        """
+
+        # SQLite looks up the full text table once per process
+        _is_indexed()
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('search'), {'q': 'p00042'})
+
+        self.assertContains(response, "P00042")
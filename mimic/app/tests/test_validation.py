@@ -0,0 +1,123 @@
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from app.models import AlternativeName
+from app.models import Drug
+from app.validation import validate_batch
+
+from app.tests.factories import ProteinFactory
+
+
+def drug(name, atc, drug_type="small molecule", **kwargs):
+    return Drug(
+        name=name,
+        status="marketed",
+        drug_type=drug_type,
+        administration="oral",
+        atc=atc,
+        atc_class="Antithrombotic agent",
+        **kwargs
+    )
+
+
+class ValidateBatchTest(TestCase):
+    """ Test the validation of a batch of instances.
+    """
+
+    def assertErrors(self, model, instances, errors, exclude=None):
+        """ Assert that validating 'instances' reports 'errors', as (number,
+        field) tuples, in order.
+        """
+
+        with self.assertRaises(ValidationError) as context:
+            validate_batch(model, instances, exclude=exclude)
+
+        messages = context.exception.messages
+        self.assertEqual(len(messages), len(errors), messages)
+
+        for message, (number, field) in zip(messages, errors):
+            self.assertTrue(
+                message.startswith("{0} {1} (".format(
+                    model._meta.verbose_name.capitalize(), number,
+                )),
+                message,
+            )
+            self.assertIn("): {0}: ".format(field), message)
+
+    def test_valid(self):
+        """ Test that a valid batch passes, with its fields cleaned.
+        """
+
+        drugs = [
+            drug("Tirofiban", "B01AC17", launch_year="1998"),
+            drug("Natalizumab", "L04AA23", "monoclonal antibody"),
+        ]
+
+        validate_batch(Drug, drugs)
+
+        self.assertEqual(drugs[0].launch_year, 1998)
+
+    def test_all_errors(self):
+        """ Test that all errors of all instances are reported together.
+        """
+
+        drug("Eptifibatide", "B01AC16").save()
+
+        self.assertErrors(Drug, [
+            drug("Tirofiban", "B01AC17", launch_year="soon"),
+            drug("Lifitegrast", "S01XA25", "eye drops"),
+            drug("Eptifibatide", "B01AC18"),
+            drug("Abciximab", "B01AC13", "monoclonal antibody"),
+            drug("Abciximab", "B01AC13", "monoclonal antibody"),
+        ], [
+            (1, "launch_year"),
+            (2, "drug_type"),
+            (3, "name"),
+            (5, "name"),
+            (5, "atc"),
+        ])
+
+        self.assertEqual(Drug.objects.count(), 1)
+
+    def test_unique_existing_values(self):
+        """ Test that only the existing instances with values of the batch
+        are read.
+        """
+
+        drug("Eptifibatide", "B01AC16").save()
+        drug("Abciximab", "B01AC13").save()
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertErrors(Drug, [
+                drug("Eptifibatide", "B01AC18"),
+                drug("Tirofiban", "B01AC17"),
+            ], [(1, "name")])
+
+        for query in queries.captured_queries:
+            self.assertIn(" IN (", query['sql'])
+
+    def test_unique_together(self):
+        """ Test that unique_together constraints are checked, within the
+        batch and with the existing instances.
+        """
+
+        protein = ProteinFactory()
+        AlternativeName.objects.create(protein=protein, name="FN")
+
+        names = [
+            AlternativeName(protein=protein, name=name)
+            for name in ["CIG", "FN", "LETS", "CIG"]
+        ]
+
+        self.assertErrors(
+            AlternativeName, names, [(2, "__all__"), (4, "__all__")],
+            exclude=['protein'],
+        )
+
+        validate_batch(
+            AlternativeName,
+            [AlternativeName(protein=ProteinFactory(), name="FN")],
+            exclude=['protein'],
+        )
@@ -3,6 +3,8 @@ from django.urls import reverse_lazy
 from django.views.generic import RedirectView
 from django.views.generic import TemplateView
 
+from app.page_cache import dataset_cache_page
+
 # from mimic.app.views.views import AlphaDetailView
 # from mimic.app.views.views import BetaDetailView
 # from mimic.app.views.views import DimerDetailView
@@ -13,25 +15,27 @@ from django.views.generic import TemplateView
 # from mimic.app.views.views import DrugListView
 # from mimic.app.views.views import ProteinInteractorDetailView
 # from mimic.app.views.views import ProteinInteractorListView
-from .views import browser, downloads, help, home, interactions, search, structures, views
+from .views import autocomplete, browser, coverage, downloads, help, home, interactions, search, structures, views
 
 urlpatterns = [
     path('', RedirectView.as_view(url=reverse_lazy('home'), permanent=True), name='app', ),
     path('home', home.HomePageView, name='home', ),
-    path('interactions/<slug:protein>', interactions.InteractionsView.as_view(), name='interactions', ),
-    path('browser', browser.BrowserView.as_view(), name='browser', ),
+    path('interactions/<slug:protein>', dataset_cache_page(interactions.InteractionsView.as_view()), name='interactions', ),
+    path('browser', dataset_cache_page(browser.BrowserView.as_view()), name='browser', ),
     path('search', search.SearchView.as_view(), name='search', ),
+    path('autocomplete', autocomplete.AutocompleteView, name='autocomplete', ),
     path('downloads', downloads.DownloadView, name='downloads', ),
     path('help', help.HelpView, name='help', ),
-    path('integrins/', views.DimerListView.as_view(), name='integrins'),
+    path('integrins/', dataset_cache_page(views.DimerListView.as_view()), name='integrins'),
+    path('integrins/coverage', coverage.CoverageGridView, name='coverage'),
     path('alpha/<slug:name>', views.AlphaDetailView.as_view(), name='alpha'),
     path('beta/<slug:name>', views.BetaDetailView.as_view(), name='beta'),
-    path('dimer/<slug:lookup_name>', views.DimerDetailView.as_view(), name='dimer'),
+    path('dimer/<slug:lookup_name>', dataset_cache_page(views.DimerDetailView.as_view()), name='dimer'),
     path('about', TemplateView.as_view(template_name="app/about.html"), name='about'),
     # path('pdbs/', views.PdbListView.as_view(), name='pdbs'),
-    path('pdbs/', structures.StructureView, name='pdbs'),
-    path('pdb/<slug:pdb>', views.PdbDetailView.as_view(), name='pdb'),
-    path('drugs/', views.DrugListView.as_view(), name='drugs'),
+    path('pdbs/', dataset_cache_page(structures.StructureView), name='pdbs'),
+    path('pdb/<slug:pdb>', dataset_cache_page(views.PdbDetailView.as_view()), name='pdb'),
+    path('drugs/', dataset_cache_page(views.DrugListView.as_view()), name='drugs'),
     path('drug/<slug:name>', views.DrugDetailView.as_view(), name='drug'),
     path('protein-interactors/', views.ProteinInteractorListView.as_view(), name='protein-interactors'),
 ]
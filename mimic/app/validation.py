@@ -0,0 +1,187 @@
+import pandas as pd
+from django.core.exceptions import NON_FIELD_ERRORS
+from django.core.exceptions import ValidationError
+
+# The number of values compared to (or loaded from) the existing instances
+# per query, to stay below the SQLite limit of query parameters.
+VALUES_BATCH_SIZE = 500
+
+
+def _unique_checks(model):
+    """ Return the unique fields and unique_together constraints of 'model',
+    as tuples of fields.
+    """
+
+    checks = [
+        (field,) for field in model._meta.concrete_fields
+        if field.unique and not field.primary_key
+    ]
+
+    for names in model._meta.unique_together:
+        checks.append(tuple(model._meta.get_field(name) for name in names))
+
+    return checks
+
+
+def _values_frame(instances, fields):
+    """ Return a DataFrame of the 'fields' values of each instance, with a
+    column per field (by attname, so related instances by primary key).
+    """
+
+    return pd.DataFrame(
+        [
+            [getattr(instance, field.attname) for field in fields]
+            for instance in instances
+        ],
+        columns=[field.attname for field in fields],
+    )
+
+
+def _invalid_choices(model, instances):
+    """ Return the positions of the instances with a value outside the
+    choices of a field, as (position, field name, message) tuples.
+    """
+
+    fields = [field for field in model._meta.concrete_fields if field.choices]
+
+    if not fields or not instances:
+        return []
+
+    frame = _values_frame(instances, fields)
+    errors = []
+
+    for field in fields:
+        values = frame[field.attname]
+        valid = values.isin([choice for choice, _ in field.flatchoices])
+
+        # Blank values are valid for blank fields, as in Model.clean_fields
+        if field.blank:
+            valid |= values.isna() | (values == "")
+
+        for position, value in values[~valid].items():
+            errors.append((
+                position,
+                field.name,
+                field.error_messages['invalid_choice'] % {'value': value},
+            ))
+
+    return errors
+
+
+def _not_unique(model, instances):
+    """ Return the positions of the instances which are not unique, within
+    the batch or with an existing instance, as (position, field name,
+    message) tuples. Instances with an empty (None) value are not checked, as
+    in Model.validate_unique.
+    """
+
+    errors = []
+
+    for fields in _unique_checks(model):
+        columns = [field.attname for field in fields]
+
+        batch = _values_frame(instances, fields).dropna().astype(object)
+
+        if batch.empty:
+            continue
+
+        # Only the existing instances with a value of the batch in the first
+        # column can be equal to an instance of the batch.
+        first_values = list(batch[columns[0]].unique())
+        existing_values = []
+
+        for start in range(0, len(first_values), VALUES_BATCH_SIZE):
+            existing_values.extend(model._default_manager.filter(**{
+                "{0}__in".format(columns[0]):
+                    first_values[start:start + VALUES_BATCH_SIZE],
+            }).values_list(*columns))
+
+        existing = pd.DataFrame(
+            existing_values, columns=columns,
+        ).drop_duplicates().astype(object)
+
+        # The first of several equal instances is only compared to the
+        # existing instances, the others duplicate it.
+        duplicated = batch.duplicated(keep='first')
+        exists = batch.reset_index().merge(existing, on=columns)['index']
+        duplicated.loc[exists.values] = True
+
+        name = fields[0].name if len(fields) == 1 else NON_FIELD_ERRORS
+        unique_check = tuple(field.name for field in fields)
+
+        for position in duplicated[duplicated].index:
+            error = instances[position].unique_error_message(
+                model, unique_check
+            )
+            errors.append((position, name, error.messages[0]))
+
+    return errors
+
+
+def _location(position, rows):
+    """ Return where the instance at 'position' is from: its sheet row if
+    known, or else its (1-based) position in the batch.
+    """
+
+    if rows is not None and rows[position] is not None:
+        return "in row {0}".format(rows[position])
+
+    return position + 1
+
+
+def validate_batch(model, instances, exclude=None, rows=None):
+    """ Validate the (unsaved) 'instances' of 'model' as a whole, instead of
+    with the full_clean of each instance before it is saved.
+
+    Args:
+        model (class): The Model class of the instances
+        instances (list): The instances to validate
+        exclude (list, optional): The names of fields not to validate
+        rows (list, optional): The number of the sheet row each instance
+            was read from (or None), to report instead of its position in
+            the batch
+
+    Raises:
+        ValidationError: With a message for every error of every invalid
+            instance, rather than only the first one.
+
+    The fields of each instance are cleaned as by full_clean, except for the
+    choices and uniqueness, which are checked for all instances at once: the
+    values are compared to the choices and to each other in pandas, and to
+    the existing instances with a query per unique constraint, which only
+    reads the instances with values of the batch.
+    """
+
+    exclude = list(exclude or [])
+    exclude.extend(
+        field.name for field in model._meta.concrete_fields if field.choices
+    )
+
+    errors = []
+
+    for position, instance in enumerate(instances):
+        try:
+            instance.clean_fields(exclude=exclude)
+            instance.clean()
+        except ValidationError as error:
+            for name, messages in error.message_dict.items():
+                errors.extend(
+                    (position, name, message) for message in messages
+                )
+
+    errors.extend(_invalid_choices(model, instances))
+    errors.extend(_not_unique(model, instances))
+
+    if errors:
+        raise ValidationError([
+            "{0} {1} ({2}): {3}: {4}".format(
+                model._meta.verbose_name.capitalize(),
+                _location(position, rows),
+                instances[position],
+                name,
+                message,
+            )
+            for position, name, message in sorted(
+                errors, key=lambda error: error[0]
+            )
+        ])
@@ -0,0 +1,24 @@
+from app.autocomplete import MAX_COMPLETIONS
+from app.autocomplete import autocomplete
+from django.http import JsonResponse
+
+
+def AutocompleteView(request):
+    """ The completions of the 'q' parameter, as JSON:
+
+    {"results": [{"type": "protein", "label": ..., "url": ..., "score": 12}]}
+
+    The optional 'k' parameter sets the number of completions, from 0 up to
+    MAX_COMPLETIONS.
+    """
+
+    try:
+        count = int(request.GET.get('k', MAX_COMPLETIONS))
+    except ValueError:
+        count = MAX_COMPLETIONS
+
+    count = max(0, min(count, MAX_COMPLETIONS))
+
+    results = autocomplete(request.GET.get('q', ''), count)
+
+    return JsonResponse({'results': results})
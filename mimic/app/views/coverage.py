@@ -0,0 +1,15 @@
+from django.shortcuts import render
+from app.coverage_grid import get_coverage_grid
+
+
+def CoverageGridView(request):
+    """ The domain coverage of all Dimers, as a grid of Alpha and Beta
+    subunits.
+
+    The grid comes from the cache (see app.coverage_grid), and every cell
+    shows the same integrin sprite, colored with a style.
+    """
+
+    context = {'grid': get_coverage_grid()}
+
+    return render(request, 'app/coverage_grid.html', context)
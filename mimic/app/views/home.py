@@ -1,50 +1,24 @@
-from django.views.generic.detail import DetailView
-from django_tables2 import SingleTableView
+import random
+
 from django.shortcuts import render
-from app.models import Monomer, Dimer, Drug, Pdb, ProteinInteractor
-import pandas as pd
-import pprint
+from app.site_statistics import get_site_statistics
 
-# List of 'random' example dimers to select from.
-RANDOM_EXAMPLE_DIMERS = [
-    'alpha-IIb_beta-3',
-    'alpha-1_beta-1',
-    'alpha-4_beta-1',
-    'alpha-4_beta-7',
-    'alpha-5_beta-1',
-    'alpha-V_beta-3',
-    'alpha-V_beta-6',
-]
 
 def HomePageView(request):
     """ The home page view.
+
+    All counts and the example dimer diagrams come from the cached site
+    statistics, so in steady state this view does not query the database.
     """
-    dimers = Dimer.objects.all()
-    drugs = Drug.objects.all()
-    pdbs = Pdb.objects.all()
-    protein_interactors = ProteinInteractor.objects.all()
+    statistics = get_site_statistics()
 
-    random_dimer = Dimer.objects.filter(
-        lookup_name__in=RANDOM_EXAMPLE_DIMERS,
-    ).order_by("?")[0]
-
-    random_dimer_counts = {
-        #'interactors': random_dimer.proteininteractor_set.count(),
-        'drugs': random_dimer.drug_set.count(),
-        'structures': sum([
-            random_dimer.alpha.pdb_alpha.count(),
-            random_dimer.beta.pdb_beta.count()
-        ])
-    }
+    random_dimer = None
+    if statistics['examples']:
+        random_dimer = random.choice(statistics['examples'])
 
     context = {
-        'dimers': dimers,
+        'counts': statistics['counts'],
         'random_dimer': random_dimer,
-        'random_dimer_counts': random_dimer_counts,
-        'drugs': drugs,
-        'pdbs': pdbs,
-        'protein_interactors': protein_interactors,
     }
 
     return render(request, 'app/home.html', context)
-
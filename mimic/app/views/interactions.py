@@ -22,4 +22,7 @@ class InteractionsView(TemplateView):
 
             data["information"] = ProteinInformation.objects.filter(protein__uniprot=entry_id).first()
 
+        # Identifies the cached table fragment of this protein or peptide.
+        data["protein_id"] = entry_id
+
         return data
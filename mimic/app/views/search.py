@@ -1,19 +1,107 @@
-from app.models import ProteinInteractor
-from django.db.models import Q
-from django.views.generic import ListView
+from app.fuzzy_search import fuzzy_search_protein_summaries
+from app.models import SearchDocument
+from app.search_documents import interactor_document
+from app.search_index import SEARCH_PAGE_SIZE
+from app.search_index import SearchGroup
+from app.search_index import search_documents
+from django.views.generic import TemplateView
 
+# The query parameter with the cursor of an entity type.
+CURSOR_PARAMETER = "after_{0}"
+
+
+class SearchView(TemplateView):
+    """ Search the interactors, integrins, integrin subunits, drugs and
+    structures, by any word (prefix) of their names, identifiers and (for
+    interactors) gene names, organism, function, target integrins or PubMed
+    IDs.
+
+    The results are grouped by type, with the number of results of each, and
+    each group is paginated with a cursor (see app.search_index). If nothing
+    matches exactly, the interactors with a name or organism similar to the
+    query are listed instead (see app.fuzzy_search), so misspelled names are
+    still found.
+    """
 
-class SearchView(ListView):
-    model = ProteinInteractor
     template_name = "app/search.html"
 
-    def get_queryset(self):  # new
-        if self.request.GET:
-            query = self.request.GET["q"]
-            if query != "":
-                object_list = ProteinInteractor.objects.filter(Q(name__icontains=query))
-            else:
-                object_list = []
-        else:
-            object_list = {}
-        return object_list
+    def _cursors(self):
+        """ Return the cursors of the entity types in the query parameters.
+        """
+
+        cursors = {}
+
+        for entity_type, _ in SearchDocument.ENTITY_TYPES:
+            parameter = CURSOR_PARAMETER.format(entity_type)
+            cursor = self.request.GET.get(parameter)
+
+            if cursor is not None and cursor.isdigit():
+                cursors[entity_type] = int(cursor)
+
+        return cursors
+
+    def _url(self, entity_type, cursor):
+        """ Return the url of this search, with the cursor of 'entity_type'
+        set to 'cursor' (or removed if it is None).
+        """
+
+        parameters = self.request.GET.copy()
+        parameters.pop(CURSOR_PARAMETER.format(entity_type), None)
+
+        if cursor is not None:
+            parameters[CURSOR_PARAMETER.format(entity_type)] = cursor
+
+        return "?{0}".format(parameters.urlencode())
+
+    def _fuzzy_groups(self, query):
+        """ Return the interactors with a name or organism similar to
+        'query', as a single (unpaginated) SearchGroup.
+        """
+
+        results = fuzzy_search_protein_summaries(query)
+
+        if not results:
+            return []
+
+        documents = [
+            interactor_document(summary)
+            for summary in results[:SEARCH_PAGE_SIZE]
+        ]
+
+        return [SearchGroup(
+            SearchDocument.INTERACTOR,
+            dict(SearchDocument.ENTITY_TYPES)[SearchDocument.INTERACTOR],
+            results.count(),
+            documents,
+            None,
+        )]
+
+    def get_context_data(self, **kwargs):
+        context = super(SearchView, self).get_context_data(**kwargs)
+        query = self.request.GET.get("q", "")
+        cursors = self._cursors()
+
+        groups = search_documents(query, cursors)
+        fuzzy = query != "" and not groups
+
+        if fuzzy:
+            groups = self._fuzzy_groups(query)
+
+        context['fuzzy'] = fuzzy
+        context['count'] = sum(group.count for group in groups)
+        context['groups'] = [
+            {
+                'group': group,
+                'next_url': (
+                    self._url(group.entity_type, group.next_cursor)
+                    if group.next_cursor is not None else None
+                ),
+                'first_url': (
+                    self._url(group.entity_type, None)
+                    if group.entity_type in cursors else None
+                ),
+            }
+            for group in groups
+        ]
+
+        return context
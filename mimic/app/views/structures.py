@@ -1,34 +1,61 @@
-from app.models import Pdb, PdbToProtein, Monomer
+from app.dataset_cache import dataset_cached
+from app.models import Pdb, PdbToProtein
 from django.shortcuts import render
 
 
-def StructureView(request):
-    data = Pdb.objects.values()
+def _interactions_by_pdb():
+    """ Return a dictionary mapping Pdb ids to the list of UniProt IDs of
+    the Proteins interacting in that Pdb, using a single query.
+    """
+
+    interactions = {}
+
+    data = PdbToProtein.objects.order_by('pk').values_list(
+        'pdb_id', 'protein__uniprot',
+    )
+
+    for pdb_id, uniprot in data:
+        interactions.setdefault(pdb_id, []).append(uniprot.strip())
+
+    return interactions
+
+
+@dataset_cached('app.structures.records')
+def _structure_records():
+    """ Return the rows of the Pdb list, cached by dataset version.
 
-    context = {'records': list()}
+    The alpha and beta subunits are fetched with the Pdbs via joins, and all
+    interactions with one more query, so computing the rows costs a constant
+    number of queries.
+    """
+
+    data = Pdb.objects.select_related('alpha', 'beta').order_by('pk')
+    interactions = _interactions_by_pdb()
+
+    records = []
     for row in data:
-        adat = {"pdb": row['pdb']}
-        adat["exp_tech"] = row['exp_tech']
-        adat["resolution"] = row['resolution']
-        interactions = PdbToProtein.objects.filter(pdb__pdb=row['pdb'])
-        if interactions.exists():
-            adat["interaction"] = list()
-            for entry in interactions:
-                adat["interaction"].append(entry.protein.uniprot.strip())
-        else:
-            adat["interaction"] = "-"
-
-        adat["alpha_subunit"] = Monomer.objects.filter(id=row["alpha_id"]).all().first()
-        adat["beta_subunit"] = Monomer.objects.filter(id=row["beta_id"]).all().first()
+        adat = {"pdb": row.pdb}
+        adat["exp_tech"] = row.exp_tech
+        adat["resolution"] = row.resolution
+        adat["interaction"] = interactions.get(row.pk, "-")
+
+        adat["alpha_subunit"] = row.alpha
+        adat["beta_subunit"] = row.beta
         adat["protein_interactors"] = False
         adat["other_interactors"] = False
 
-        if row["other_interactors"]:
-            if "protein" in row["other_interactors"]:
+        if row.other_interactors:
+            if "protein" in row.other_interactors:
                 adat["protein_interactors"] = True
             else:
                 adat["other_interactors"] = True
 
-        context['records'].append(adat)
+        records.append(adat)
+
+    return records
+
+
+def StructureView(request):
+    context = {'records': _structure_records()}
 
     return render(request, 'app/pdb_list.html', context)
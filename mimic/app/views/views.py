@@ -75,6 +75,15 @@ class DimerDetailView(DetailView):
     slug_field = 'lookup_name'
     context_object_name = 'dimer'
 
+    def get_context_data(self, **kwargs):
+        """ Add the diagram. Its base is read from the DiagramStore, and the
+        whole page is cached (see app.page_cache).
+        """
+
+        context = super(DimerDetailView, self).get_context_data(**kwargs)
+        context['diagram'] = self.object.generate_dimer_diagram()
+        return context
+
 
 # pylint: disable=too-many-ancestors
 class DimerListView(SingleTableView):
@@ -106,6 +115,15 @@ class PdbDetailView(DetailView):
     slug_field = 'pdb'
     context_object_name = 'pdb'
 
+    def get_context_data(self, **kwargs):
+        """ Add the style of the diagram. The whole page is cached (see
+        app.page_cache).
+        """
+
+        context = super(PdbDetailView, self).get_context_data(**kwargs)
+        context['diagram_style'] = self.object.generate_pdb_sprite_style()
+        return context
+
 
 # pylint: disable=too-many-ancestors
 class DrugDetailView(DetailView):
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/2.0/ref/settings/
 import logging
 import os
 import sys
+import tempfile
 
 # Build paths inside the project like this: os.path.join(BASE_DIR, ...)
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -112,6 +113,83 @@ DATABASES = {
     }
 }
 
+# Cache
+# https://docs.djangoproject.com/en/2.0/topics/cache/
+#
+# A file based cache is shared by all web server processes and the management
+# commands, so the upload commands can invalidate cached data by bumping the
+# dataset version (see app.dataset_cache). For deployments with many web
+# servers, a database table cache
+# (django.core.cache.backends.db.DatabaseCache) works the same way.
+#
+# Once a cache holds MAX_ENTRIES, every new entry culls a third of the cache at
+# random, including the dataset version. The cached pages and values of a
+# single dataset version are far more than Django's default of 300 entries.
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache'),
+        'OPTIONS': {
+            'MAX_ENTRIES': 100000,
+        },
+    }
+}
+
+# Values computed from the data are cached by dataset version (see
+# app.dataset_cache). DATASET_CACHE_SIZE values are kept in memory, in front of
+# the DATASET_CACHE_BACKEND cache.
+
+DATASET_CACHE_SIZE = 256
+DATASET_CACHE_BACKEND = 'default'
+
+# The pages of the read-only views are cached by dataset version and
+# DEPLOY_VERSION (see app.page_cache). Change DEPLOY_VERSION whenever a deploy
+# changes the pages (e.g. templates or views), so no page rendered by the
+# previous code is served.
+
+DEPLOY_VERSION = '1'
+
+# Rendered template fragments (e.g. the rows of the interaction tables) are
+# cached by dataset version in memory only, at most FRAGMENT_CACHE_SIZE per
+# process.
+
+FRAGMENT_CACHE_SIZE = 4096
+
+# The diagrams of the Dimer and Pdb pages are stored by coverage signature (see
+# IntegrinDiagram.diagramStore). DIAGRAM_STORE_SIZE diagrams are kept in
+# memory, and all are spilled to DIAGRAM_STORE_DIR.
+
+DIAGRAM_STORE_SIZE = 256
+DIAGRAM_STORE_DIR = os.path.join(BASE_DIR, 'cache', 'diagrams')
+
+# The upload commands can write in bulk (see app.bulk), creating at most
+# INGEST_BATCH_SIZE instances per query.
+
+INGEST_BATCH_SIZE = 500
+
+# Each file is read (see app.sheets) and uploaded in chunks of
+# INGEST_CHUNK_SIZE rows, in a single transaction with a savepoint and a
+# checkpoint (see app.ingest) per chunk.
+
+INGEST_CHUNK_SIZE = 1000
+
+# The sheets read by the upload commands are cached as Feather files in
+# SHEET_CACHE_DIR (see app.sheet_cache), so unchanged files are not parsed
+# again. With None, the files are always parsed.
+
+SHEET_CACHE_DIR = os.path.join(BASE_DIR, 'cache', 'sheets')
+
+# The tests use caches of their own, so they neither read the entries of the
+# site nor bump its dataset version.
+
+if 'test' in sys.argv:
+    TEST_CACHE_DIR = os.path.join(tempfile.gettempdir(), 'mimic-test-cache')
+
+    CACHES['default']['LOCATION'] = TEST_CACHE_DIR
+    DIAGRAM_STORE_DIR = os.path.join(TEST_CACHE_DIR, 'diagrams')
+    SHEET_CACHE_DIR = os.path.join(TEST_CACHE_DIR, 'sheets')
+
 # Password validation
 # https://docs.djangoproject.com/en/2.0/ref/settings/#auth-password-validators
 
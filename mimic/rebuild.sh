@@ -1,30 +1,47 @@
 #!/bin/bash
 #rm db.sqlite3
+# With --resume, the data is not deleted, and the uploads skip what an
+# interrupted rebuild already uploaded (see app.ingest).
+RESUME=""
+if [ "$1" == "--resume" ]; then
+    RESUME="--resume"
+fi
+
 python manage.py migrate
-python manage.py delete_all_integrins
-python manage.py delete_all_drugs
-python manage.py delete_all_protein_interactors
-python manage.py delete_all_proteins_information
-python manage.py delete_all_proteins
 
-echo "--------- ALL DATA WAS DELETED"
+# The migrations create the ProteinSummary and SearchDocument tables empty:
+# fill them from the data already in the database.
+python manage.py rebuild_protein_summaries
+
+if [ -z "$RESUME" ]; then
+    python manage.py delete_all_integrins
+    python manage.py delete_all_drugs
+    python manage.py delete_all_protein_interactors
+    python manage.py delete_all_proteins_information
+    python manage.py delete_all_proteins
+
+    echo "--------- ALL DATA WAS DELETED"
+fi
+
+# The files are uploaded in bulk (see app.bulk). Without --bulk, they are
+# uploaded row by row.
 #
-python manage.py upload_structures all-data/domain_shorthands.xlsx
+python manage.py upload_structures all-data/domain_shorthands.xlsx --bulk $RESUME
 #OK
 
-python manage.py upload_monomers all-data/integrin_monomers.xlsx
+python manage.py upload_monomers all-data/integrin_monomers.xlsx --bulk $RESUME
 #OK
 
-python manage.py upload_dimers all-data/integrin_dimers.xlsx
+python manage.py upload_dimers all-data/integrin_dimers.xlsx --bulk $RESUME
 #OK
 
-python manage.py upload_drugs all-data/integrin_drugs.xlsx
+python manage.py upload_drugs all-data/integrin_drugs.xlsx --bulk $RESUME
 #OK
 
-python manage.py upload_protein_information all-data/data_for_protein.xlsx
+python manage.py upload_protein_information all-data/data_for_protein.xlsx --bulk $RESUME
 #OK
-python manage.py upload_pdbs all-data/integrin_structures.xlsx
+python manage.py upload_pdbs all-data/integrin_structures.xlsx --bulk $RESUME
 
-python manage.py upload_protein_interactors all-data/data_test_2022.07.27.xlsx
+python manage.py upload_protein_interactors all-data/data_test_2022.07.27.xlsx --bulk $RESUME
 #OK
 